@@ -0,0 +1,188 @@
+"""
+Offline benchmarks for the integration's Python hot paths.
+
+Times layout (de)serialization, full page renders and PNG encoding on the
+synthetic layouts in synthetic_layouts.py, using the Home Assistant stubs
+from tests_python/support.py, and compares each result against the
+committed baselines.json. The baseline format and thresholds match the
+frontend workflow benchmark (scripts/benchmark_workflow.cjs):
+max(duration * slack ratio, duration + slack ms).
+
+    python benchmarks_python/run_benchmarks.py [--update-baseline]
+
+Exits non-zero when a benchmark exceeds its baseline, a baseline is missing,
+or Pillow is not installed.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+BASELINE_PATH = HERE / "baselines.json"
+SUMMARY_PATH = ROOT / "tmp" / "benchmarks" / "python_perf_summary.json"
+BASELINE_SLACK_RATIO = 2.5
+BASELINE_SLACK_MS = 50
+# Each benchmark reports the fastest of this many runs.
+REPEAT = 3
+
+sys.path.insert(0, str(ROOT / "tests_python"))
+sys.path.insert(0, str(HERE))
+
+from support import HAS_PIL, load_integration_modules  # noqa: E402
+from synthetic_layouts import SCALES, layout_dict, populate_states  # noqa: E402
+
+
+def _best_ms(func: Callable[[], Any]) -> float:
+    best = math.inf
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 2)
+
+
+def collect_benchmarks() -> List[Dict[str, Any]]:
+    """Run every benchmark and return [{"name", "durationMs"}] sorted by name."""
+    modules = load_integration_modules()
+    models = modules["models"]
+    renderer = modules["renderer"]
+    hass = modules["FakeHass"]()
+    populate_states(hass.states)
+
+    results = []
+    for scale in SCALES:
+        data = layout_dict(scale)
+        device = models.DeviceConfig.from_dict(data)
+        canvas = renderer.render_page(hass, device, device.pages[0]).image
+
+        def render_all_pages() -> None:
+            for page in device.pages:
+                renderer.render_page_to_png(hass, device, page)
+
+        results.extend([
+            {"name": f"DeviceConfig.from_dict {scale.name}", "durationMs": _best_ms(lambda: models.DeviceConfig.from_dict(data))},
+            {"name": f"DeviceConfig.to_dict {scale.name}", "durationMs": _best_ms(device.to_dict)},
+            {"name": f"render_page_to_png all pages {scale.name}", "durationMs": _best_ms(render_all_pages)},
+            {"name": f"encode_png one page {scale.name}", "durationMs": _best_ms(lambda: renderer.encode_png(canvas))},
+        ])
+    return sorted(results, key=lambda result: result["name"])
+
+
+def create_threshold(duration_ms: float) -> int:
+    return max(math.ceil(duration_ms * BASELINE_SLACK_RATIO), math.ceil(duration_ms + BASELINE_SLACK_MS))
+
+
+def build_baseline(summary: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "generatedAt": summary["generatedAt"],
+        "slackRatio": BASELINE_SLACK_RATIO,
+        "slackMs": BASELINE_SLACK_MS,
+        "totalDurationMsMax": create_threshold(summary["totalDurationMs"]),
+        "tests": [
+            {"name": test["name"], "maxDurationMs": create_threshold(test["durationMs"])}
+            for test in summary["tests"]
+        ],
+    }
+
+
+def compare_to_baseline(summary: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Return {"passed", "issues", "tests", "total"} like the frontend benchmark."""
+    if baseline is None:
+        return {
+            "passed": False,
+            "issues": [f"Missing benchmark baseline at {BASELINE_PATH.relative_to(ROOT).as_posix()}"],
+            "tests": [{**test, "maxDurationMs": None, "deltaMs": None, "status": "untracked"} for test in summary["tests"]],
+            "total": {"durationMs": summary["totalDurationMs"], "maxDurationMs": None, "deltaMs": None, "status": "untracked"},
+        }
+
+    limits = {test["name"]: test["maxDurationMs"] for test in baseline.get("tests", [])}
+    issues = []
+    tests = []
+    for test in summary["tests"]:
+        limit = limits.get(test["name"])
+        if limit is None:
+            issues.append(f"New benchmark missing baseline: {test['name']}")
+            tests.append({**test, "maxDurationMs": None, "deltaMs": None, "status": "untracked"})
+            continue
+        status = "pass" if test["durationMs"] <= limit else "fail"
+        if status == "fail":
+            issues.append(f"{test['name']} {test['durationMs']}ms > {limit}ms")
+        tests.append({**test, "maxDurationMs": limit, "deltaMs": round(test["durationMs"] - limit, 2), "status": status})
+
+    seen = {test["name"] for test in summary["tests"]}
+    issues.extend(f"Benchmark missing from current run: {name}" for name in limits if name not in seen)
+
+    total_max = baseline.get("totalDurationMsMax")
+    total_status = "untracked" if total_max is None else ("pass" if summary["totalDurationMs"] <= total_max else "fail")
+    if total_status == "fail":
+        issues.append(f"Total duration {summary['totalDurationMs']}ms > {total_max}ms")
+
+    return {
+        "passed": not issues,
+        "issues": issues,
+        "tests": tests,
+        "total": {
+            "durationMs": summary["totalDurationMs"],
+            "maxDurationMs": total_max,
+            "deltaMs": None if total_max is None else round(summary["totalDurationMs"] - total_max, 2),
+            "status": total_status,
+        },
+    }
+
+
+def print_summary(summary: Dict[str, Any], comparison: Dict[str, Any]) -> None:
+    print(f"Python benchmark summary ({summary['generatedAt']})")
+    for result in comparison["tests"]:
+        limit = "untracked" if result["maxDurationMs"] is None else f"{result['maxDurationMs']} ms"
+        delta = "" if result["deltaMs"] is None else f" ({result['deltaMs']:+} ms)"
+        print(f"- {result['durationMs']:>9.2f} ms  {result['name']}  [max: {limit}]{delta}")
+    total = comparison["total"]
+    limit = "untracked" if total["maxDurationMs"] is None else f"{total['maxDurationMs']} ms"
+    print(f"Total duration: {total['durationMs']} ms  [max: {limit}]")
+    if comparison["issues"]:
+        print("Benchmark issues:")
+        for issue in comparison["issues"]:
+            print(f"- {issue}")
+
+
+def _write_json(path: Path, value: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(value, indent=2) + "\n", encoding="utf-8")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--update-baseline", action="store_true", help="rewrite baselines.json from this run")
+    args = parser.parse_args(argv)
+
+    if not HAS_PIL:
+        print("Pillow is required to run the renderer benchmarks.", file=sys.stderr)
+        return 1
+
+    tests = collect_benchmarks()
+    summary = {
+        "generatedAt": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+        "totalDurationMs": round(sum(test["durationMs"] for test in tests), 2),
+        "tests": tests,
+    }
+
+    if args.update_baseline:
+        _write_json(BASELINE_PATH, build_baseline(summary))
+
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8")) if BASELINE_PATH.exists() else None
+    comparison = compare_to_baseline(summary, baseline)
+    _write_json(SUMMARY_PATH, {**summary, "baselineSource": BASELINE_PATH.relative_to(ROOT).as_posix(), "comparison": comparison})
+    print_summary(summary, comparison)
+    return 0 if comparison["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
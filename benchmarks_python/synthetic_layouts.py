@@ -0,0 +1,73 @@
+"""Synthetic device layouts and entity states for the Python benchmarks."""
+from __future__ import annotations
+
+from typing import Any, Dict, List, NamedTuple
+
+# Widget types the server-side renderer draws, cycled through in layout order.
+WIDGET_TYPES = ("sensor", "label", "clock", "list", "graph")
+
+
+class LayoutScale(NamedTuple):
+    """How big a synthetic layout is."""
+
+    name: str
+    widgets: int
+    pages: int
+    width: int
+    height: int
+
+
+SCALES = (
+    LayoutScale("10 widgets, 1 page, 296x128", 10, 1, 296, 128),
+    LayoutScale("100 widgets, 4 pages, 800x480", 100, 4, 800, 480),
+    LayoutScale("1000 widgets, 8 pages, 1280x800", 1000, 8, 1280, 800),
+)
+
+
+def _widget(index: int, width: int, height: int) -> Dict[str, Any]:
+    """Return one widget on a 5-column grid that wraps around the canvas."""
+    wtype = WIDGET_TYPES[index % len(WIDGET_TYPES)]
+    cell_w = max(width // 5, 20)
+    cell_h = max(height // 6, 20)
+    slot = index % 30
+    widget: Dict[str, Any] = {
+        "id": f"w{index}",
+        "type": wtype,
+        "x": (slot % 5) * cell_w,
+        "y": (slot // 5) * cell_h,
+        "width": cell_w - 4,
+        "height": cell_h - 4,
+        "title": f"Widget {index}",
+    }
+    if wtype in ("sensor", "graph", "list"):
+        widget["entity_id"] = entity_id(wtype, index)
+    return widget
+
+
+def entity_id(wtype: str, index: int) -> str:
+    """Return the entity a data-bound widget of the given type reads."""
+    return f"sensor.bench_{wtype}_{index % 50}"
+
+
+def layout_dict(scale: LayoutScale) -> Dict[str, Any]:
+    """Return a stored-layout dict holding scale.widgets spread over scale.pages."""
+    pages: List[Dict[str, Any]] = [
+        {"id": f"page_{index}", "name": f"Page {index}", "widgets": []} for index in range(scale.pages)
+    ]
+    for index in range(scale.widgets):
+        pages[index % scale.pages]["widgets"].append(_widget(index, scale.width, scale.height))
+    return {
+        "device_id": "bench",
+        "api_token": "bench",
+        "width": scale.width,
+        "height": scale.height,
+        "pages": pages,
+    }
+
+
+def populate_states(states: Any) -> None:
+    """Give every entity the synthetic layouts read a plausible state."""
+    for index in range(50):
+        states.set(entity_id("sensor", index), f"{20 + index / 10:.1f}", {"unit_of_measurement": "°C"})
+        states.set(entity_id("graph", index), str(index))
+        states.set(entity_id("list", index), "Milk\nEggs\nBread")
@@ -17,12 +17,15 @@ from typing import Any, Dict
 
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.typing import ConfigType
 
 from .const import DOMAIN, STORAGE_KEY, STORAGE_VERSION
 from .http_api import async_register_http_views
+from .prerender import PreRenderer
+from .render_service import RenderService
 from .panel import ESPHomeDesignerPanelView, ESPHomeDesignerFontView, async_get_panel_module_url
 from .services import async_register_services, async_unregister_services
 from .storage import DashboardStorage
@@ -55,6 +58,28 @@ CONFIG_SCHEMA = vol.Schema(
 )
 
 
+async def _async_get_storage(hass: HomeAssistant) -> DashboardStorage:
+    """Return the shared storage, loading it and arranging a final flush on first use."""
+    if "storage" in hass.data[DOMAIN]:
+        return hass.data[DOMAIN]["storage"]
+
+    storage = DashboardStorage(
+        hass=hass,
+        storage_key=STORAGE_KEY,
+        version=STORAGE_VERSION,
+    )
+    await storage.async_load()
+    hass.data[DOMAIN]["storage"] = storage
+
+    # Mutations are written behind; don't let a pending write die with Home Assistant
+    async def _async_flush_storage(_event: Event) -> None:
+        await storage.async_flush()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_flush_storage)
+    _LOGGER.debug("%s: Dashboard storage initialized", DOMAIN)
+    return storage
+
+
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up via YAML (optional advanced mode).
 
@@ -100,16 +125,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     hass.data.setdefault(DOMAIN, {})
 
     # Initialize storage if not present yet
-    if "storage" not in hass.data[DOMAIN]:
-        storage = DashboardStorage(
-            hass=hass,
-            storage_key=STORAGE_KEY,
-            version=STORAGE_VERSION,
-        )
-        await storage.async_load()
-        hass.data[DOMAIN]["storage"] = storage
-    else:
-        storage = hass.data[DOMAIN]["storage"]
+    storage = await _async_get_storage(hass)
 
     # Parse YAML devices into DashboardState/DeviceConfig
     devices_cfg = yaml_cfg.get("devices", {}) or {}
@@ -155,6 +171,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         )
         device.ensure_pages()
         state.devices[device_id] = device
+        storage.mark_layout_changed(device_id)
         _LOGGER.debug("%s: Loaded YAML device '%s' with %d pages", DOMAIN, device_id, len(device.pages))
 
     await storage.async_save()
@@ -171,20 +188,29 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     entry.async_on_unload(entry.add_update_listener(update_listener))
 
     # Initialize shared storage once
-    if "storage" not in hass.data[DOMAIN]:
-        storage = DashboardStorage(
-            hass=hass,
-            storage_key=STORAGE_KEY,
-            version=STORAGE_VERSION,
-        )
-        await storage.async_load()
-        hass.data[DOMAIN]["storage"] = storage
-        _LOGGER.debug("%s: Dashboard storage initialized", DOMAIN)
+    storage = await _async_get_storage(hass)
+
+    # Render service is shared across entries and lives until Home Assistant stops
+    if "render_service" not in hass.data[DOMAIN]:
+        render_service = RenderService(hass, storage)
+        hass.data[DOMAIN]["render_service"] = render_service
+        await render_service.async_load_hardware_templates()
+
+        # Keep fetched pages warm as the entities they read change
+        prerenderer = PreRenderer(hass, storage, render_service)
+        prerenderer.async_start()
+        hass.data[DOMAIN]["prerenderer"] = prerenderer
+
+        async def _async_shutdown_render_service(_event: Event) -> None:
+            prerenderer.async_stop()
+            render_service.shutdown()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_shutdown_render_service)
     else:
-        storage = hass.data[DOMAIN]["storage"]
+        render_service = hass.data[DOMAIN]["render_service"]
 
     # Register HTTP views (idempotent)
-    await async_register_http_views(hass, storage)
+    await async_register_http_views(hass, storage, render_service)
     _LOGGER.info("%s: HTTP API views registered", DOMAIN)
 
     # Register the embedded editor panel backend view
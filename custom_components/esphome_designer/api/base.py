@@ -46,6 +46,17 @@ class DesignerBaseView(HomeAssistantView):
             self._add_pna_headers(response, request)
         return response
 
+    def json_text(self, body: str, status_code: int = HTTPStatus.OK, request: web.Request = None) -> web.Response:
+        """Return an already serialized JSON body, e.g. a cached layout."""
+        response = web.Response(
+            body=body,
+            status=status_code,
+            content_type="application/json",
+        )
+        if request:
+            self._add_pna_headers(response, request)
+        return response
+
     def json_response(self, data: Any, request: web.Request, status_code: int = HTTPStatus.OK) -> web.Response:
         """Return a JSON response with PNA headers."""
         return self.json(data, status_code, request)
@@ -0,0 +1,28 @@
+"""Render diagnostics endpoint: draw/encode timings and the slowest widgets."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from ..const import API_RENDER_DIAGNOSTICS_PATH
+from ..render_service import RenderService
+from .base import DesignerBaseView
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ReTerminalRenderDiagnosticsView(DesignerBaseView):
+    """Expose render timing histograms and cache counters to the editor."""
+
+    url = API_RENDER_DIAGNOSTICS_PATH
+    name = "api:esphome_designer_render_diagnostics"
+
+    def __init__(self, hass: HomeAssistant, render_service: RenderService) -> None:
+        self.hass = hass
+        self.render_service = render_service
+
+    async def get(self, request) -> Any:
+        """Return the render diagnostics report."""
+        return self.json(self.render_service.diagnostics(), request=request)
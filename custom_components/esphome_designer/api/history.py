@@ -9,6 +9,7 @@ from aiohttp import web
 from homeassistant.core import HomeAssistant
 
 from ..const import API_BASE_PATH
+from ..history_series import async_get_history
 from .base import DesignerBaseView
 
 _LOGGER = logging.getLogger(__name__)
@@ -69,89 +70,7 @@ class HistoryProxyView(DesignerBaseView):
 
     async def _get_history_async(self, entity_id: str, start_time: datetime, end_time: datetime) -> list:
         """Get history using HA's async history API."""
-        try:
-            # Try importing from recorder.history (HA 2023+)
-            from homeassistant.components.recorder.history import get_significant_states
-            from homeassistant.components.recorder import get_instance
-            
-            recorder = get_instance(self.hass)
-            if not recorder:
-                _LOGGER.debug("Recorder not found/not ready yet, using fallback for %s", entity_id)
-                raise ImportError("Recorder not found")
-            
-            # Use the async wrapper for get_significant_states
-            history_data = await recorder.async_add_executor_job(
-                get_significant_states,
-                self.hass,
-                start_time,
-                end_time,
-                [entity_id],  # entity_ids as list
-                None,  # filters
-                True,  # include_start_time_state
-                False,  # significant_changes_only  
-                True,   # minimal_response
-                True,   # no_attributes
-            )
-            
-            formatted = self._format_history(history_data, entity_id)
-            return formatted if formatted else self._current_state_fallback(entity_id)
-            
-        except Exception as err:
-            _LOGGER.debug("get_significant_states unavailable or failed (%s), trying alternate method for %s", err, entity_id)
-            
-            # Fallback: Try state_changes_during_period with newer signature
-            try:
-                from homeassistant.components.recorder.history import state_changes_during_period
-                from homeassistant.components.recorder import get_instance
-                
-                recorder = get_instance(self.hass)
-                if not recorder:
-                    raise ImportError("Recorder still missing")
-
-                history_data = await recorder.async_add_executor_job(
-                    state_changes_during_period,
-                    self.hass,
-                    start_time,
-                    end_time,
-                    entity_id,
-                    True,   # no_attributes
-                    False,  # descending
-                    None,   # limit
-                    True,   # include_start_time_state
-                )
-                
-                formatted = self._format_history(history_data, entity_id)
-                return formatted if formatted else self._current_state_fallback(entity_id)
-                
-            except Exception as inner_err:
-                _LOGGER.debug("state_changes_during_period also failed (%s) for %s, using current state fallback", inner_err, entity_id)
-                return self._current_state_fallback(entity_id)
-
-    def _format_history(self, history_data: dict, entity_id: str) -> list:
-        """Format history data to a simple list of state objects."""
-        states = []
-        if isinstance(history_data, dict) and entity_id in history_data:
-            for state in history_data[entity_id]:
-                states.append({
-                    "state": state.state,
-                    "last_changed": state.last_changed.isoformat() if state.last_changed else None,
-                    "last_updated": state.last_updated.isoformat() if state.last_updated else None,
-                })
-        return states
-
-    def _current_state_fallback(self, entity_id: str) -> list:
-        """Return the current state as a single history entry when recorder data is unavailable."""
-        try:
-            state = self.hass.states.get(entity_id)
-            if state:
-                return [{
-                    "state": state.state,
-                    "last_changed": state.last_changed.isoformat() if state.last_changed else None,
-                    "last_updated": state.last_updated.isoformat() if state.last_updated else None,
-                }]
-        except Exception as final_err:  # noqa: BLE001
-            _LOGGER.error("Failed to get current state fallback for %s: %s", entity_id, final_err)
-        return []
+        return await async_get_history(self.hass, entity_id, start_time, end_time)
 
     def _render_csv(self, states: list, target_points: int = 0) -> web.Response:
         """Render states as a simple comma-separated string of values."""
@@ -0,0 +1,323 @@
+"""Device-facing page image endpoints for ESPHome online_image clients."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+from http import HTTPStatus
+from typing import Any
+
+from aiohttp import web
+from homeassistant.core import HomeAssistant
+
+from ..const import (
+    API_BUNDLE_PATH,
+    API_DELTA_PATH,
+    API_FRAMEBUFFER_PATH,
+    API_IMAGE_PATH,
+    IMAGE_HEIGHT,
+    IMAGE_WIDTH,
+)
+from ..framebuffer import FORMAT_PNG, OUTPUT_FORMATS, default_output_format, encode_bundle
+from ..models import DeviceConfig
+from ..render_service import RenderService, StreamedPage
+from ..storage import DashboardStorage
+from .base import DesignerBaseView
+from .request_utils import etag_matches
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _DevicePageView(DesignerBaseView):
+    """Shared token and page-index validation for device-facing page views."""
+
+    # ESPHome devices cannot present a HA auth token; the per-device API token
+    # passed as ?token=... is checked against storage instead.
+    requires_auth = False
+
+    def __init__(self, hass: HomeAssistant, storage: DashboardStorage, render_service: RenderService) -> None:
+        self.hass = hass
+        self.storage = storage
+        self.render_service = render_service
+
+    def _resolve_device(self, request, device_id: str) -> DeviceConfig | web.Response:
+        """Return the device whose ?token= matches, or a 401 response."""
+        device = self.storage.get_device_by_token(device_id, request.query.get("token", ""))
+        if device is None:
+            return self._add_pna_headers(web.Response(status=HTTPStatus.UNAUTHORIZED), request)
+        return device
+
+    def _resolve_output_format(self, request, device: DeviceConfig) -> str | web.Response:
+        """Return the ?format= output format, defaulting from the hardware profile."""
+        output_format = request.query.get("format") or default_output_format(device)
+        if output_format not in OUTPUT_FORMATS:
+            return self._add_pna_headers(web.Response(status=HTTPStatus.BAD_REQUEST), request)
+        return output_format
+
+    def _resolve_page(
+        self, request, device_id: str, page_index: str
+    ) -> tuple[DeviceConfig, int] | web.Response:
+        """Return (device, index) or an error response for the request."""
+        device = self._resolve_device(request, device_id)
+        if isinstance(device, web.Response):
+            return device
+
+        try:
+            index = int(page_index)
+        except (TypeError, ValueError):
+            return self._add_pna_headers(web.Response(status=HTTPStatus.BAD_REQUEST), request)
+
+        if not 0 <= index < len(device.pages):
+            return self._add_pna_headers(web.Response(status=HTTPStatus.NOT_FOUND), request)
+
+        return device, index
+
+    async def _async_page_response(
+        self,
+        request,
+        device: DeviceConfig,
+        index: int,
+        output_format: str,
+        headers: dict[str, str],
+    ) -> web.Response:
+        """Return the encoded page, or a bodyless 304 if the client's copy is current.
+
+        The ETag is derived from the render cache key, so an unchanged page
+        is answered without rendering or encoding anything, and pages that
+        only change with the clock carry a max-age up to their next change
+        (see RenderService.max_age). A render that misses the deadline is
+        answered with the last good image, its own ETag and an Age header;
+        a render shared with a newer request is tagged by that request's key.
+        Large pages are streamed band by band, with the deadline on the first
+        band.
+        """
+        self.render_service.mark_page_served(device.device_id, index, output_format)
+        key = self.render_service.cache_key(device, index, output_format)
+        etag = self.render_service.etag(key)
+        max_age = self.render_service.max_age(device, index, key)
+        headers = {**headers, "Cache-Control": _cache_control(max_age), "ETag": etag}
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return self._add_pna_headers(web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers), request)
+
+        try:
+            if self.render_service.uses_bands(device, output_format):
+                served = await self.render_service.async_serve_stream(device, index, output_format, key)
+            else:
+                served = await self.render_service.async_serve_page(device, index, output_format, key)
+        except Exception:  # noqa: BLE001
+            _LOGGER.exception("Failed to render page %s for device %s", index, device.device_id)
+            return self._add_pna_headers(web.Response(status=HTTPStatus.INTERNAL_SERVER_ERROR), request)
+
+        if isinstance(served, StreamedPage):
+            return await self._async_stream_response(request, device, index, output_format, served, headers)
+
+        if served.age is not None:
+            headers["ETag"] = self.render_service.etag(served.key)
+            headers["Age"] = str(served.age)
+            headers["Cache-Control"] = "no-cache"
+        elif served.key != key:
+            # The render was shared with a newer request for this page.
+            headers["ETag"] = self.render_service.etag(served.key)
+            headers["Cache-Control"] = _cache_control(self.render_service.max_age(device, index, served.key))
+
+        return self._add_pna_headers(
+            web.Response(
+                body=served.data,
+                status=HTTPStatus.OK,
+                content_type=OUTPUT_FORMATS[output_format],
+                headers=headers,
+            ),
+            request,
+        )
+
+    async def _async_stream_response(
+        self,
+        request,
+        device: DeviceConfig,
+        index: int,
+        output_format: str,
+        streamed: StreamedPage,
+        headers: dict[str, str],
+    ) -> web.StreamResponse:
+        """Send a banded render as it completes.
+
+        The first band is rendered before the status line goes out, so an
+        early failure still gets a 500 (or the last good image). A failure
+        after that drops the connection rather than ending a truncated body
+        cleanly.
+        """
+        response = self._add_pna_headers(web.StreamResponse(status=HTTPStatus.OK, headers=headers), request)
+        response.content_type = OUTPUT_FORMATS[output_format]
+        await response.prepare(request)
+        await response.write(streamed.first)
+        try:
+            async for chunk in streamed.rest:
+                await response.write(chunk)
+        except Exception:
+            _LOGGER.exception("Failed while streaming page %s for device %s", index, device.device_id)
+            raise
+        await response.write_eof()
+        return response
+
+
+def _cache_control(max_age: int | None) -> str:
+    """Return the Cache-Control value for a page image that is current."""
+    return "no-cache" if max_age is None else f"max-age={max_age}"
+
+
+class ReTerminalPageImageView(_DevicePageView):
+    """Serve a rendered page image for a device, authenticated by its API token."""
+
+    url = API_IMAGE_PATH
+    name = "api:esphome_designer_page_image"
+
+    async def get(self, request, device_id: str, page_index: str) -> Any:
+        """Render and return the requested page as PNG."""
+        resolved = self._resolve_page(request, device_id, page_index)
+        if isinstance(resolved, web.Response):
+            return resolved
+        device, index = resolved
+        return await self._async_page_response(request, device, index, FORMAT_PNG, {})
+
+
+class ReTerminalPageFramebufferView(_DevicePageView):
+    """Serve a page pre-packed for the device's display driver.
+
+    ?format= selects png, 1bpp, 2bpp or rgb565 (see framebuffer.py); without
+    it the format is chosen from the device's hardware profile. The format
+    actually sent is echoed in the X-Frame-Format header.
+    """
+
+    url = API_FRAMEBUFFER_PATH
+    name = "api:esphome_designer_page_framebuffer"
+
+    async def get(self, request, device_id: str, page_index: str) -> Any:
+        """Render and return the requested page in the selected output format."""
+        resolved = self._resolve_page(request, device_id, page_index)
+        if isinstance(resolved, web.Response):
+            return resolved
+        device, index = resolved
+
+        output_format = self._resolve_output_format(request, device)
+        if isinstance(output_format, web.Response):
+            return output_format
+
+        return await self._async_page_response(
+            request, device, index, output_format, {"X-Frame-Format": output_format}
+        )
+
+
+class ReTerminalDeviceBundleView(_DevicePageView):
+    """Serve every page of a device in one response (see framebuffer.py).
+
+    ?format= works as for image.bin. ?have= lists page hashes (hex, comma
+    separated) from a previous bundle; pages still matching one are sent
+    without payload and are not rendered at all. The bundle's ETag covers
+    every page hash, so a panel whose pages are all unchanged gets a 304.
+    Pages whose render misses the deadline are sent as their last good image
+    under that image's hash, with the oldest such image's age in Age.
+    """
+
+    url = API_BUNDLE_PATH
+    name = "api:esphome_designer_device_bundle"
+
+    async def get(self, request, device_id: str) -> Any:
+        """Render the device's pages and return them as one bundle."""
+        device = self._resolve_device(request, device_id)
+        if isinstance(device, web.Response):
+            return device
+        output_format = self._resolve_output_format(request, device)
+        if isinstance(output_format, web.Response):
+            return output_format
+
+        have = {value.strip().lower() for value in request.query.get("have", "").split(",") if value.strip()}
+        keys = [self.render_service.cache_key(device, index, output_format) for index in range(len(device.pages))]
+        hashes = [self.render_service.page_hash(key) for key in keys]
+        etag = _bundle_etag(hashes, have)
+        headers = {"Cache-Control": "no-cache", "ETag": etag, "X-Frame-Format": output_format}
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return self._add_pna_headers(web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers), request)
+
+        changed = [index for index, page_hash in enumerate(hashes) if page_hash.hex() not in have]
+        for index in range(len(device.pages)):
+            self.render_service.mark_page_served(device_id, index, output_format)
+
+        try:
+            served = await asyncio.gather(*(
+                self.render_service.async_serve_page(device, index, output_format, keys[index])
+                for index in changed
+            ))
+        except Exception:  # noqa: BLE001
+            _LOGGER.exception("Failed to render bundle for device %s", device_id)
+            return self._add_pna_headers(web.Response(status=HTTPStatus.INTERNAL_SERVER_ERROR), request)
+
+        rendered = {index: page.data for index, page in zip(changed, served)}
+        # Pages are tagged by the key they were rendered from: a stale image,
+        # or a render shared with a newer request.
+        for index, page in zip(changed, served):
+            hashes[index] = self.render_service.page_hash(page.key)
+        headers["ETag"] = _bundle_etag(hashes, have)
+        ages = [page.age for page in served if page.age is not None]
+        if ages:
+            headers["Age"] = str(max(ages))
+        body = encode_bundle(
+            [(index, page_hash, rendered.get(index)) for index, page_hash in enumerate(hashes)],
+            output_format,
+            device.width or IMAGE_WIDTH,
+            device.height or IMAGE_HEIGHT,
+            device.orientation == "portrait",
+        )
+        return self._add_pna_headers(
+            web.Response(body=body, status=HTTPStatus.OK, content_type="application/octet-stream", headers=headers),
+            request,
+        )
+
+
+def _bundle_etag(hashes: list[bytes], have: set[str]) -> str:
+    """Tag a bundle by its page hashes and the hashes the client already had."""
+    digest = hashlib.blake2b(b"".join(hashes), digest_size=12)
+    digest.update(",".join(sorted(have)).encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
+
+
+class ReTerminalPageDeltaView(_DevicePageView):
+    """Serve only the regions of a page that changed since a client-supplied frame.
+
+    Clients pass the frame number from their previous response's
+    X-Frame-Revision header as ?since=...; omitting it (or sending one that is
+    too old) yields a full frame. See framebuffer.py for the binary layout.
+    """
+
+    url = API_DELTA_PATH
+    name = "api:esphome_designer_page_delta"
+
+    async def get(self, request, device_id: str, page_index: str) -> Any:
+        """Render the page and return the changed rectangles as packed 1bpp."""
+        resolved = self._resolve_page(request, device_id, page_index)
+        if isinstance(resolved, web.Response):
+            return resolved
+        device, index = resolved
+        # Deltas are cut from the retained frame, which any render refreshes.
+        self.render_service.mark_page_served(device_id, index)
+
+        since_raw = request.query.get("since")
+        try:
+            since = int(since_raw) if since_raw else None
+        except ValueError:
+            return self._add_pna_headers(web.Response(status=HTTPStatus.BAD_REQUEST), request)
+
+        try:
+            payload, seq = await self.render_service.async_render_delta(device, index, since)
+        except Exception:  # noqa: BLE001
+            _LOGGER.exception("Failed to render delta for page %s of device %s", index, device_id)
+            return self._add_pna_headers(web.Response(status=HTTPStatus.INTERNAL_SERVER_ERROR), request)
+
+        return self._add_pna_headers(
+            web.Response(
+                body=payload,
+                status=HTTPStatus.OK,
+                content_type="application/octet-stream",
+                headers={"Cache-Control": "no-cache", "X-Frame-Revision": str(seq)},
+            ),
+            request,
+        )
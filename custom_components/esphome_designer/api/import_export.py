@@ -40,7 +40,7 @@ class ReTerminalImportSnippetView(DesignerBaseView):
             
             return self.json({
                 "status": "ok",
-                "layout": layout.to_dict()
+                "layout": self.storage.layout_dict(layout)
             }, request=request)
         except ValueError as exc:
             return self.json({"error": str(exc)}, HTTPStatus.BAD_REQUEST, request=request)
@@ -63,7 +63,7 @@ class ReTerminalLayoutExportView(DesignerBaseView):
         if not layout:
             return self.json({"error": "not_found"}, HTTPStatus.NOT_FOUND, request=request)
         
-        return self.json(layout.to_dict(), request=request)
+        return self.json_text(self.storage.layout_json(layout), request=request)
 
 class ReTerminalLayoutImportView(DesignerBaseView):
     """Import a JSON layout file."""
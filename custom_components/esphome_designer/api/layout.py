@@ -4,13 +4,21 @@ import logging
 from http import HTTPStatus
 from typing import Any
 
+from aiohttp import web
 from homeassistant.core import HomeAssistant
 
 from ..const import API_BASE_PATH
 from ..models import DeviceConfig
-from ..storage import DashboardStorage
+from ..storage import DashboardStorage, RevisionConflictError
 from .base import DesignerBaseView
-from .request_utils import InvalidJsonObjectError, parse_json_object, sanitize_layout_id
+from .request_utils import (
+    InvalidJsonObjectError,
+    etag_matches,
+    layout_etag,
+    parse_if_match,
+    parse_json_object,
+    sanitize_layout_id,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,6 +31,34 @@ async def _parse_json_body(request) -> dict[str, Any]:
         return {}
 
 
+def _layout_response(view: DesignerBaseView, request, storage: DashboardStorage, device: DeviceConfig) -> web.Response:
+    """Return a stored layout with its revision and page as ETag, or 304 if the client has it.
+
+    The 304 path never serializes the layout.
+    """
+    etag = layout_etag(device.device_id, device.revision, device.current_page)
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return view._add_pna_headers(
+            web.Response(status=HTTPStatus.NOT_MODIFIED, headers={"ETag": etag}), request
+        )
+    response = view.json_text(storage.layout_json(device), request=request)
+    response.headers["ETag"] = etag
+    return response
+
+
+def _revision_conflict(view: DesignerBaseView, request, exc: RevisionConflictError) -> web.Response:
+    """Return 412 for a write whose If-Match no longer names the stored revision."""
+    _LOGGER.warning("Rejected stale write to layout %s (now at revision %s)", exc.device_id, exc.current)
+    response = view.json(
+        {"error": "revision_conflict", "revision": exc.current},
+        HTTPStatus.PRECONDITION_FAILED,
+        request=request,
+    )
+    if exc.current is not None:
+        response.headers["ETag"] = layout_etag(exc.device_id, exc.current)
+    return response
+
+
 class ReTerminalLayoutView(DesignerBaseView):
     """Provide layout GET/POST for the ESPHome Designer editor."""
 
@@ -39,7 +75,7 @@ class ReTerminalLayoutView(DesignerBaseView):
         _LOGGER.info("Loading layout: %d pages, %d total widgets", 
                      len(device.pages),
                      sum(len(p.widgets) for p in device.pages))
-        return self.json(device.to_dict(), status_code=HTTPStatus.OK, request=request)
+        return _layout_response(self, request, self.storage, device)
 
     async def post(self, request) -> Any:
         """Update layout for the default device from JSON body."""
@@ -64,7 +100,11 @@ class ReTerminalLayoutView(DesignerBaseView):
         _LOGGER.info("Received layout update with %d pages, %d total widgets", page_count, widget_count)
 
         try:
-            updated = await self.storage.async_update_layout_default(body)
+            updated = await self.storage.async_update_layout_default(
+                body, parse_if_match(request.headers.get("If-Match"))
+            )
+        except RevisionConflictError as exc:
+            return _revision_conflict(self, request, exc)
         except (AttributeError, TypeError, ValueError) as exc:
             _LOGGER.error("Invalid default layout payload rejected by storage: %s", exc)
             return self.json(
@@ -96,7 +136,9 @@ class ReTerminalLayoutView(DesignerBaseView):
                 request=request,
             )
 
-        return self.json({"status": "ok", "layout": updated.to_dict()}, request=request)
+        response = self.json({"status": "ok", "layout": self.storage.layout_dict(updated)}, request=request)
+        response.headers["ETag"] = layout_etag(updated.device_id, updated.revision, updated.current_page)
+        return response
 
     async def _async_get_default_device(self) -> DeviceConfig:
         """Return the default device/layout, creating if necessary."""
@@ -167,7 +209,7 @@ class ReTerminalLayoutsListView(DesignerBaseView):
             return self.json({"error": "update_failed"}, HTTPStatus.INTERNAL_SERVER_ERROR, request=request)
 
         _LOGGER.info("Created layout: %s", layout_id)
-        return self.json(new_layout.to_dict(), request=request)
+        return self.json_text(self.storage.layout_json(new_layout), request=request)
 
 class ReTerminalLayoutDetailView(DesignerBaseView):
     """Handle individual layout operations."""
@@ -182,7 +224,7 @@ class ReTerminalLayoutDetailView(DesignerBaseView):
         layout = await self.storage.async_get_layout(layout_id)
         if not layout:
             return self.json({"error": "not_found"}, HTTPStatus.NOT_FOUND, request=request)
-        return self.json(layout.to_dict(), request=request)
+        return _layout_response(self, request, self.storage, layout)
 
     async def delete(self, request, layout_id: str) -> Any:
         if layout_id == "default":
@@ -218,7 +260,11 @@ class ReTerminalLayoutDetailView(DesignerBaseView):
             return self.json({"status": "deleted"}, request=request)
 
         try:
-            updated = await self.storage.async_update_layout(layout_id, body)
+            updated = await self.storage.async_update_layout(
+                layout_id, body, parse_if_match(request.headers.get("If-Match"))
+            )
+        except RevisionConflictError as exc:
+            return _revision_conflict(self, request, exc)
         except (AttributeError, TypeError, ValueError) as exc:
             _LOGGER.error("Failed to update layout due to invalid payload for %s: %s", layout_id, exc)
             return self.json({"error": "invalid_layout"}, HTTPStatus.BAD_REQUEST, request=request)
@@ -230,4 +276,6 @@ class ReTerminalLayoutDetailView(DesignerBaseView):
             _LOGGER.error("Failed to update layout: %s", layout_id)
             return self.json({"error": "update_failed"}, HTTPStatus.INTERNAL_SERVER_ERROR, request=request)
         _LOGGER.info("Layout updated: %s", layout_id)
-        return self.json(updated.to_dict(), request=request)
+        response = self.json_text(self.storage.layout_json(updated), request=request)
+        response.headers["ETag"] = layout_etag(updated.device_id, updated.revision, updated.current_page)
+        return response
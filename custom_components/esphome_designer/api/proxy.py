@@ -5,7 +5,6 @@ import logging
 import socket
 from dataclasses import dataclass
 from http import HTTPStatus
-from pathlib import Path, PurePosixPath
 from typing import Any, Callable
 from urllib.parse import urljoin, urlparse
 
@@ -14,70 +13,11 @@ from aiohttp import web
 from homeassistant.core import HomeAssistant
 
 from ..const import API_BASE_PATH
+from ..paths import resolve_image_path
 from .base import DesignerBaseView
 
 _LOGGER = logging.getLogger(__name__)
 _MAX_RSS_REDIRECTS = 5
-_ALLOWED_IMAGE_ROOTS = (
-    Path("esphome") / "image",
-    Path("esphome") / "images",
-    Path("esphome_designer") / "image",
-    Path("esphome_designer") / "images",
-    Path("www"),
-)
-
-
-def _get_allowed_image_roots(config_dir: str | Path) -> tuple[Path, ...]:
-    base_dir = Path(config_dir).resolve()
-    return tuple((base_dir / relative_root).resolve() for relative_root in _ALLOWED_IMAGE_ROOTS)
-
-
-def _resolve_image_path(config_dir: str | Path, raw_path: str | None) -> Path | None:
-    """Resolve an image path strictly within known ESPHome image directories."""
-    if not raw_path:
-        return None
-
-    requested = raw_path.strip()
-    if not requested or "\x00" in requested:
-        return None
-
-    if requested.startswith("/local/"):
-        posix_path = PurePosixPath("www") / PurePosixPath(requested.removeprefix("/local/"))
-    elif requested.startswith("/"):
-        if not requested.startswith("/config/"):
-            return None
-        posix_path = PurePosixPath(requested.removeprefix("/config/"))
-    else:
-        posix_path = PurePosixPath(requested)
-
-    if any(part in ("", ".", "..") for part in posix_path.parts):
-        return None
-
-    relative_path = Path(*posix_path.parts)
-    config_base = Path(config_dir).resolve()
-    allowed_roots = _get_allowed_image_roots(config_base)
-
-    explicit_candidate = (config_base / relative_path).resolve()
-    for root in allowed_roots:
-        try:
-            explicit_candidate.relative_to(root)
-        except ValueError:
-            continue
-        if explicit_candidate.exists() and explicit_candidate.is_file():
-            return explicit_candidate
-
-    for root in allowed_roots:
-        candidate = (root / relative_path).resolve()
-        try:
-            candidate.relative_to(root)
-        except ValueError:
-            continue
-        if candidate.exists() and candidate.is_file():
-            return candidate
-
-    return None
-
-
 def _is_public_ip_address(address: str) -> bool:
     ip = ipaddress.ip_address(address)
     return not (
@@ -252,7 +192,7 @@ class ReTerminalImageProxyView(DesignerBaseView):
         if not path:
             return self._add_pna_headers(web.Response(status=HTTPStatus.BAD_REQUEST), request)
 
-        filepath = _resolve_image_path(self.hass.config.config_dir, path)
+        filepath = resolve_image_path(self.hass.config.config_dir, path)
         if filepath is None:
             _LOGGER.warning("Blocked image proxy path outside allowed roots: %s", path)
             return self._add_pna_headers(web.Response(status=HTTPStatus.FORBIDDEN), request)
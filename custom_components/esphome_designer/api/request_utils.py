@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import json
-from typing import Any
+from typing import Any, FrozenSet, Tuple
+from urllib.parse import quote, unquote
 
 from aiohttp import web
 
@@ -34,3 +35,52 @@ def sanitize_layout_id(layout_id: Any) -> str:
     """Normalize a layout id to the canonical safe storage format."""
     text = "" if layout_id is None else str(layout_id)
     return "".join(ch for ch in text if ch.isalnum() or ch in "-_").lower()
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak If-None-Match comparison (RFC 9110 13.1.2), including "*"."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def layout_etag(device_id: str, revision: int, current_page: int | None = None) -> str:
+    """Return the strong ETag for a stored layout revision.
+
+    The device id is part of the tag because revisions are counted per
+    device: GET /layout serves whichever layout is active. Page flips change
+    current_page without a new revision, so tags of served layouts carry it
+    too; write preconditions only compare the revision.
+    """
+    tag = f"{quote(device_id, safe='')}:{revision}"
+    if current_page is not None:
+        tag = f"{tag}:{current_page}"
+    return f'"{tag}"'
+
+
+def parse_if_match(if_match: str | None) -> FrozenSet[Tuple[str, int]] | None:
+    """Return the (device_id, revision) pairs an If-Match header accepts.
+
+    None means any revision (no header, or "*"). If-Match uses strong
+    comparison, so weak and unparsable tags are dropped; a header with none
+    left gives an empty set, which no layout satisfies. The current page a
+    served tag carries is ignored.
+    """
+    if not if_match or not if_match.strip():
+        return None
+    accepted = set()
+    for candidate in if_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return None
+        if len(candidate) < 2 or candidate[0] != '"' or candidate[-1] != '"':
+            continue
+        # "<device_id>:<revision>", optionally followed by ":<current_page>".
+        parts = candidate[1:-1].split(":")
+        if len(parts) in (2, 3) and parts[0] and all(part.isdigit() for part in parts[1:]):
+            accepted.add((unquote(parts[0]), int(parts[1])))
+    return frozenset(accepted)
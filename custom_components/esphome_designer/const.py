@@ -6,7 +6,10 @@ DOMAIN = "esphome_designer"
 
 # Storage
 STORAGE_KEY = DOMAIN
-STORAGE_VERSION = 1
+# 2: STORAGE_KEY holds an index of per-device stores (see storage.py); 1 held the whole state.
+STORAGE_VERSION = 2
+# Quiet period after a layout mutation before the state is written; bursts coalesce into one write (seconds).
+STORAGE_SAVE_DELAY_S = 5
 
 # Image / layout defaults for reTerminal E1001
 IMAGE_WIDTH = 800
@@ -26,14 +29,54 @@ SERVICE_PREV_PAGE = "prev_page"
 # HTTP API paths (joined with /api/)
 API_BASE_PATH = f"/api/{DOMAIN}"
 API_IMAGE_PATH = f"{API_BASE_PATH}" + "/{device_id}/page/{page_index}/image.png"
+API_DELTA_PATH = f"{API_BASE_PATH}" + "/{device_id}/page/{page_index}/delta.bin"
+API_FRAMEBUFFER_PATH = f"{API_BASE_PATH}" + "/{device_id}/page/{page_index}/image.bin"
+API_BUNDLE_PATH = f"{API_BASE_PATH}" + "/{device_id}/bundle.bin"
 API_LAYOUT_PATH = f"{API_BASE_PATH}" + "/{device_id}/layout"
 API_LAYOUT_PAGE_PATH = f"{API_BASE_PATH}" + "/{device_id}/page/{page_index}"
+API_RENDER_DIAGNOSTICS_PATH = f"{API_BASE_PATH}/diagnostics/render"
 
 # Defaults
 DEFAULT_PAGES = 1
 MIN_PAGES = 1
 MAX_PAGES = 8
 
+# Rendering
+# Upper bound on concurrent page renders; keeps a polling fleet from saturating the host.
+RENDER_MAX_WORKERS = 2
+# Cap on render worker processes; the scheduler uses one per core beyond the first, up to this.
+RENDER_MAX_PROCESSES = 4
+# Render jobs allowed to wait for a worker before background jobs are shed.
+RENDER_QUEUE_MAX = 32
+# Seconds a device request waits for a fresh render before it is sent the last good image instead.
+RENDER_DEADLINE_S = 3.0
+# Byte budget for cached page images (LRU-evicted).
+RENDER_CACHE_MAX_BYTES = 16 * 1024 * 1024
+# Frame transitions remembered per page for partial-refresh deltas.
+RENDER_FRAME_HISTORY = 16
+# Canvases each render worker keeps, so render jobs can send widget signatures instead of the previous image.
+RENDER_WORKER_FRAMES = 8
+# Canvases with at least this many pixels are drawn and encoded in horizontal bands to cap peak memory.
+RENDER_BAND_MIN_PIXELS = 1024 * 600
+# Rows per band; a multiple of 8 so ordered dithering and packed rows line up across bands.
+RENDER_BAND_HEIGHT = 64
+# Widgets listed in the diagnostics report's slowest-draw ranking.
+RENDER_STATS_SLOW_WIDGETS = 10
+# Quiet period before state changes trigger background re-renders (seconds).
+PRERENDER_DEBOUNCE_S = 2.0
+# Byte budget for decoded image-widget bitmaps per render process (LRU-evicted).
+IMAGE_CACHE_MAX_BYTES = 8 * 1024 * 1024
+# How long page cache keys trust an image file's last checked mtime (seconds).
+IMAGE_VERSION_CHECK_S = 30.0
+# Shortest interval between history re-queries for a graph widget (seconds).
+HISTORY_REFRESH_MIN_S = 60
+# Downsampled graph series kept for server-rendered graph widgets (LRU-evicted).
+HISTORY_CACHE_MAX_SERIES = 64
+# Loaded font faces kept by the renderer's font registry (LRU-evicted).
+FONT_CACHE_SIZE = 64
+# Memoized text measurements, keyed by font and string.
+TEXT_EXTENT_CACHE_SIZE = 4096
+
 # Security / tokens
 # Per-device token length; tokens are generated and stored by the integration, not user-provided.
 API_TOKEN_BYTES = 16
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Entity-to-widget dependency index across all stored layouts.
+
+Answers "which widgets/pages does this entity affect?" with dictionary lookups
+instead of walking every device, page and widget on each state change. The
+index is maintained per device: DashboardStorage re-indexes a single device
+whenever its layout is mutated, so the cost of an update is proportional to
+that device's widget count, not to the size of the fleet.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+from .models import DeviceConfig
+
+
+class WidgetRef(NamedTuple):
+    """Location of a widget within the stored layouts."""
+
+    device_id: str
+    page_index: int
+    widget_id: str
+
+
+PageRef = Tuple[str, int]
+# (entity_id, page_index, widget_id): one entity read by one widget.
+Dependency = Tuple[str, int, str]
+
+
+def device_dependencies(device: DeviceConfig) -> List[Dependency]:
+    """Return every entity read by a device's widgets, in layout order, without duplicates."""
+    seen: Set[Dependency] = set()
+    dependencies: List[Dependency] = []
+    for page_index, page in enumerate(device.pages):
+        for widget in page.widgets:
+            for entity_id in widget.entity_ids():
+                dependency = (entity_id, page_index, widget.id)
+                if dependency not in seen:
+                    seen.add(dependency)
+                    dependencies.append(dependency)
+    return dependencies
+
+
+class EntityDependencyIndex:
+    """Map entity_ids to the widgets and pages that read them."""
+
+    def __init__(self) -> None:
+        self._widgets: Dict[str, Set[WidgetRef]] = {}
+        self._pages: Dict[str, Dict[PageRef, int]] = {}
+        self._page_entities: Dict[PageRef, FrozenSet[str]] = {}
+        self._device_refs: Dict[str, Set[Tuple[str, WidgetRef]]] = {}
+
+    def rebuild(self, devices: Mapping[str, DeviceConfig]) -> None:
+        """Re-index every device from scratch."""
+        self._widgets.clear()
+        self._pages.clear()
+        self._page_entities.clear()
+        self._device_refs.clear()
+        for device_id, device in devices.items():
+            self.update_device(device_id, device)
+
+    def update_device(self, device_id: str, device: Optional[DeviceConfig]) -> None:
+        """Replace the indexed references of one device; None removes it."""
+        self.update_dependencies(device_id, None if device is None else device_dependencies(device))
+
+    def update_dependencies(self, device_id: str, dependencies: Optional[Iterable[Dependency]]) -> None:
+        """Replace one device's references from precomputed dependencies; None removes it.
+
+        Lets storage index layouts it has not deserialized yet.
+        """
+        self._remove_device(device_id)
+        if dependencies is None:
+            return
+
+        refs: Set[Tuple[str, WidgetRef]] = set()
+        page_entities: Dict[PageRef, Set[str]] = {}
+        for entity_id, page_index, widget_id in dependencies:
+            widget_ref = WidgetRef(device_id, page_index, widget_id)
+            if (entity_id, widget_ref) in refs:
+                continue
+            refs.add((entity_id, widget_ref))
+            page_ref = (device_id, page_index)
+            page_entities.setdefault(page_ref, set()).add(entity_id)
+            self._widgets.setdefault(entity_id, set()).add(widget_ref)
+            pages = self._pages.setdefault(entity_id, {})
+            pages[page_ref] = pages.get(page_ref, 0) + 1
+        for page_ref, entities in page_entities.items():
+            self._page_entities[page_ref] = frozenset(entities)
+        if refs:
+            self._device_refs[device_id] = refs
+
+    def _remove_device(self, device_id: str) -> None:
+        for entity_id, widget_ref in self._device_refs.pop(device_id, ()):
+            widgets = self._widgets.get(entity_id)
+            if widgets is not None:
+                widgets.discard(widget_ref)
+                if not widgets:
+                    del self._widgets[entity_id]
+
+            page_ref = (widget_ref.device_id, widget_ref.page_index)
+            pages = self._pages.get(entity_id)
+            if pages is not None and page_ref in pages:
+                pages[page_ref] -= 1
+                if pages[page_ref] <= 0:
+                    del pages[page_ref]
+                if not pages:
+                    del self._pages[entity_id]
+
+        for page_ref in [ref for ref in self._page_entities if ref[0] == device_id]:
+            del self._page_entities[page_ref]
+
+    def widgets_for(self, entity_id: str) -> FrozenSet[WidgetRef]:
+        """Return every widget that reads the entity."""
+        return frozenset(self._widgets.get(entity_id, ()))
+
+    def pages_for(self, entity_id: str) -> FrozenSet[PageRef]:
+        """Return every (device_id, page_index) whose render reads the entity."""
+        return frozenset(self._pages.get(entity_id, ()))
+
+    def pages_for_entities(self, entity_ids: Iterable[str]) -> Set[PageRef]:
+        """Return the union of affected pages for several entities."""
+        affected: Set[PageRef] = set()
+        for entity_id in entity_ids:
+            affected.update(self._pages.get(entity_id, ()))
+        return affected
+
+    def entities_for_page(self, device_id: str, page_index: int) -> FrozenSet[str]:
+        """Return the entities read by a single page."""
+        return self._page_entities.get((device_id, page_index), frozenset())
+
+    @property
+    def entity_ids(self) -> FrozenSet[str]:
+        """Return every entity referenced by any stored layout."""
+        return frozenset(self._widgets)
+
+    def __contains__(self, entity_id: object) -> bool:
+        return entity_id in self._widgets
@@ -0,0 +1,20 @@
+"""Diagnostics download for the ESPHome Designer config entry."""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> Dict[str, Any]:
+    """Return render timings and cache counters; layouts and device tokens are left out."""
+    data = hass.data.get(DOMAIN, {})
+    storage = data.get("storage")
+    render_service = data.get("render_service")
+    return {
+        "devices": len(storage.state.devices) if storage is not None else 0,
+        "render": render_service.diagnostics() if render_service is not None else None,
+    }
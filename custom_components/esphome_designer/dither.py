@@ -0,0 +1,244 @@
+"""
+Dithering and palette quantization for rendered page canvases.
+
+Panels with only a few ink levels (1-bit and 4-gray e-paper, OEPL tags,
+RGB332 LCDs) show anti-aliased text and gradients far better when the canvas
+is dithered to their palette than when it is simply thresholded.
+
+Error diffusion is inherently sequential, and a per-pixel Python loop over an
+800x480 canvas takes seconds. Every diffusion kernel here only pushes error
+rightwards on its own row and into rows below, so all pixels on a line
+x + slope * y = t are independent of each other. The NumPy path walks those
+lines (width + slope * height steps) and processes each one as a vector,
+which keeps a full frame in the tens of milliseconds. Without NumPy, every
+diffusion mode falls back to Pillow's built-in Floyd-Steinberg.
+
+Mode numbers follow OpenEPaperLink's drawcustom ``dither`` values, which is
+what ``DeviceConfig.oepl_dither`` stores.
+"""
+
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without NumPy
+    np = None
+
+_LOGGER = logging.getLogger(__name__)
+
+Color = Tuple[int, int, int]
+
+DITHER_NONE = 0
+DITHER_ORDERED = 1
+DITHER_BURKES = 2
+DITHER_ATKINSON = 3
+DITHER_FLOYD_STEINBERG = 4
+DITHER_JARVIS_JUDICE_NINKE = 5
+DITHER_STUCKI = 6
+DITHER_SIERRA = 7
+
+# Error diffusion kernels: ((dx, dy, weight), ...), divisor.
+_KERNELS: Dict[int, Tuple[Tuple[Tuple[int, int, int], ...], int]] = {
+    DITHER_FLOYD_STEINBERG: (((1, 0, 7), (-1, 1, 3), (0, 1, 5), (1, 1, 1)), 16),
+    DITHER_ATKINSON: (((1, 0, 1), (2, 0, 1), (-1, 1, 1), (0, 1, 1), (1, 1, 1), (0, 2, 1)), 8),
+    DITHER_BURKES: (((1, 0, 8), (2, 0, 4), (-2, 1, 2), (-1, 1, 4), (0, 1, 8), (1, 1, 4), (2, 1, 2)), 32),
+    DITHER_JARVIS_JUDICE_NINKE: (
+        (
+            (1, 0, 7), (2, 0, 5),
+            (-2, 1, 3), (-1, 1, 5), (0, 1, 7), (1, 1, 5), (2, 1, 3),
+            (-2, 2, 1), (-1, 2, 3), (0, 2, 5), (1, 2, 3), (2, 2, 1),
+        ),
+        48,
+    ),
+    DITHER_STUCKI: (
+        (
+            (1, 0, 8), (2, 0, 4),
+            (-2, 1, 2), (-1, 1, 4), (0, 1, 8), (1, 1, 4), (2, 1, 2),
+            (-2, 2, 1), (-1, 2, 2), (0, 2, 4), (1, 2, 2), (2, 2, 1),
+        ),
+        42,
+    ),
+    DITHER_SIERRA: (
+        (
+            (1, 0, 5), (2, 0, 3),
+            (-2, 1, 2), (-1, 1, 4), (0, 1, 5), (1, 1, 4), (2, 1, 2),
+            (-1, 2, 2), (0, 2, 3), (1, 2, 2),
+        ),
+        32,
+    ),
+}
+
+_BAYER_8 = (
+    (0, 32, 8, 40, 2, 34, 10, 42),
+    (48, 16, 56, 24, 50, 18, 58, 26),
+    (12, 44, 4, 36, 14, 46, 6, 38),
+    (60, 28, 52, 20, 62, 30, 54, 22),
+    (3, 35, 11, 43, 1, 33, 9, 41),
+    (51, 19, 59, 27, 49, 17, 57, 25),
+    (15, 47, 7, 39, 13, 45, 5, 37),
+    (63, 31, 55, 23, 61, 29, 53, 21),
+)
+
+PALETTES: Dict[str, List[Color]] = {
+    "BW": [(0, 0, 0), (255, 255, 255)],
+    "GRAY4": [(0, 0, 0), (85, 85, 85), (170, 170, 170), (255, 255, 255)],
+    "BWR": [(0, 0, 0), (255, 255, 255), (255, 0, 0)],
+    "BWY": [(0, 0, 0), (255, 255, 255), (255, 255, 0)],
+    "6COLOR": [(0, 0, 0), (255, 255, 255), (255, 255, 0), (255, 0, 0), (0, 0, 255), (0, 255, 0)],
+    "7COLOR": [
+        (0, 0, 0), (255, 255, 255), (0, 255, 0), (0, 0, 255), (255, 0, 0), (255, 255, 0), (255, 128, 0),
+    ],
+    # ESPHome's 8BIT display palette is RGB332.
+    "8BIT": [
+        (r * 255 // 7, g * 255 // 7, b * 255 // 3)
+        for r in range(8)
+        for g in range(8)
+        for b in range(4)
+    ],
+}
+
+
+def resolve_palette(name: Optional[str]) -> Optional[List[Color]]:
+    """Look up a palette by name; ESPHome's NONE/GRAYSCALE mean no quantization."""
+    if not name:
+        return None
+    return PALETTES.get(str(name).upper())
+
+
+def dithers_rows_independently(mode: int) -> bool:
+    """Whether a row's output depends only on the row and its y mod 8.
+
+    Such modes can dither a canvas band by band (with band tops on multiples
+    of 8); error diffusion carries error down the image and cannot.
+    """
+    return mode == DITHER_NONE or (mode == DITHER_ORDERED and np is not None)
+
+
+def dither_image(image: Image.Image, palette: Sequence[Color], mode: int = DITHER_FLOYD_STEINBERG) -> Image.Image:
+    """Quantize a canvas to palette using the given dither mode.
+
+    Returns an "L" image for all-gray palettes and an "RGB" image otherwise;
+    every pixel is exactly one of the palette colors.
+    """
+    palette = tuple(tuple(color) for color in palette)
+    gray = all(r == g == b for r, g, b in palette)
+    source = image.convert("L" if gray else "RGB")
+    if np is None:
+        return _dither_with_pillow(source, palette, mode)
+
+    colors = np.asarray([(color[0],) if gray else color for color in palette], dtype=np.float32)
+    lookup = _nearest_lookup(palette, gray)
+    values = np.asarray(source, dtype=np.float32)
+    if gray:
+        values = values[:, :, None]
+
+    if mode == DITHER_NONE:
+        indices = _nearest(values, lookup)
+    elif mode == DITHER_ORDERED:
+        indices = _nearest(values + _ordered_offsets(values.shape, len(palette)), lookup)
+    else:
+        indices = _diffuse(values, colors, lookup, _KERNELS.get(mode, _KERNELS[DITHER_FLOYD_STEINBERG]))
+
+    pixels = colors.astype(np.uint8)[indices]
+    return Image.fromarray(pixels[:, :, 0] if gray else pixels, "L" if gray else "RGB")
+
+
+@lru_cache(maxsize=16)
+def _nearest_lookup(palette: Tuple[Color, ...], gray: bool) -> "np.ndarray":
+    """Map every gray level (or 5-bit RGB cell) to its closest palette index."""
+    if gray:
+        samples = np.arange(256, dtype=np.float32)[:, None]
+        colors = np.asarray([(color[0],) for color in palette], dtype=np.float32)
+    else:
+        cells = np.arange(32, dtype=np.float32) * 8 + 4
+        samples = np.stack(np.meshgrid(cells, cells, cells, indexing="ij"), axis=-1).reshape(-1, 3)
+        colors = np.asarray(palette, dtype=np.float32)
+
+    best = np.zeros(len(samples), dtype=np.intp)
+    best_distance = np.full(len(samples), np.inf, dtype=np.float32)
+    for index, color in enumerate(colors):
+        distance = ((samples - color) ** 2).sum(axis=1)
+        closer = distance < best_distance
+        best[closer] = index
+        best_distance[closer] = distance[closer]
+    return best if gray else best.reshape(32, 32, 32)
+
+
+def _nearest(values: "np.ndarray", lookup: "np.ndarray") -> "np.ndarray":
+    """Return the closest palette index for each pixel of an (..., channels) array."""
+    levels = np.clip(np.rint(values), 0, 255).astype(np.intp)
+    if lookup.ndim == 1:
+        return lookup[levels[..., 0]]
+    levels >>= 3
+    return lookup[levels[..., 0], levels[..., 1], levels[..., 2]]
+
+
+def _ordered_offsets(shape: Tuple[int, ...], palette_size: int) -> "np.ndarray":
+    """Tile an 8x8 Bayer threshold map scaled to the palette's level spacing."""
+    height, width, channels = shape
+    levels = max(2, round(palette_size ** (1.0 / channels)))
+    spread = 255.0 / (levels - 1)
+    matrix = (np.asarray(_BAYER_8, dtype=np.float32) + 0.5) / 64.0 - 0.5
+    tiled = np.tile(matrix, (-(-height // 8), -(-width // 8)))[:height, :width]
+    return (tiled * spread)[:, :, None]
+
+
+def _diffuse(
+    values: "np.ndarray",
+    colors: "np.ndarray",
+    lookup: "np.ndarray",
+    kernel: Tuple[Tuple[Tuple[int, int, int], ...], int],
+) -> "np.ndarray":
+    """Error-diffuse values onto colors, one independent anti-diagonal at a time."""
+    offsets, divisor = kernel
+    height, width, channels = values.shape
+    # Pixel (x, y) feeds (x + dx, y + dy); with t = x + slope * y every target
+    # has a larger t than its source whenever slope > -dx for all dy > 0.
+    slope = 1 + max([-dx for dx, dy, _weight in offsets if dy > 0] + [0])
+    steps = [(dx + slope * dy, dy, weight / divisor) for dx, dy, weight in offsets]
+    span = width + slope * (height - 1)
+
+    # Store pixel (x, y) at skewed[t, y] so each anti-diagonal is one
+    # contiguous slice and every error target is a plain slice too.
+    skewed = np.zeros(
+        (span + max(step for step, _dy, _w in steps), height + max(dy for _s, dy, _w in steps), channels),
+        dtype=np.float32,
+    )
+    for y in range(height):
+        skewed[slope * y:slope * y + width, y] = values[y]
+    skewed_indices = np.zeros((span, height), dtype=np.intp)
+
+    for t in range(span):
+        first = max(0, -(-(t - width + 1) // slope))
+        last = min(height - 1, t // slope) + 1
+        pixels = skewed[t, first:last]
+        nearest = _nearest(pixels, lookup)
+        skewed_indices[t, first:last] = nearest
+        error = pixels - colors[nearest]
+        for step, dy, weight in steps:
+            skewed[t + step, first + dy:last + dy] += error * weight
+
+    indices = np.empty((height, width), dtype=np.intp)
+    for y in range(height):
+        indices[y] = skewed_indices[slope * y:slope * y + width, y]
+    return indices
+
+
+def _dither_with_pillow(source: Image.Image, palette: Sequence[Color], mode: int) -> Image.Image:
+    """Quantize with Pillow's C Floyd-Steinberg when NumPy is unavailable."""
+    if mode not in (DITHER_NONE, DITHER_FLOYD_STEINBERG):
+        _LOGGER.debug("NumPy unavailable; using Floyd-Steinberg instead of dither mode %s", mode)
+    flat: List[int] = [channel for color in palette for channel in color]
+    # Pad with the first color; quantize() considers all 256 palette slots.
+    flat.extend(flat[:3] * (256 - len(palette)))
+    palette_image = Image.new("P", (1, 1))
+    palette_image.putpalette(flat)
+    dither = Image.Dither.NONE if mode == DITHER_NONE else Image.Dither.FLOYDSTEINBERG
+    quantized = source.convert("RGB").quantize(palette=palette_image, dither=dither)
+    return quantized.convert(source.mode)
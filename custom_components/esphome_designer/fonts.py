@@ -0,0 +1,192 @@
+"""
+Process-wide font registry for the page renderer.
+
+Opening a TrueType font parses the whole file, and every widget draw used to
+do that for each font it needed, several times per widget. Fonts are now
+loaded once per (family, size, weight) and kept in a small LRU shared by all
+render workers, and text extents are memoized per (font, text) since labels,
+units and titles are measured with the same strings on every render.
+
+Families are looked up in the component's bundled ``font_ttf`` directory
+first, by file name ("Montserrat-Black.ttf" is Montserrat at weight 900), then
+fall back to DejaVu Sans from the system font path and finally PIL's built-in
+bitmap font. The fonts live inside the component because the release zip
+ships only ``custom_components/esphome_designer``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple, Union
+
+from PIL import ImageFont
+
+from .const import FONT_CACHE_SIZE, TEXT_EXTENT_CACHE_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+BUNDLED_FONT_DIR = Path(__file__).parent / "font_ttf"
+
+DEFAULT_FAMILY = "DejaVu Sans"
+DEFAULT_WEIGHT = 400
+_FALLBACK_FILES = {400: "DejaVuSans.ttf", 700: "DejaVuSans-Bold.ttf"}
+
+_WEIGHT_NAMES = {
+    "thin": 100,
+    "extralight": 200,
+    "light": 300,
+    "regular": 400,
+    "medium": 500,
+    "semibold": 600,
+    "bold": 700,
+    "extrabold": 800,
+    "black": 900,
+}
+
+Font = Union[ImageFont.FreeTypeFont, ImageFont.ImageFont]
+
+
+class FontKey(NamedTuple):
+    """Identify a loaded font face."""
+
+    family: str
+    size: int
+    weight: int
+
+
+def _normalize_family(family: str) -> str:
+    return "".join(ch for ch in family.lower() if ch.isalnum())
+
+
+class FontRegistry:
+    """Load fonts once and memoize text measurements, safely across threads."""
+
+    def __init__(
+        self,
+        font_dirs: Iterable[Path] = (BUNDLED_FONT_DIR,),
+        max_fonts: int = FONT_CACHE_SIZE,
+        max_extents: int = TEXT_EXTENT_CACHE_SIZE,
+    ) -> None:
+        self._font_dirs = tuple(font_dirs)
+        self._max_fonts = max_fonts
+        self._max_extents = max_extents
+        self._fonts: "OrderedDict[FontKey, Font]" = OrderedDict()
+        self._extents: "OrderedDict[Tuple[str, int, str], Tuple[int, int]]" = OrderedDict()
+        self._files: Optional[Dict[str, Dict[int, Path]]] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, size: int | None, family: str | None = None, weight: int | None = None) -> Font:
+        """Return the font for (family, size, weight), loading it on first use."""
+        key = FontKey(
+            _normalize_family(family or DEFAULT_FAMILY),
+            int(size) if size else 18,
+            int(weight) if weight else DEFAULT_WEIGHT,
+        )
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self._fonts.move_to_end(key)
+                self.hits += 1
+                return font
+            self.misses += 1
+
+        # Parse outside the lock; a rare duplicate load is cheaper than
+        # serializing every worker behind one font file.
+        font = self._load(key)
+        with self._lock:
+            self._fonts[key] = font
+            self._fonts.move_to_end(key)
+            while len(self._fonts) > self._max_fonts:
+                self._fonts.popitem(last=False)
+        return font
+
+    def text_size(self, font: Font, text: str) -> Tuple[int, int]:
+        """Return the (width, height) of text's bounding box in font."""
+        path = getattr(font, "path", None)
+        if path is None:
+            return _measure(font, text)
+
+        key = (str(path), getattr(font, "size", 0), text)
+        with self._lock:
+            size = self._extents.get(key)
+            if size is not None:
+                self._extents.move_to_end(key)
+                return size
+
+        size = _measure(font, text)
+        with self._lock:
+            self._extents[key] = size
+            while len(self._extents) > self._max_extents:
+                self._extents.popitem(last=False)
+        return size
+
+    def clear(self) -> None:
+        """Drop loaded fonts, measurements and the font directory scan."""
+        with self._lock:
+            self._fonts.clear()
+            self._extents.clear()
+            self._files = None
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Return load counters and cache sizes."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "fonts": len(self._fonts),
+            "extents": len(self._extents),
+        }
+
+    def _load(self, key: FontKey) -> Font:
+        path = self._find_file(key.family, key.weight)
+        if path is not None:
+            try:
+                return ImageFont.truetype(str(path), key.size)
+            except OSError as err:
+                _LOGGER.warning("Failed to load font %s: %s", path, err)
+
+        fallback = _FALLBACK_FILES[700 if key.weight >= 600 else 400]
+        for name in (fallback, _FALLBACK_FILES[400]):
+            try:
+                return ImageFont.truetype(name, key.size)
+            except OSError:
+                continue
+        return ImageFont.load_default()
+
+    def _find_file(self, family: str, weight: int) -> Optional[Path]:
+        with self._lock:
+            if self._files is None:
+                self._files = self._scan()
+            weights = self._files.get(family)
+        if not weights:
+            return None
+        return weights[min(weights, key=lambda candidate: (abs(candidate - weight), candidate))]
+
+    def _scan(self) -> Dict[str, Dict[int, Path]]:
+        """Index font files by family and weight from their file names."""
+        files: Dict[str, Dict[int, Path]] = {}
+        for font_dir in self._font_dirs:
+            if not font_dir.is_dir():
+                continue
+            for path in sorted(font_dir.rglob("*.[ot]tf")):
+                family, _sep, style = path.stem.rpartition("-")
+                if not family:
+                    family, style = style, "regular"
+                if "italic" in style.lower():
+                    continue
+                weight = _WEIGHT_NAMES.get(style.lower(), DEFAULT_WEIGHT)
+                files.setdefault(_normalize_family(family), {}).setdefault(weight, path)
+        return files
+
+
+def _measure(font: Font, text: str) -> Tuple[int, int]:
+    left, top, right, bottom = font.getbbox(text)
+    return int(right - left), int(bottom - top)
+
+
+FONT_REGISTRY = FontRegistry()
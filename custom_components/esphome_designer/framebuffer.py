@@ -0,0 +1,383 @@
+"""
+Raw framebuffer encodings for device page images.
+
+PNG is convenient for online_image, but it is the most expensive step of a
+render and the device then spends CPU and RAM decoding it again. Panels can
+instead fetch a buffer that is already in the layout their driver keeps in
+RAM:
+
+    1bpp    rows padded to a whole byte, MSB is the leftmost pixel, a set
+            bit is white (waveshare_epaper / epaper_spi clear bits to draw)
+    2bpp    four gray levels, rows padded to a whole byte, leftmost pixel in
+            the top two bits, 0 = black and 3 = white
+    rgb565  two bytes per pixel, big-endian, as ESPHome's image component
+            stores RGB565
+
+The delta container used for partial refresh is:
+
+    header  "<4sIHHBBH": magic b"EDD1", frame seq, canvas width, canvas
+            height, bits per pixel, flags, rectangle count
+    rect    "<HHHH": x, y, w, h followed by the rect's packed pixels
+
+Flag bit 0 marks a full frame (the client's revision was unknown or too old),
+bit 1 a portrait layout. Rect x and width are multiples of 8 so rows start on
+byte boundaries, which is also what controller partial-refresh windows need.
+
+A whole device is fetched at once as a bundle:
+
+    header  "<4sBBHHH": magic b"EDB1", output format code, flags, canvas
+            width, canvas height, page count
+    page    "<HB12sI": page index, page flags, page hash, payload length,
+            followed by the payload encoded in the bundle's output format
+
+Page flag bit 0 marks an elided page: the client already holds a page with
+that hash, and the payload is empty.
+
+Large canvases can also be encoded band by band as they are rendered (see
+renderer.render_page_bands): raw formats are row-local, so packed bands
+simply concatenate, and PNG is written as a stream with one IDAT chunk per
+band.
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from PIL import Image, ImageChops
+
+from .dither import (
+    DITHER_FLOYD_STEINBERG,
+    DITHER_NONE,
+    PALETTES,
+    Color,
+    dither_image,
+    dithers_rows_independently,
+    resolve_palette,
+)
+from .models import DeviceConfig
+from .renderer import Box, encode_png
+
+DELTA_MAGIC = b"EDD1"
+DELTA_HEADER = struct.Struct("<4sIHHBBH")
+DELTA_RECT = struct.Struct("<HHHH")
+DELTA_FLAG_FULL = 0x01
+DELTA_FLAG_PORTRAIT = 0x02
+
+BUNDLE_MAGIC = b"EDB1"
+BUNDLE_HEADER = struct.Struct("<4sBBHHH")
+BUNDLE_PAGE = struct.Struct("<HB12sI")
+BUNDLE_FLAG_PORTRAIT = 0x02
+BUNDLE_PAGE_UNCHANGED = 0x01
+
+FORMAT_PNG = "png"
+FORMAT_1BPP = "1bpp"
+FORMAT_2BPP = "2bpp"
+FORMAT_RGB565 = "rgb565"
+
+# Output format -> code used in binary containers.
+FORMAT_CODES: Dict[str, int] = {FORMAT_PNG: 0, FORMAT_1BPP: 1, FORMAT_2BPP: 2, FORMAT_RGB565: 3}
+
+# Output format -> response content type.
+OUTPUT_FORMATS: Dict[str, str] = {
+    FORMAT_PNG: "image/png",
+    FORMAT_1BPP: "application/octet-stream",
+    FORMAT_2BPP: "application/octet-stream",
+    FORMAT_RGB565: "application/octet-stream",
+}
+
+# Bundled device profiles (see frontend/js/io/devices.js) by display type.
+# Color e-paper panels use vendor palettes none of the raw formats cover, so
+# they stay on PNG, as do models this table does not know.
+_MONO_EPAPER_MODELS = frozenset({
+    "reterminal_e1001",
+    "trmnl_diy_esp32s3",
+    "trmnl",
+    "seeed_xiao_epaper_75",
+    "raspberry_pi_pico_w_waveshare_2_13_v3",
+    "raspberry_pi_pico_2_w_waveshare_2_13_v3",
+    "m5stack_coreink",
+    "lilygo_t5_47",
+})
+_GRAY_EPAPER_MODELS = frozenset({"reterminal_e1003", "m5stack_paper"})
+_LCD_MODELS = frozenset({
+    "waveshare_esp32_s3_touch_lcd_7",
+    "waveshare_esp32_s3_touch_lcd_4_3",
+    "guition_esp32_jc4832w535",
+    "guition_esp32_jc8048w535",
+    "m5stack_tab5",
+    "guition_esp32_p4_jc4880p443",
+    "guition_esp32_p4_jc8012p4a1c",
+    "elecrow_esp32_p4_9inch_v1_2",
+    "elecrow_esp32_7inch",
+    "geekmagic_mini_esp8266",
+    "geekmagic_pro_esp32",
+})
+_COLOR_EPAPER_PALETTES = {
+    "reterminal_e1002": "6COLOR",
+    "reterminal_e1004": "6COLOR",
+    "esp32_s3_photopainter": "7COLOR",
+}
+# OEPL / OpenDisplay protocol hardware colorMode -> palette.
+_PROTOCOL_PALETTES = {"bw": "BW", "grayscale": "GRAY4", "color_3": "BWR"}
+# Formats whose bit depth fixes the palette regardless of the panel.
+_FORMAT_PALETTES = {FORMAT_1BPP: PALETTES["BW"], FORMAT_2BPP: PALETTES["GRAY4"]}
+
+
+def default_output_format(device: DeviceConfig) -> str:
+    """Pick the raw format a device's display driver consumes directly."""
+    tech = str((device.custom_hardware or {}).get("tech") or "").lower()
+    if tech == "epaper":
+        return FORMAT_1BPP
+    if tech == "lcd":
+        return FORMAT_RGB565
+    if device.device_model in _MONO_EPAPER_MODELS:
+        return FORMAT_1BPP
+    if device.device_model in _GRAY_EPAPER_MODELS:
+        return FORMAT_2BPP
+    if device.device_model in _LCD_MODELS:
+        return FORMAT_RGB565
+    return FORMAT_PNG
+
+
+def device_dither(
+    device: DeviceConfig, features: Optional[Mapping[str, Any]] = None
+) -> Tuple[Optional[List[Color]], int]:
+    """Return the (palette, dither mode) a device's frames are quantized with.
+
+    features are the display features of the device's hardware template
+    (see hardware_templates.py). A palette set on the custom hardware wins,
+    then the template's, then the protocol color mode of OEPL / OpenDisplay
+    layouts, then known color e-paper models. OEPL layouts use their
+    configured dither; other panels with a declared palette get
+    Floyd-Steinberg and the rest are thresholded.
+    """
+    hardware = device.custom_hardware or {}
+    palette = resolve_palette(hardware.get("color_palette") or hardware.get("colorPalette"))
+    if palette is None and features:
+        palette = resolve_palette(features.get("color_palette"))
+    if palette is None and device.rendering_mode in ("oepl", "opendisplay"):
+        palette = resolve_palette(_PROTOCOL_PALETTES.get((device.protocol_hardware or {}).get("colorMode")))
+    if palette is None:
+        palette = resolve_palette(_COLOR_EPAPER_PALETTES.get(device.device_model))
+
+    if device.rendering_mode == "oepl":
+        mode = device.oepl_dither
+    else:
+        mode = DITHER_FLOYD_STEINBERG if palette is not None else DITHER_NONE
+    return palette, mode
+
+
+def pack_1bpp(image: Image.Image) -> bytes:
+    """Threshold a grayscale canvas and pack it MSB-first, 1 = white."""
+    return image.convert("1", dither=Image.Dither.NONE).tobytes()
+
+
+def pack_2bpp(image: Image.Image) -> bytes:
+    """Quantize a canvas to four gray levels and pack four pixels per byte."""
+    gray = image.convert("L")
+    width, height = gray.size
+    padded_width = -(-width // 4) * 4
+    if padded_width != width:
+        padded = Image.new("L", (padded_width, height), 0)
+        padded.paste(gray, (0, 0))
+        gray = padded
+
+    # Every byte holds 0..3 and rows are a multiple of four pixels, so pixel
+    # i of each group lands in its own bit pair of the output byte without
+    # carrying into its neighbours.
+    levels = gray.point(lambda value: value >> 6).tobytes()
+    packed = 0
+    for offset, shift in enumerate((6, 4, 2, 0)):
+        packed |= int.from_bytes(levels[offset::4], "big") << shift
+    return packed.to_bytes(len(levels) // 4, "big")
+
+
+def pack_rgb565(image: Image.Image) -> bytes:
+    """Convert a canvas to big-endian RGB565."""
+    red, green, blue = image.convert("RGB").split()
+    # The bit fields never overlap, so a saturating add acts as bitwise OR.
+    high = ImageChops.add(red.point(lambda value: value & 0xF8), green.point(lambda value: value >> 5))
+    low = ImageChops.add(
+        green.point(lambda value: ((value >> 2) & 0x07) << 5),
+        blue.point(lambda value: value >> 3),
+    )
+    return Image.merge("LA", (high, low)).tobytes()
+
+
+_ENCODERS: Dict[str, Any] = {
+    FORMAT_PNG: encode_png,
+    FORMAT_1BPP: pack_1bpp,
+    FORMAT_2BPP: pack_2bpp,
+    FORMAT_RGB565: pack_rgb565,
+}
+
+
+def encode_framebuffer(
+    image: Image.Image,
+    output_format: str,
+    palette: Optional[List[Color]] = None,
+    dither_mode: int = DITHER_NONE,
+) -> bytes:
+    """Encode a rendered canvas in one of OUTPUT_FORMATS, dithering it first if asked."""
+    try:
+        encoder = _ENCODERS[output_format]
+    except KeyError:
+        raise ValueError(f"Unsupported output format: {output_format}") from None
+    palette = _FORMAT_PALETTES.get(output_format, palette)
+    if palette is not None and dither_mode != DITHER_NONE:
+        image = dither_image(image, palette, dither_mode)
+    return encoder(image)
+
+
+def encode_for_device(
+    image: Image.Image,
+    device: DeviceConfig,
+    output_format: str,
+    features: Optional[Mapping[str, Any]] = None,
+) -> bytes:
+    """Encode a canvas with the palette and dither mode of the device's profile."""
+    palette, dither_mode = device_dither(device, features)
+    return encode_framebuffer(image, output_format, palette, dither_mode)
+
+
+def supports_bands(
+    device: DeviceConfig, output_format: str, features: Optional[Mapping[str, Any]] = None
+) -> bool:
+    """Whether the device's encoding of output_format can run band by band."""
+    palette, dither_mode = device_dither(device, features)
+    palette = _FORMAT_PALETTES.get(output_format, palette)
+    return palette is None or dithers_rows_independently(dither_mode)
+
+
+def encode_bands_for_device(
+    bands: Iterable[Image.Image],
+    device: DeviceConfig,
+    output_format: str,
+    width: int,
+    height: int,
+    features: Optional[Mapping[str, Any]] = None,
+) -> Iterator[bytes]:
+    """Encode canvas bands as they arrive, yielding one chunk per band.
+
+    The chunks concatenate to a valid payload in output_format; they match
+    encode_for_device byte for byte except for PNG, which is written without
+    row filters. Check supports_bands first: error-diffusion dithering needs
+    the whole canvas and raises ValueError here.
+    """
+    if output_format not in _ENCODERS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    palette, dither_mode = device_dither(device, features)
+    palette = _FORMAT_PALETTES.get(output_format, palette)
+    if palette is not None and dither_mode != DITHER_NONE:
+        if not dithers_rows_independently(dither_mode):
+            raise ValueError(f"Dither mode {dither_mode} cannot be applied band by band")
+        bands = (dither_image(band, palette, dither_mode) for band in bands)
+
+    if output_format == FORMAT_PNG:
+        yield from _stream_png(bands, width, height)
+        return
+    encoder = _ENCODERS[output_format]
+    for band in bands:
+        yield encoder(band)
+
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_COLOR_TYPES = {"L": 0, "RGB": 2}
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def _stream_png(bands: Iterable[Image.Image], width: int, height: int) -> Iterator[bytes]:
+    """Write an 8-bit gray or RGB PNG one IDAT chunk per band.
+
+    The header goes out with the first band so a render failure surfaces
+    before anything is sent. Each band is sync-flushed, which costs a little
+    compression but lets its rows leave immediately.
+    """
+    compressor = zlib.compressobj(6)
+    header: Optional[bytes] = None
+    for band in bands:
+        if header is None:
+            ihdr = struct.pack(">IIBBBBB", width, height, 8, _PNG_COLOR_TYPES[band.mode], 0, 0, 0)
+            header = _PNG_SIGNATURE + _png_chunk(b"IHDR", ihdr)
+        else:
+            header = b""
+        raw = band.tobytes()
+        stride = len(raw) // band.height
+        # Filter type 0 (None) byte in front of every row.
+        rows = b"".join(b"\x00" + raw[offset:offset + stride] for offset in range(0, len(raw), stride))
+        yield header + _png_chunk(b"IDAT", compressor.compress(rows) + compressor.flush(zlib.Z_SYNC_FLUSH))
+    yield _png_chunk(b"IDAT", compressor.flush()) + _png_chunk(b"IEND", b"")
+
+
+def align_box(box: Box, width: int, height: int) -> Box:
+    """Widen a box horizontally to byte boundaries and clip it to the canvas."""
+    x1, y1, x2, y2 = box
+    x1 = max(0, (x1 // 8) * 8)
+    x2 = min(width, -(-x2 // 8) * 8)
+    return x1, max(0, y1), x2, min(height, y2)
+
+
+def merge_boxes(boxes: Iterable[Box], width: int, height: int) -> List[Box]:
+    """Align boxes and merge overlapping ones so no pixel is sent twice."""
+    merged: List[Box] = []
+    for box in boxes:
+        box = align_box(box, width, height)
+        if box[0] >= box[2] or box[1] >= box[3]:
+            continue
+        changed = True
+        while changed:
+            changed = False
+            for other in merged:
+                if box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]:
+                    merged.remove(other)
+                    box = (min(box[0], other[0]), min(box[1], other[1]), max(box[2], other[2]), max(box[3], other[3]))
+                    changed = True
+                    break
+        merged.append(box)
+    return sorted(merged, key=lambda b: (b[1], b[0]))
+
+
+def encode_delta(
+    image: Image.Image,
+    boxes: List[Box] | None,
+    seq: int,
+    portrait: bool = False,
+) -> bytes:
+    """Encode the given regions of a canvas; boxes=None sends the full frame."""
+    width, height = image.size
+    flags = DELTA_FLAG_PORTRAIT if portrait else 0
+    if boxes is None:
+        flags |= DELTA_FLAG_FULL
+        rects = [(0, 0, width, height)]
+    else:
+        rects = merge_boxes(boxes, width, height)
+
+    parts = [DELTA_HEADER.pack(DELTA_MAGIC, seq, width, height, 1, flags, len(rects))]
+    for x1, y1, x2, y2 in rects:
+        parts.append(DELTA_RECT.pack(x1, y1, x2 - x1, y2 - y1))
+        parts.append(pack_1bpp(image.crop((x1, y1, x2, y2))))
+    return b"".join(parts)
+
+
+def encode_bundle(
+    pages: List[Tuple[int, bytes, Optional[bytes]]],
+    output_format: str,
+    width: int,
+    height: int,
+    portrait: bool = False,
+) -> bytes:
+    """Pack (page_index, page_hash, payload or None if unchanged) records into a bundle."""
+    flags = BUNDLE_FLAG_PORTRAIT if portrait else 0
+    parts = [BUNDLE_HEADER.pack(BUNDLE_MAGIC, FORMAT_CODES[output_format], flags, width, height, len(pages))]
+    for page_index, page_hash, payload in pages:
+        if payload is None:
+            parts.append(BUNDLE_PAGE.pack(page_index, BUNDLE_PAGE_UNCHANGED, page_hash, 0))
+        else:
+            parts.append(BUNDLE_PAGE.pack(page_index, 0, page_hash, len(payload)))
+            parts.append(payload)
+    return b"".join(parts)
@@ -0,0 +1,204 @@
+"""
+Hardware templates: the ESPHome display packages a device layout is built on.
+
+Templates are the YAML files bundled in frontend/hardware plus the custom
+profiles users upload to <config>/esphomedesigner_custom_profiles. The editor
+lists them through api/hardware.py; the render service reads their display
+features (e.g. color_palette) to encode frames the way the panel shows them.
+Everything here reads files, so call it from an executor.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import yaml
+
+_LOGGER = logging.getLogger(__name__)
+
+BUNDLED_HARDWARE_DIR = Path(__file__).parent / "frontend" / "hardware"
+CUSTOM_PROFILES_DIR = "esphomedesigner_custom_profiles"
+
+
+def read_template_sources(hardware_dir: Path, custom_profiles_dir: Path) -> List[Tuple[Path, bool, str]]:
+    """Read (path, is_custom, content) of every template, bundled ones first."""
+    sources: List[Tuple[Path, bool, str]] = []
+    for scan_dir, is_custom in ((hardware_dir, False), (custom_profiles_dir, True)):
+        if not scan_dir.exists():
+            continue
+
+        for yaml_file in scan_dir.glob("*.yaml"):
+            sources.append((yaml_file, is_custom, yaml_file.read_text(encoding="utf-8")))
+
+    return sources
+
+
+def describe_template(yaml_file: Path, is_custom: bool, content: str) -> Dict[str, Any]:
+    """Build the editor's description of one template from its YAML source."""
+    name = yaml_file.stem
+    width = 800
+    height = 480
+    shape = "rect"
+    features: dict[str, Any] = {"psram": True, "lcd": True}
+
+    # Parse metadata from comments
+    name_match = re.search(r"#\s*Name:\s*(.*)", content, re.IGNORECASE)
+    if name_match:
+        name = name_match.group(1).strip()
+
+    target_device_match = re.search(r"#\s*TARGET DEVICE:\s*(.*)", content, re.IGNORECASE)
+    if target_device_match:
+        name = target_device_match.group(1).strip()
+
+    res_match = re.search(r"#\s*Resolution:\s*(\d+)x(\d+)", content, re.IGNORECASE)
+    if res_match:
+        width = int(res_match.group(1))
+        height = int(res_match.group(2))
+
+    shape_match = re.search(r"#\s*Shape:\s*(rect|round)", content, re.IGNORECASE)
+    if shape_match:
+        shape = shape_match.group(1).lower()
+
+    inv_match = re.search(r"#\s*Inverted:\s*(true|yes|1)", content, re.IGNORECASE)
+    if inv_match:
+        features["inverted_colors"] = True
+
+    # Detect chip and board from early comments or platform blocks
+    chip = "esp32"
+    board = None
+
+    esp8266_match = re.search(r"^\s*esp8266:", content, re.MULTILINE)
+    rp2_match = re.search(r"^\s*rp2:", content, re.MULTILINE)
+    if esp8266_match:
+        chip = "esp8266"
+    elif rp2_match:
+        chip = "rp2040"
+    else:
+        esp32_match = re.search(r"^\s*esp32:", content, re.MULTILINE)
+        if esp32_match:
+            # Try to infer specific esp32 variant
+            if "esp32-s3" in content.lower():
+                chip = "esp32-s3"
+            elif "esp32-c3" in content.lower():
+                chip = "esp32-c3"
+            elif "esp32-c6" in content.lower():
+                chip = "esp32-c6"
+            elif "esp32-p4" in content.lower() or "esp32p4" in content.lower():
+                chip = "esp32-p4"
+            else:
+                chip = "esp32"
+
+    board_match = re.search(r"^\s*board:\s*([^\n]+)", content, re.MULTILINE)
+    if board_match:
+        board = board_match.group(1).strip()
+        if rp2_match:
+            chip = "rp2350" if "pico2" in board.lower() or "rp2350" in board.lower() else "rp2040"
+        elif not esp8266_match:
+            if "s3" in board.lower():
+                chip = "esp32-s3"
+            elif "c3" in board.lower():
+                chip = "esp32-c3"
+            elif "c6" in board.lower():
+                chip = "esp32-c6"
+            elif "p4" in board.lower():
+                chip = "esp32-p4"
+
+    # Support explicit comment overrides
+    chip_comment_match = re.search(r"#\s*Chip:\s*(.*)", content, re.IGNORECASE)
+    if chip_comment_match:
+        chip = chip_comment_match.group(1).strip()
+
+    board_comment_match = re.search(r"#\s*Board:\s*(.*)", content, re.IGNORECASE)
+    if board_comment_match:
+        board = board_comment_match.group(1).strip()
+
+    is_epaper = "waveshare_epaper" in content or "epaper_spi" in content or "it8951" in content
+    if is_epaper:
+        features["epaper"] = True
+        features["lcd"] = False
+        features["lvgl"] = "lvgl:" in content
+    else:
+        features["lvgl"] = True
+
+    try:
+        data = yaml.safe_load(content)
+        if data and "display" in data:
+            display = data["display"]
+            if isinstance(display, list) and len(display) > 0:
+                disp = display[0]
+                if "dimensions" in disp:
+                    width = disp["dimensions"].get("width", width)
+                    height = disp["dimensions"].get("height", height)
+
+                # Extract display-specific settings
+                if "color_palette" in disp:
+                    features["color_palette"] = disp["color_palette"]
+                if "color_order" in disp:
+                    features["color_order"] = disp["color_order"]
+                if "update_interval" in disp:
+                    features["update_interval"] = disp["update_interval"]
+                if "invert_colors" in disp:
+                    features["invert_colors"] = disp["invert_colors"]
+
+                platform = disp.get("platform", "")
+                if "epaper" in platform or "it8951" in platform:
+                    features["epaper"] = True
+                    features["lcd"] = False
+                    features["inverted_colors"] = True
+    except Exception:  # noqa: BLE001
+        pass
+
+    clean_id = yaml_file.stem.replace("-", "_").replace(".", "_")
+
+    # Custom profiles get a prefix to avoid ID collisions with built-in
+    if is_custom:
+        clean_id = f"custom_{clean_id}"
+
+    # Determine hardware package path
+    if is_custom:
+        hw_package = f"esphomedesigner_custom_profiles/{yaml_file.name}"
+    else:
+        hw_package = f"hardware/{yaml_file.name}"
+
+    return {
+        "id": clean_id,
+        "name": name,
+        "isPackageBased": True,
+        "isCustomProfile": is_custom,
+        "hardwarePackage": hw_package,
+        "resolution": {"width": width, "height": height},
+        "shape": shape,
+        "chip": chip,
+        "board": board,
+        "features": features
+    }
+
+
+def describe_templates(sources: List[Tuple[Path, bool, str]]) -> List[Dict[str, Any]]:
+    """Describe every readable template; the first one with a given id wins."""
+    templates = []
+    seen_ids = set()
+    for yaml_file, is_custom, content in sources:
+        try:
+            template = describe_template(yaml_file, is_custom, content)
+        except Exception as e:  # noqa: BLE001
+            _LOGGER.error("Failed to parse hardware template %s: %s", yaml_file, e)
+            continue
+
+        # Skip duplicates (custom profiles override built-in if same name)
+        if template["id"] in seen_ids:
+            continue
+        seen_ids.add(template["id"])
+        templates.append(template)
+        _LOGGER.debug("Loaded profile '%s' from %s", template["id"], yaml_file)
+
+    return templates
+
+
+def load_template_features(config_dir: str) -> Dict[str, Dict[str, Any]]:
+    """Return the display features of every template, keyed by template id."""
+    sources = read_template_sources(BUNDLED_HARDWARE_DIR, Path(config_dir) / CUSTOM_PROFILES_DIR)
+    return {template["id"]: template["features"] for template in describe_templates(sources)}
@@ -0,0 +1,300 @@
+"""
+Downsampled entity history for server-rendered graph widgets.
+
+Panels used to fetch CSV history from the history proxy and plot it
+themselves, which takes seconds on ESP8266/ESP32 boards. Graph widgets are
+drawn by the renderer instead, from a series reduced on the host to one
+(min, max) pair per pixel column, so drawing costs the same however many
+state changes the recorder holds.
+
+A series window ends on a multiple of its refresh step: one column's time
+span, but at least HISTORY_REFRESH_MIN_S. Every render within a step reuses
+the same cached series, and the recorder is queried again only when the
+graph would move. Pages holding a graph expire from the render cache at the
+same boundary (see renderer.page_valid_until). The entity's current state is
+folded into the last column at draw time, so a new value shows up right away.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from homeassistant.core import HomeAssistant
+
+from .const import HISTORY_CACHE_MAX_SERIES, HISTORY_REFRESH_MIN_S
+
+_LOGGER = logging.getLogger(__name__)
+
+# Graph durations without a usable value default to one hour, like the editor.
+DEFAULT_DURATION_S = 3600
+
+# Duration unit prefix -> seconds; matches parseDuration in the editor's graph_helpers.js.
+_DURATION_UNITS = (("s", 1), ("m", 60), ("h", 3600), ("d", 86400), ("w", 604800))
+
+# One pixel column: (min, max) of the values it covers, or None for no data.
+Column = Optional[Tuple[float, float]]
+Series = Tuple[Column, ...]
+
+
+class SeriesKey(NamedTuple):
+    """Identify a downsampled series by what it plots and at what width."""
+
+    entity_id: str
+    duration_s: int
+    width: int
+
+
+def parse_duration(value: Any, default: int = DEFAULT_DURATION_S) -> int:
+    """Parse a graph duration such as "15min", "1h", "1w" or 90 into seconds."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        seconds = float(value)
+    else:
+        text = str(value or "").strip().lower()
+        number = text.rstrip("abcdefghijklmnopqrstuvwxyz")
+        unit = text[len(number):]
+        try:
+            seconds = float(number)
+        except ValueError:
+            return default
+        if unit:
+            factor = next((factor for prefix, factor in _DURATION_UNITS if unit.startswith(prefix)), None)
+            if factor is None:
+                return default
+            seconds *= factor
+    return int(seconds) if seconds >= 1 else default
+
+
+def refresh_step(key: SeriesKey) -> float:
+    """Return the seconds between re-queries of a series."""
+    return max(key.duration_s / max(key.width, 1), HISTORY_REFRESH_MIN_S)
+
+
+def series_window(key: SeriesKey, now: float) -> Tuple[float, float]:
+    """Return the (start, end) epoch seconds a series covers at time now."""
+    step = refresh_step(key)
+    end = math.floor(now / step) * step
+    return end - key.duration_s, end
+
+
+def series_valid_until(key: SeriesKey, now: float) -> float:
+    """Return when the series covering now is replaced by the next one."""
+    return series_window(key, now)[1] + refresh_step(key)
+
+
+def downsample(points: Sequence[Tuple[float, Optional[float]]], start: float, end: float, width: int) -> Series:
+    """Reduce (timestamp, value) points to one (min, max) pair per column.
+
+    States hold until the next change, so every column starts from the value
+    carried in, which keeps the plotted line connected across columns. A None
+    value (unavailable, non-numeric) leaves a gap until the next number.
+    Points before start seed the first column.
+    """
+    if width <= 0:
+        return ()
+    span = (end - start) / width
+    columns: List[Column] = []
+    current: Optional[float] = None
+    index = 0
+    for column in range(width):
+        column_end = start + (column + 1) * span
+        low = high = current
+        while index < len(points) and points[index][0] < column_end:
+            current = points[index][1]
+            if current is not None:
+                low = current if low is None else min(low, current)
+                high = current if high is None else max(high, current)
+            index += 1
+        columns.append(None if low is None else (low, high))
+    return tuple(columns)
+
+
+def _numeric_points(states: List[Dict[str, Any]]) -> List[Tuple[float, Optional[float]]]:
+    """Convert formatted history entries into sorted (timestamp, value) points."""
+    points: List[Tuple[float, Optional[float]]] = []
+    for entry in states:
+        try:
+            stamp = datetime.fromisoformat(entry.get("last_changed") or entry.get("last_updated") or "").timestamp()
+        except (TypeError, ValueError):
+            continue
+        try:
+            value: Optional[float] = float(entry.get("state"))
+        except (TypeError, ValueError):
+            value = None
+        if value is not None and not math.isfinite(value):
+            value = None
+        points.append((stamp, value))
+    points.sort(key=lambda point: point[0])
+    return points
+
+
+async def async_get_history(
+    hass: HomeAssistant, entity_id: str, start_time: datetime, end_time: datetime
+) -> List[Dict[str, Any]]:
+    """Get an entity's states between two times using HA's recorder.
+
+    Entries are {"state", "last_changed", "last_updated"} with ISO timestamps.
+    Without recorder data the current state is returned as the only entry.
+    """
+    try:
+        # Try importing from recorder.history (HA 2023+)
+        from homeassistant.components.recorder.history import get_significant_states
+        from homeassistant.components.recorder import get_instance
+
+        recorder = get_instance(hass)
+        if not recorder:
+            _LOGGER.debug("Recorder not found/not ready yet, using fallback for %s", entity_id)
+            raise ImportError("Recorder not found")
+
+        # Use the async wrapper for get_significant_states
+        history_data = await recorder.async_add_executor_job(
+            get_significant_states,
+            hass,
+            start_time,
+            end_time,
+            [entity_id],  # entity_ids as list
+            None,  # filters
+            True,  # include_start_time_state
+            False,  # significant_changes_only
+            True,   # minimal_response
+            True,   # no_attributes
+        )
+
+        formatted = _format_history(history_data, entity_id)
+        return formatted if formatted else _current_state_fallback(hass, entity_id)
+
+    except Exception as err:
+        _LOGGER.debug("get_significant_states unavailable or failed (%s), trying alternate method for %s", err, entity_id)
+
+        # Fallback: Try state_changes_during_period with newer signature
+        try:
+            from homeassistant.components.recorder.history import state_changes_during_period
+            from homeassistant.components.recorder import get_instance
+
+            recorder = get_instance(hass)
+            if not recorder:
+                raise ImportError("Recorder still missing")
+
+            history_data = await recorder.async_add_executor_job(
+                state_changes_during_period,
+                hass,
+                start_time,
+                end_time,
+                entity_id,
+                True,   # no_attributes
+                False,  # descending
+                None,   # limit
+                True,   # include_start_time_state
+            )
+
+            formatted = _format_history(history_data, entity_id)
+            return formatted if formatted else _current_state_fallback(hass, entity_id)
+
+        except Exception as inner_err:
+            _LOGGER.debug("state_changes_during_period also failed (%s) for %s, using current state fallback", inner_err, entity_id)
+            return _current_state_fallback(hass, entity_id)
+
+
+def _format_history(history_data: dict, entity_id: str) -> list:
+    """Format history data to a simple list of state objects."""
+    states = []
+    if isinstance(history_data, dict) and entity_id in history_data:
+        for state in history_data[entity_id]:
+            states.append({
+                "state": state.state,
+                "last_changed": state.last_changed.isoformat() if state.last_changed else None,
+                "last_updated": state.last_updated.isoformat() if state.last_updated else None,
+            })
+    return states
+
+
+def _current_state_fallback(hass: HomeAssistant, entity_id: str) -> list:
+    """Return the current state as a single history entry when recorder data is unavailable."""
+    try:
+        state = hass.states.get(entity_id)
+        if state:
+            return [{
+                "state": state.state,
+                "last_changed": state.last_changed.isoformat() if state.last_changed else None,
+                "last_updated": state.last_updated.isoformat() if state.last_updated else None,
+            }]
+    except Exception as final_err:  # noqa: BLE001
+        _LOGGER.error("Failed to get current state fallback for %s: %s", entity_id, final_err)
+    return []
+
+
+HistoryFetcher = Callable[[HomeAssistant, str, datetime, datetime], Awaitable[List[Dict[str, Any]]]]
+
+
+class HistorySeriesCache:
+    """LRU of downsampled series, each reused until its window moves on."""
+
+    def __init__(
+        self,
+        fetch: HistoryFetcher = async_get_history,
+        max_series: int = HISTORY_CACHE_MAX_SERIES,
+    ) -> None:
+        self._fetch = fetch
+        self._max_series = max(1, max_series)
+        # key -> (window end, series)
+        self._entries: "OrderedDict[SeriesKey, Tuple[float, Series]]" = OrderedDict()
+        self._pending: Dict[Tuple[SeriesKey, float], "asyncio.Task[Series]"] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def async_series(self, hass: HomeAssistant, key: SeriesKey, now: Optional[float] = None) -> Series:
+        """Return the series for key's current window, querying the recorder if needed."""
+        start, end = series_window(key, time.time() if now is None else now)
+        cached = self._entries.get(key)
+        if cached is not None and cached[0] == end:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+        # Panels polling together share one query per window.
+        pending = self._pending.get((key, end))
+        if pending is None:
+            self.misses += 1
+            pending = asyncio.ensure_future(self._async_load(hass, key, start, end))
+            self._pending[(key, end)] = pending
+            pending.add_done_callback(lambda _task: self._pending.pop((key, end), None))
+        return await asyncio.shield(pending)
+
+    async def _async_load(self, hass: HomeAssistant, key: SeriesKey, start: float, end: float) -> Series:
+        try:
+            states = await self._fetch(
+                hass,
+                key.entity_id,
+                datetime.fromtimestamp(start, timezone.utc),
+                datetime.fromtimestamp(end, timezone.utc),
+            )
+        except Exception as err:  # noqa: BLE001
+            # A graph without history still renders its frame; retry next render.
+            _LOGGER.warning("Failed to load history for %s: %s", key.entity_id, err)
+            return (None,) * key.width
+
+        series = downsample(_numeric_points(states), start, end, key.width)
+        self._entries[key] = (end, series)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_series:
+            self._entries.popitem(last=False)
+        return series
+
+    def clear(self) -> None:
+        """Drop every cached series."""
+        self._entries.clear()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and cache size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "max_entries": self._max_series,
+        }
@@ -7,6 +7,7 @@ from __future__ import annotations
 import logging
 from homeassistant.core import HomeAssistant
 
+from .render_service import RenderService
 from .storage import DashboardStorage
 from .api.layout import (
     ReTerminalLayoutView, 
@@ -29,11 +30,22 @@ from .api.hardware import (
     ReTerminalHardwarePackageView,
     ReTerminalHardwareUploadView,
 )
+from .api.diagnostics import ReTerminalRenderDiagnosticsView
 from .api.history import HistoryProxyView
+from .api.image import (
+    ReTerminalDeviceBundleView,
+    ReTerminalPageDeltaView,
+    ReTerminalPageFramebufferView,
+    ReTerminalPageImageView,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
-async def async_register_http_views(hass: HomeAssistant, storage: DashboardStorage) -> None:
+async def async_register_http_views(
+    hass: HomeAssistant,
+    storage: DashboardStorage,
+    render_service: RenderService,
+) -> None:
     """Register all HTTP views with the Home Assistant application."""
     
     views = [
@@ -42,6 +54,13 @@ async def async_register_http_views(hass: HomeAssistant, storage: DashboardStora
         ReTerminalLayoutsListView(hass, storage),
         ReTerminalLayoutDetailView(hass, storage),
         
+        # Device images
+        ReTerminalPageImageView(hass, storage, render_service),
+        ReTerminalPageFramebufferView(hass, storage, render_service),
+        ReTerminalPageDeltaView(hass, storage, render_service),
+        ReTerminalDeviceBundleView(hass, storage, render_service),
+        ReTerminalRenderDiagnosticsView(hass, render_service),
+
         # Entities & Proxies
         ReTerminalEntitiesView(hass),
         ReTerminalImageProxyView(hass),
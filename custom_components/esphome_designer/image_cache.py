@@ -0,0 +1,141 @@
+"""
+Decoded-bitmap cache for image widgets.
+
+Decoding a JPEG or PNG logo, scaling it to the widget and quantizing it is
+by far the most expensive widget to draw, and the result only changes when
+the file does. Bitmaps are therefore cached per (path, mtime, target size,
+image type, dither, invert) in a byte-bounded LRU, turning every later draw
+into a paste. Keying on mtime means replacing a file is picked up on the
+next render without any invalidation.
+
+Bitmaps match what ESPHome's ``image:`` component produces for the widget:
+scaled to fit the widget box with the aspect ratio kept, transparent areas
+on white, and BINARY images dithered to black and white.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .const import IMAGE_CACHE_MAX_BYTES
+from .dither import DITHER_FLOYD_STEINBERG, DITHER_NONE, PALETTES, dither_image
+
+_LOGGER = logging.getLogger(__name__)
+
+# ESPHome image dither option -> dither mode.
+_DITHER_MODES = {"FLOYDSTEINBERG": DITHER_FLOYD_STEINBERG, "NONE": DITHER_NONE}
+
+
+class BitmapKey(NamedTuple):
+    """Identify a decoded bitmap by its source file version and rendering."""
+
+    path: str
+    mtime_ns: int
+    size: Tuple[int, int]
+    image_type: str
+    dither: str
+    invert: bool
+
+
+class DecodedImageCache:
+    """LRU of widget-ready bitmaps bounded by their pixel bytes."""
+
+    def __init__(self, max_bytes: int = IMAGE_CACHE_MAX_BYTES) -> None:
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[BitmapKey, Optional[Image.Image]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def bitmap(
+        self,
+        path: Path,
+        size: Tuple[int, int],
+        image_type: str = "BINARY",
+        dither: str = "FLOYDSTEINBERG",
+        invert: bool = False,
+    ) -> Optional[Image.Image]:
+        """Return path decoded for a widget of size, or None if it cannot be read.
+
+        Returned images are shared between renders and must not be modified.
+        """
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError:
+            return None
+        key = BitmapKey(str(path), mtime_ns, size, image_type.upper(), dither.upper(), bool(invert))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Decode outside the lock so one large file does not stall other workers.
+        bitmap = _decode(key)
+        with self._lock:
+            # Unreadable files are remembered as None until their mtime changes.
+            if key not in self._entries:
+                self._entries[key] = bitmap
+                self._bytes += _size_of(bitmap)
+            while self._bytes > self._max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= _size_of(evicted)
+        return bitmap
+
+    def clear(self) -> None:
+        """Drop every cached bitmap."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and memory usage."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
+        }
+
+
+def _size_of(bitmap: Optional[Image.Image]) -> int:
+    if bitmap is None:
+        return 0
+    return bitmap.width * bitmap.height * len(bitmap.getbands())
+
+
+def _decode(key: BitmapKey) -> Optional[Image.Image]:
+    width, height = key.size
+    if width <= 0 or height <= 0:
+        return None
+    try:
+        with Image.open(key.path) as source:
+            # JPEGs can decode straight at a reduced scale.
+            source.draft(None, key.size)
+            image = ImageOps.exif_transpose(source)
+            if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+                background = Image.new("RGBA", image.size, (255, 255, 255, 255))
+                image = Image.alpha_composite(background, image.convert("RGBA"))
+            image = ImageOps.contain(image.convert("L"), key.size, Image.Resampling.LANCZOS)
+    except (OSError, UnidentifiedImageError, ValueError) as err:
+        _LOGGER.warning("Failed to decode image %s: %s", key.path, err)
+        return None
+
+    if key.invert:
+        image = ImageOps.invert(image)
+    if key.image_type == "BINARY":
+        image = dither_image(image, PALETTES["BW"], _DITHER_MODES.get(key.dither, DITHER_FLOYD_STEINBERG))
+    return image
+
+
+IMAGE_CACHE = DecodedImageCache()
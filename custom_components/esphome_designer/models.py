@@ -161,6 +161,7 @@ _DEVICE_SERIALIZED_FIELDS = (
     "custom_hardware",
     "protocol_hardware",
     "glyphsets",
+    "revision",
 )
 
 _DEVICE_STRING_FIELD_SPECS = (
@@ -305,12 +306,14 @@ class WidgetConfig:
         Uses:
           - props.image_id: str (must match ESPHome image id)
 
-    - "history":
-        Simple history/graph placeholder.
+    - "graph" / "history":
+        Line graph of an entity's recorded history, drawn server-side.
         Uses:
-          - props.entity_id: str
-          - props.time_window: int (e.g. minutes)
-          - props.style: str ("bars", "line", etc.)
+          - entity_id (or props.entity_id): str
+          - props.duration: str (e.g. "1h", "15min"); legacy
+            props.time_window: int (minutes)
+          - props.auto_scale, props.min_value, props.max_value
+          - props.line_thickness, props.line_type, props.border_width
     """
 
     id: str
@@ -342,6 +345,18 @@ class WidgetConfig:
         """Serialize widget configuration for storage and API responses."""
         return asdict(self)
 
+    def entity_ids(self) -> List[str]:
+        """Return every entity this widget reads, including ``*_entity`` props."""
+        found = [
+            entity
+            for entity in (self.entity_id, self.entity_id_2, self.condition_entity)
+            if isinstance(entity, str) and entity
+        ]
+        for key, value in self.props.items():
+            if (key == "entity_id" or key.endswith("_entity")) and isinstance(value, str) and value:
+                found.append(value)
+        return found
+
     @staticmethod
     def from_dict(data: Dict[str, Any]) -> "WidgetConfig":
         """Create a widget config from mixed frontend/storage payload data."""
@@ -483,6 +498,9 @@ class DeviceConfig:
       - "landscape" (800x480) or "portrait" (480x800) for editor and snippet.
     dark_mode:
       - If true, editor uses dark preview and docs explain inverted color usage.
+    revision:
+      - Persisted layout revision, bumped by storage on every mutation and
+        served as the layout ETag; payload values are ignored on write.
     """
 
     device_id: str
@@ -541,6 +559,7 @@ class DeviceConfig:
     protocol_hardware: Dict[str, Any] = field(default_factory=dict)
     glyphsets: List[str] = field(default_factory=lambda: ["GF_Latin_Kernel"])
     # ----------------------------------------------------
+    revision: int = 0
 
     def ensure_pages(self, min_pages: int = DEFAULT_PAGES) -> None:
         """Ensure at least min_pages exist; add simple default pages if missing."""
@@ -601,6 +620,7 @@ class DeviceConfig:
 
         orientation = _normalize_orientation(data.get("orientation"))
         current_page = _coerce_int(data.get("current_page", 0), 0) or 0
+        revision = max(_coerce_int(data.get("revision", 0), 0) or 0, 0)
         settings = _deserialize_device_settings(data)
 
         cfg = DeviceConfig(
@@ -609,6 +629,7 @@ class DeviceConfig:
             pages=pages,
             current_page=current_page,
             orientation=orientation,
+            revision=revision,
             **settings,
         )
         cfg.ensure_pages()
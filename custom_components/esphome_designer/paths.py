@@ -0,0 +1,69 @@
+"""
+Resolve user-supplied file paths within the directories the integration may read.
+
+Shared by the image proxy (api/proxy.py) and the renderer's image widgets,
+so it must not depend on the HTTP layer: render workers import it too.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path, PurePosixPath
+
+ALLOWED_IMAGE_ROOTS = (
+    Path("esphome") / "image",
+    Path("esphome") / "images",
+    Path("esphome_designer") / "image",
+    Path("esphome_designer") / "images",
+    Path("www"),
+)
+
+
+def allowed_image_roots(config_dir: str | Path) -> tuple[Path, ...]:
+    base_dir = Path(config_dir).resolve()
+    return tuple((base_dir / relative_root).resolve() for relative_root in ALLOWED_IMAGE_ROOTS)
+
+
+def resolve_image_path(config_dir: str | Path, raw_path: str | None) -> Path | None:
+    """Resolve an image path strictly within known ESPHome image directories."""
+    if not raw_path:
+        return None
+
+    requested = raw_path.strip()
+    if not requested or "\x00" in requested:
+        return None
+
+    if requested.startswith("/local/"):
+        posix_path = PurePosixPath("www") / PurePosixPath(requested.removeprefix("/local/"))
+    elif requested.startswith("/"):
+        if not requested.startswith("/config/"):
+            return None
+        posix_path = PurePosixPath(requested.removeprefix("/config/"))
+    else:
+        posix_path = PurePosixPath(requested)
+
+    if any(part in ("", ".", "..") for part in posix_path.parts):
+        return None
+
+    relative_path = Path(*posix_path.parts)
+    config_base = Path(config_dir).resolve()
+    allowed_roots = allowed_image_roots(config_base)
+
+    explicit_candidate = (config_base / relative_path).resolve()
+    for root in allowed_roots:
+        try:
+            explicit_candidate.relative_to(root)
+        except ValueError:
+            continue
+        if explicit_candidate.exists() and explicit_candidate.is_file():
+            return explicit_candidate
+
+    for root in allowed_roots:
+        candidate = (root / relative_path).resolve()
+        try:
+            candidate.relative_to(root)
+        except ValueError:
+            continue
+        if candidate.exists() and candidate.is_file():
+            return candidate
+
+    return None
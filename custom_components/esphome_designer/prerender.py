@@ -0,0 +1,134 @@
+"""
+Background pre-rendering of device pages driven by state changes.
+
+Listens to state_changed only for entities referenced by stored layouts (via
+the storage dependency index), debounces bursts of changes, and re-renders
+just the affected pages into the render cache. A device's next image fetch is
+then a memory read, which matters for deep-sleeping panels whose wake window
+is paid for in battery.
+
+Only pages a device has actually fetched are pre-rendered, in each output
+format they were fetched in; layouts that exist purely in the editor never
+cost background CPU.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Callable, FrozenSet, Optional, Set, Tuple
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
+
+from .const import DOMAIN, PRERENDER_DEBOUNCE_S
+from .render_scheduler import PRIORITY_BACKGROUND, RenderQueueFull
+from .render_service import RenderService
+from .storage import DashboardStorage
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PreRenderer:
+    """Keep rendered images of fetched pages warm as their inputs change."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        storage: DashboardStorage,
+        render_service: RenderService,
+        debounce_s: float = PRERENDER_DEBOUNCE_S,
+    ) -> None:
+        self._hass = hass
+        self._storage = storage
+        self._render_service = render_service
+        self._debounce_s = debounce_s
+        self._pending: Set[Tuple[str, int]] = set()
+        self._tracked: FrozenSet[str] = frozenset()
+        self._unsub_state: Optional[Callable[[], None]] = None
+        self._unsub_layout: Optional[Callable[[], None]] = None
+        self._cancel_flush: Optional[Callable[[], None]] = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start tracking layout entities and layout mutations."""
+        self._unsub_layout = self._storage.async_add_layout_listener(self._async_layout_changed)
+        self._async_update_subscription()
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel subscriptions and any pending flush."""
+        for unsub in (self._unsub_state, self._unsub_layout, self._cancel_flush):
+            if unsub is not None:
+                unsub()
+        self._unsub_state = self._unsub_layout = self._cancel_flush = None
+        self._tracked = frozenset()
+        self._pending.clear()
+
+    @callback
+    def _async_update_subscription(self) -> None:
+        """Resubscribe when the set of referenced entities changes."""
+        entity_ids = self._storage.dependency_index.entity_ids
+        if entity_ids == self._tracked and (self._unsub_state is not None or not entity_ids):
+            return
+
+        if self._unsub_state is not None:
+            self._unsub_state()
+            self._unsub_state = None
+
+        self._tracked = entity_ids
+        if entity_ids:
+            self._unsub_state = async_track_state_change_event(
+                self._hass, sorted(entity_ids), self._async_state_changed
+            )
+        _LOGGER.debug("%s: Pre-render tracking %d entities", DOMAIN, len(entity_ids))
+
+    @callback
+    def _async_layout_changed(self, device_id: str) -> None:
+        """Refresh the subscription and re-warm the device's fetched pages."""
+        self._async_update_subscription()
+        self._async_queue(ref for ref in self._render_service.served_pages if ref[0] == device_id)
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        entity_id = event.data.get("entity_id")
+        if not entity_id:
+            return
+        self._async_queue(self._storage.dependency_index.pages_for(entity_id))
+
+    @callback
+    def _async_queue(self, pages) -> None:
+        served = self._render_service.served_pages
+        self._pending.update(ref for ref in pages if ref in served)
+        if self._pending and self._cancel_flush is None:
+            self._cancel_flush = async_call_later(self._hass, self._debounce_s, self._async_flush)
+
+    @callback
+    def _async_flush(self, _now: datetime | None = None) -> None:
+        """Start background renders for every page queued during the debounce window."""
+        self._cancel_flush = None
+        pending, self._pending = self._pending, set()
+        for device_id, page_index in sorted(pending):
+            device = self._storage.get_device(device_id)
+            if device is None or not 0 <= page_index < len(device.pages):
+                continue
+            self._hass.async_create_background_task(
+                self._async_render(device_id, page_index),
+                f"{DOMAIN}_prerender_{device_id}_{page_index}",
+            )
+
+    async def _async_render(self, device_id: str, page_index: int) -> None:
+        device = self._storage.get_device(device_id)
+        if device is None or not 0 <= page_index < len(device.pages):
+            return
+        try:
+            # The first format renders; the rest re-encode the retained frame.
+            for output_format in sorted(self._render_service.served_formats(device_id, page_index)):
+                await self._render_service.async_render_page(
+                    device, page_index, output_format, priority=PRIORITY_BACKGROUND
+                )
+        except RenderQueueFull:
+            # Shed under load; the device's own fetch will render the page.
+            _LOGGER.debug("%s: Pre-render of %s page %s skipped, render queue full", DOMAIN, device_id, page_index)
+        except Exception:  # noqa: BLE001
+            _LOGGER.exception("%s: Pre-render failed for %s page %s", DOMAIN, device_id, page_index)
@@ -0,0 +1,126 @@
+"""
+State-keyed cache for rendered page images.
+
+Panels usually poll far more often than the sensors on them change, so most
+renders would redraw identical pixels. Entries are keyed by
+(device_id, page_index, layout_revision, state_fingerprint, output_format,
+valid_until), where the fingerprint covers exactly the Home Assistant states a
+page reads and valid_until is when its clock widgets next change (see
+renderer.page_valid_until); entries expire at that moment. Memory is
+bounded by an LRU byte budget rather than an entry count because page sizes
+vary widely between a small OEPL tag and a 1280x800 LCD.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+from .const import RENDER_CACHE_MAX_BYTES
+
+
+class RenderCacheKey(NamedTuple):
+    """Identify a rendered page by everything that can change its pixels."""
+
+    device_id: str
+    page_index: int
+    layout_revision: int
+    fingerprint: str
+    output_format: str = "png"
+    # Epoch seconds at which time-dependent widgets change; None if there are none.
+    valid_until: Optional[float] = None
+
+    def same_inputs(self, other: "RenderCacheKey") -> bool:
+        """Whether both keys describe the same pixels, whatever the encoding."""
+        return self[:4] == other[:4] and self.valid_until == other.valid_until
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        """Whether the time bucket this key was built for has passed."""
+        return self.valid_until is not None and (time.time() if now is None else now) >= self.valid_until
+
+
+def state_fingerprint(hass: Any, entity_ids: Iterable[str], *extra: Any) -> str:
+    """Digest the current states of the given entities.
+
+    ``last_updated`` changes whenever a state or any of its attributes change,
+    so it stands in for the attribute payload without hashing it.
+    """
+    parts = []
+    for entity_id in entity_ids:
+        state = hass.states.get(entity_id)
+        if state is None:
+            parts.append((entity_id, None, None))
+        else:
+            parts.append((entity_id, state.state, str(state.last_updated)))
+    parts.extend(extra)
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class RenderCache:
+    """LRU cache of encoded page bytes bounded by total payload size."""
+
+    def __init__(self, max_bytes: int = RENDER_CACHE_MAX_BYTES) -> None:
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[RenderCacheKey, bytes]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: RenderCacheKey) -> Optional[bytes]:
+        """Return cached bytes for key and mark them recently used."""
+        data = self._entries.get(key)
+        if data is not None and key.expired():
+            self._bytes -= len(self._entries.pop(key))
+            data = None
+        if data is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, key: RenderCacheKey, data: bytes) -> None:
+        """Store bytes for key, evicting expired, then least recently used, entries."""
+        if len(data) > self._max_bytes or key.expired():
+            return
+        self.purge_expired()
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = data
+        self._bytes += len(data)
+        while self._bytes > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def purge_expired(self, now: Optional[float] = None) -> None:
+        """Drop entries whose time bucket has passed; nothing can hit them again."""
+        now = time.time() if now is None else now
+        for key in [key for key in self._entries if key.expired(now)]:
+            self._bytes -= len(self._entries.pop(key))
+
+    def invalidate_device(self, device_id: str) -> None:
+        """Drop every cached page for a device."""
+        for key in [key for key in self._entries if key.device_id == device_id]:
+            self._bytes -= len(self._entries.pop(key))
+
+    def clear(self) -> None:
+        """Drop all entries; counters are kept."""
+        self._entries.clear()
+        self._bytes = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and memory usage."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
+        }
@@ -0,0 +1,258 @@
+"""
+Priority scheduler for page renders.
+
+Page renders are pure CPU work (PIL drawing, dithering, encoding), and in
+worker threads they all contend for one GIL, so a burst of state changes on a
+multi-page fleet renders no faster than on a single core. The scheduler runs
+render jobs in a process pool sized to the host instead, behind a small queue:
+
+- Priorities: requests someone is waiting on (a panel fetching its image)
+  run ahead of background pre-renders (see prerender.py).
+- Coalescing: jobs share a key, normally (device, page, layout revision,
+  format). A job still waiting in the queue takes the newest inputs submitted
+  for its key, and every caller waiting on it gets that result, so a flood of
+  state changes costs at most one queued render per page.
+- Backpressure: the queue is bounded. When it is full a new job evicts the
+  least urgent queued job of lower priority, or is rejected with
+  RenderQueueFull if there is none.
+
+Jobs must be picklable module-level functions with picklable arguments. If
+the process pool cannot be used (no multiprocessing support, a worker died,
+or a job could not be pickled), the scheduler logs once and falls back to a
+thread pool for the rest of its life.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .const import DOMAIN, RENDER_MAX_PROCESSES, RENDER_QUEUE_MAX
+
+_LOGGER = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+
+class RenderQueueFull(RuntimeError):
+    """Raised when a job cannot be queued, or was evicted by a more urgent one."""
+
+
+def default_worker_count() -> int:
+    """Return the number of render processes for this host.
+
+    One core is left to Home Assistant's event loop.
+    """
+    return max(1, min(RENDER_MAX_PROCESSES, (os.cpu_count() or 2) - 1))
+
+
+@dataclass
+class _Job:
+    key: Hashable
+    priority: int
+    seq: int
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...]
+    future: "asyncio.Future[Any]"
+    retried: bool = False
+
+
+class RenderScheduler:
+    """Run render jobs by priority in a bounded, coalescing queue."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: int = RENDER_QUEUE_MAX,
+        use_processes: bool = True,
+        initializer: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._max_workers = max(1, max_workers or default_worker_count())
+        self._max_queue = max(1, max_queue)
+        self._heap: List[Tuple[int, int, _Job]] = []
+        self._queued: Dict[Hashable, _Job] = {}
+        self._running = 0
+        self._seq = itertools.count()
+        self._executor: Optional[Executor] = None
+        self._uses_processes = use_processes
+        # Runs once in each worker process before its first job.
+        self._initializer = initializer
+        self._closed = False
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    @property
+    def uses_processes(self) -> bool:
+        """Return whether jobs run in worker processes rather than threads."""
+        return self._uses_processes
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Return queue depth and submission counters."""
+        return {
+            "workers": self._max_workers,
+            "queued": len(self._queued),
+            "running": self._running,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "evicted": self.evicted,
+        }
+
+    async def async_submit(self, key: Hashable, priority: int, fn: Callable[..., Any], *args: Any) -> Any:
+        """Queue fn(*args) and return its result once a worker has run it.
+
+        If a job with the same key is still queued it is updated in place
+        instead: it takes these arguments, moves up to this priority if that
+        is more urgent, and both callers receive its result. Raises
+        RuntimeError after shutdown.
+        """
+        if self._closed:
+            raise RuntimeError("Render scheduler is shut down")
+        self.submitted += 1
+        job = self._queued.get(key)
+        if job is not None:
+            self.coalesced += 1
+            job.fn, job.args = fn, args
+            self.promote(key, priority)
+            return await asyncio.shield(job.future)
+
+        if len(self._queued) >= self._max_queue:
+            self._make_room(priority)
+
+        job = _Job(key, priority, next(self._seq), fn, args, asyncio.get_running_loop().create_future())
+        self._queued[key] = job
+        heapq.heappush(self._heap, (priority, job.seq, job))
+        self._dispatch()
+        return await asyncio.shield(job.future)
+
+    def promote(self, key: Hashable, priority: int) -> None:
+        """Move a queued job up to priority; running or unknown jobs are left alone."""
+        job = self._queued.get(key)
+        if job is not None and priority < job.priority:
+            # The old heap entry goes stale and is skipped when popped.
+            job.priority = priority
+            heapq.heappush(self._heap, (priority, job.seq, job))
+
+    def _make_room(self, priority: int) -> None:
+        """Evict the newest queued job less urgent than priority, or reject."""
+        victim: Optional[_Job] = None
+        for job in self._queued.values():
+            if job.priority > priority and (
+                victim is None or (job.priority, job.seq) > (victim.priority, victim.seq)
+            ):
+                victim = job
+        if victim is None:
+            self.rejected += 1
+            raise RenderQueueFull(f"Render queue is full ({self._max_queue} jobs)")
+
+        self.evicted += 1
+        del self._queued[victim.key]
+        if not victim.future.done():
+            victim.future.set_exception(RenderQueueFull("Render job was evicted by a more urgent one"))
+            # Mark retrieved: nobody may be left waiting on an evicted job.
+            victim.future.exception()
+
+    def _dispatch(self) -> None:
+        while self._running < self._max_workers and self._heap:
+            priority, _seq, job = heapq.heappop(self._heap)
+            if self._queued.get(job.key) is not job or job.priority != priority:
+                continue
+            del self._queued[job.key]
+            self._start(job)
+
+    def _start(self, job: _Job) -> None:
+        self._running += 1
+        loop = asyncio.get_running_loop()
+        try:
+            running = loop.run_in_executor(self._get_executor(), job.fn, *job.args)
+        except (BrokenExecutor, RuntimeError) as err:
+            # A broken pool refuses submissions outright.
+            running = loop.create_future()
+            running.set_exception(err)
+        running.add_done_callback(lambda done: self._job_done(job, done))
+
+    def _job_done(self, job: _Job, done: "asyncio.Future[Any]") -> None:
+        self._running -= 1
+        if done.cancelled():
+            if not job.future.done():
+                job.future.cancel()
+        else:
+            err = done.exception()
+            if err is not None and not job.retried and _is_pool_failure(err):
+                # Jobs that were running in a dead pool are retried once each.
+                if self._uses_processes:
+                    _LOGGER.warning(
+                        "%s: Render process pool unusable (%r); rendering in threads instead", DOMAIN, err
+                    )
+                    self._fall_back_to_threads()
+                job.retried = True
+                self._start(job)
+                return
+            if not job.future.done():
+                if err is not None:
+                    job.future.set_exception(err)
+                else:
+                    job.future.set_result(done.result())
+        self._dispatch()
+
+    def _get_executor(self) -> Executor:
+        if self._closed:
+            # Jobs retried after shutdown must not start a fresh pool.
+            raise RuntimeError("Render scheduler is shut down")
+        if self._executor is None:
+            if self._uses_processes:
+                try:
+                    # Spawned workers start clean instead of forking the
+                    # multi-threaded Home Assistant process.
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self._max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=self._initializer,
+                    )
+                except (OSError, NotImplementedError, ValueError) as err:
+                    _LOGGER.warning("%s: Render processes unavailable (%s); using threads", DOMAIN, err)
+                    self._uses_processes = False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix=f"{DOMAIN}_render",
+                )
+        return self._executor
+
+    def _fall_back_to_threads(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = None
+        self._uses_processes = False
+
+    def shutdown(self) -> None:
+        """Cancel queued jobs and stop the workers without waiting for them."""
+        self._closed = True
+        for job in self._queued.values():
+            if not job.future.done():
+                job.future.cancel()
+        self._queued.clear()
+        self._heap.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _is_pool_failure(err: BaseException) -> bool:
+    """Return whether err means the process pool, not the job, failed."""
+    if isinstance(err, (BrokenExecutor, pickle.PicklingError)):
+        return True
+    # Unpicklable arguments surface as TypeError/AttributeError from pickle.
+    return isinstance(err, (TypeError, AttributeError)) and "pickle" in str(err).lower()
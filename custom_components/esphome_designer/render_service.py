@@ -0,0 +1,1008 @@
+"""
+Render service for device page images.
+
+Rendering a page (PIL drawing plus encoding) is CPU-bound and
+takes tens of milliseconds, so it must never run on the event loop. Renders
+go through a RenderScheduler (see render_scheduler.py) that runs them in a
+pool of worker processes, with device requests ahead of background
+pre-renders, so a fleet of panels polling every refresh cycle cannot starve
+Home Assistant's shared executor or stall the loop. Workers get a snapshot of
+just the states the page reads rather than hass itself.
+
+Rendered images are cached by the state they were drawn from (see
+render_cache.py), so repeated polls of an unchanged page skip the worker
+pool entirely. The last canvas of each page is retained as well, so when a
+page does change only the widgets whose inputs changed are redrawn, and a
+request for another output format of an unchanged page only re-encodes it.
+Workers keep their own copies of recent canvases, so a render job carries
+widget signatures to the worker and changed tiles back, not whole canvases.
+
+Devices fetch with short HTTP timeouts, so async_serve_page bounds the wait:
+if a fresh render misses the deadline (or fails), the last good image of the
+page is served with its age and the render finishes in the background.
+async_serve_stream does the same for banded pages, with the deadline on the
+first band.
+
+Canvases of RENDER_BAND_MIN_PIXELS or more (1280x800 and similar panels) are
+drawn and encoded in horizontal bands, so no render holds the full canvas
+and its encode buffers at once; device requests for them are streamed to the
+client band by band (async_stream_page).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, FrozenSet, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DOMAIN,
+    IMAGE_HEIGHT,
+    IMAGE_VERSION_CHECK_S,
+    IMAGE_WIDTH,
+    RENDER_BAND_MIN_PIXELS,
+    RENDER_CACHE_MAX_BYTES,
+    RENDER_DEADLINE_S,
+    RENDER_FRAME_HISTORY,
+    RENDER_MAX_WORKERS,
+    RENDER_WORKER_FRAMES,
+)
+from .models import DeviceConfig, PageConfig
+from .render_cache import RenderCache, RenderCacheKey, state_fingerprint
+from .framebuffer import FORMAT_PNG, encode_bands_for_device, encode_delta, encode_for_device, supports_bands
+from .hardware_templates import load_template_features
+from .render_scheduler import PRIORITY_INTERACTIVE, RenderScheduler
+from .render_stats import RenderStats, RenderTimings, WidgetTiming
+from .history_series import HistorySeriesCache, Series, SeriesKey
+from .renderer import (
+    Box,
+    RenderedFrame,
+    changed_boxes,
+    page_dependencies,
+    image_file_version,
+    page_image_paths,
+    page_series_keys,
+    page_valid_until,
+    render_page,
+    render_page_bands,
+)
+from .storage import DashboardStorage
+from .visibility import PageConditions, compile_page_conditions
+
+_LOGGER = logging.getLogger(__name__)
+
+# Entities that change on the minute, like the clock they feed (see
+# renderer._IMPLICIT_WIDGET_ENTITIES).
+_MINUTE_ENTITIES = frozenset({"sensor.time"})
+
+
+class StateSnapshot(NamedTuple):
+    """The parts of a Home Assistant State the renderer reads."""
+
+    state: str
+    attributes: Mapping[str, Any]
+    last_updated: Any
+
+
+class StatesSnapshot:
+    """A read-only ``hass.states`` stand-in over captured states."""
+
+    def __init__(self, states: Dict[str, StateSnapshot]) -> None:
+        self._states = states
+
+    def get(self, entity_id: str) -> Optional[StateSnapshot]:
+        return self._states.get(entity_id)
+
+
+class ConfigSnapshot(NamedTuple):
+    """The parts of hass.config the renderer reads."""
+
+    config_dir: Optional[str]
+
+
+class HassSnapshot:
+    """The slice of hass a page render reads; picklable for worker processes.
+
+    history holds the graph series the page plots, fetched beforehand because
+    workers cannot query the recorder.
+    """
+
+    def __init__(
+        self,
+        states: Dict[str, StateSnapshot],
+        config_dir: Optional[str] = None,
+        history: Optional[Mapping[SeriesKey, Series]] = None,
+    ) -> None:
+        self.states = StatesSnapshot(states)
+        self.config = ConfigSnapshot(config_dir)
+        self.history = dict(history or {})
+
+    @classmethod
+    def capture(
+        cls,
+        hass: HomeAssistant,
+        entity_ids: Iterable[str],
+        history: Optional[Mapping[SeriesKey, Series]] = None,
+    ) -> "HassSnapshot":
+        """Copy the current states of entity_ids; must run on the event loop."""
+        states: Dict[str, StateSnapshot] = {}
+        for entity_id in entity_ids:
+            state = hass.states.get(entity_id)
+            if state is not None:
+                states[entity_id] = StateSnapshot(state.state, dict(state.attributes), state.last_updated)
+        return cls(states, hass.config.config_dir, history)
+
+
+class RenderResult(NamedTuple):
+    """What a render job hands back to the service.
+
+    The scheduler may give a job the inputs of a newer request for the same
+    page, so the job reports the key and base frame it actually rendered.
+    frame is a FramePatch when only part of the base frame changed; banded
+    renders keep no frame.
+    """
+
+    key: RenderCacheKey
+    base_seq: Optional[int]
+    data: bytes
+    frame: Optional[Union[RenderedFrame, "FramePatch"]]
+    timings: Optional[RenderTimings] = None
+
+
+class FramePatch(NamedTuple):
+    """A rendered frame sent back as the tiles that differ from the job's base frame."""
+
+    signatures: List[Any]
+    boxes: List[Box]
+    dirty: List[Box]
+    tiles: List[Any]
+
+    def apply(self, base: RenderedFrame) -> RenderedFrame:
+        """Rebuild the full frame on top of the base frame's canvas."""
+        if not self.dirty:
+            return RenderedFrame(base.image, self.signatures, self.boxes, dirty=[])
+        image = base.image.copy()
+        for box, tile in zip(self.dirty, self.tiles):
+            image.paste(tile, box[:2])
+        return RenderedFrame(image, self.signatures, self.boxes, dirty=list(self.dirty))
+
+
+# Worker-side copies of recently drawn canvases, keyed by (device, page,
+# layout revision). Jobs send the signatures of the service's retained frame
+# rather than its pixels, and redraw incrementally when the worker's copy
+# has the same signatures, i.e. the same pixels. Jobs on the thread fallback
+# share this process's copy, hence the lock.
+_WORKER_FRAMES: "OrderedDict[Tuple[str, int, int], RenderedFrame]" = OrderedDict()
+_WORKER_FRAMES_LOCK = threading.Lock()
+
+
+def _worker_frame(ref: Tuple[str, int, int], signatures: Optional[List[Any]]) -> Optional[RenderedFrame]:
+    if signatures is None:
+        return None
+    with _WORKER_FRAMES_LOCK:
+        frame = _WORKER_FRAMES.get(ref)
+    return frame if frame is not None and frame.signatures == signatures else None
+
+
+def _keep_worker_frame(ref: Tuple[str, int, int], frame: RenderedFrame) -> None:
+    with _WORKER_FRAMES_LOCK:
+        _WORKER_FRAMES[ref] = frame
+        _WORKER_FRAMES.move_to_end(ref)
+        while len(_WORKER_FRAMES) > RENDER_WORKER_FRAMES:
+            _WORKER_FRAMES.popitem(last=False)
+
+
+def _render_job(
+    key: RenderCacheKey,
+    hass: HassSnapshot,
+    device: DeviceConfig,
+    base_signatures: Optional[List[Any]],
+    base_seq: Optional[int],
+    visible: Optional[Sequence[bool]] = None,
+    features: Optional[Mapping[str, Any]] = None,
+) -> RenderResult:
+    """Worker-side render: incremental draw against the previous frame, then encode.
+
+    Neither direction carries a full canvas when the service has a base
+    frame: the job gets its widget signatures, and returns a FramePatch of
+    the boxes that changed unless most of the page did.
+    """
+    ref = (key.device_id, key.page_index, key.layout_revision)
+    previous = _worker_frame(ref, base_signatures)
+    widgets: List[WidgetTiming] = []
+    started = time.perf_counter()
+    frame = render_page(hass, device, device.pages[key.page_index], previous, visible, timings=widgets)
+    drawn = time.perf_counter()
+    data = encode_for_device(frame.image, device, key.output_format, features)
+    timings = RenderTimings(tuple(widgets), drawn - started, time.perf_counter() - drawn, len(data))
+    _keep_worker_frame(ref, frame)
+
+    dirty = frame.dirty
+    if previous is None and base_signatures is not None and len(base_signatures) == len(frame.signatures):
+        # Redrawn in full here, but the service still has the base canvas.
+        dirty = changed_boxes(base_signatures, frame.signatures, frame.boxes)
+    width, height = frame.image.size
+    if dirty is None or sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in dirty) * 2 >= width * height:
+        return RenderResult(key, base_seq, data, frame, timings)
+    tiles = [frame.image.crop(box) for box in dirty]
+    return RenderResult(key, base_seq, data, FramePatch(frame.signatures, frame.boxes, dirty, tiles), timings)
+
+
+def _encode_job(
+    image: Any, device: DeviceConfig, output_format: str, features: Optional[Mapping[str, Any]] = None
+) -> Tuple[bytes, RenderTimings]:
+    """Encode a retained canvas in another format, timing it."""
+    started = time.perf_counter()
+    data = encode_for_device(image, device, output_format, features)
+    return data, RenderTimings((), None, time.perf_counter() - started, len(data))
+
+
+def _banded_timings(widgets: List[WidgetTiming], elapsed: float, size: int) -> RenderTimings:
+    """Split a banded render's time; drawing and encoding interleave band by band."""
+    draw_s = sum(widget.seconds for widget in widgets)
+    return RenderTimings(tuple(widgets), draw_s, max(0.0, elapsed - draw_s), size)
+
+
+def _next_chunk_timed(chunks: Iterator[bytes]) -> Tuple[Optional[bytes], float]:
+    started = time.perf_counter()
+    chunk = next(chunks, None)
+    return chunk, time.perf_counter() - started
+
+
+def _page_band_chunks(
+    hass: HassSnapshot,
+    device: DeviceConfig,
+    page_index: int,
+    output_format: str,
+    visible: Optional[Sequence[bool]],
+    timings: Optional[List[WidgetTiming]] = None,
+    features: Optional[Mapping[str, Any]] = None,
+) -> Iterator[bytes]:
+    bands = render_page_bands(hass, device, device.pages[page_index], visible, timings=timings)
+    return encode_bands_for_device(
+        bands, device, output_format, device.width or IMAGE_WIDTH, device.height or IMAGE_HEIGHT, features
+    )
+
+
+def _render_banded_job(
+    key: RenderCacheKey,
+    hass: HassSnapshot,
+    device: DeviceConfig,
+    visible: Optional[Sequence[bool]] = None,
+    features: Optional[Mapping[str, Any]] = None,
+) -> RenderResult:
+    """Worker-side render of a large page band by band."""
+    widgets: List[WidgetTiming] = []
+    started = time.perf_counter()
+    data = b"".join(_page_band_chunks(hass, device, key.page_index, key.output_format, visible, widgets, features))
+    return RenderResult(key, None, data, None, _banded_timings(widgets, time.perf_counter() - started, len(data)))
+
+
+class _BandStream:
+    """The chunks of a banded render in progress, readable by several requests."""
+
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+        self._error: Optional[BaseException] = None
+        self._done = False
+        self._changed: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+
+    def push(self, chunk: bytes) -> None:
+        self.chunks.append(chunk)
+        self._wake()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self._done = True
+        self._error = error
+        self._wake()
+
+    def _wake(self) -> None:
+        self._changed.set_result(None)
+        self._changed = asyncio.get_running_loop().create_future()
+
+    async def read(self) -> AsyncIterator[bytes]:
+        """Yield every chunk from the first, waiting for those not rendered yet."""
+        index = 0
+        while True:
+            if index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            elif self._done:
+                if self._error is not None:
+                    raise self._error
+                return
+            else:
+                await self._changed
+
+
+class ServedPage(NamedTuple):
+    """An encoded page and the key it was rendered from.
+
+    age is None for a fresh render, otherwise the seconds since the stale
+    image served in its place was rendered.
+    """
+
+    key: RenderCacheKey
+    data: bytes
+    age: Optional[int] = None
+
+
+class StreamedPage(NamedTuple):
+    """A banded render in progress: its first chunk and the rest to come."""
+
+    first: bytes
+    rest: AsyncIterator[bytes]
+
+
+@dataclass
+class PageFrames:
+    """The latest frame of a page and a short log of how it got there.
+
+    seq is a service-wide frame number that clients of the delta endpoint
+    echo back. It counts up (modulo 2**32, the width of the delta header's
+    field) from a random start per service instance, so a number a panel kept
+    across a restart does not name an unrelated frame. Each log entry is
+    (prev_seq, seq, dirty) where dirty is None for a full redraw.
+    """
+
+    key: RenderCacheKey
+    frame: RenderedFrame
+    seq: int
+    log: Deque[Tuple[int, int, Optional[List[Box]]]] = field(
+        default_factory=lambda: deque(maxlen=RENDER_FRAME_HISTORY)
+    )
+
+    def changed_since(self, since: int) -> Optional[List[Box]]:
+        """Return boxes changed after frame `since`, or None if a full frame is needed."""
+        if since == self.seq:
+            return []
+        boxes: List[Box] = []
+        for prev_seq, _seq, dirty in reversed(self.log):
+            if dirty is None:
+                return None
+            boxes.extend(dirty)
+            if prev_seq == since:
+                return boxes
+        return None
+
+
+# (key the page was rendered from, encoded page, retained frames); the key
+# can be newer than the one requested when the scheduler coalesced the job.
+_RenderOutput = Tuple[RenderCacheKey, bytes, Optional[PageFrames]]
+
+
+class RenderService:
+    """Schedule page renders off the event loop and cache their results."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        storage: DashboardStorage,
+        max_workers: int = RENDER_MAX_WORKERS,
+        cache_max_bytes: int = RENDER_CACHE_MAX_BYTES,
+        scheduler: Optional[RenderScheduler] = None,
+        deadline_s: Optional[float] = RENDER_DEADLINE_S,
+        band_min_pixels: int = RENDER_BAND_MIN_PIXELS,
+        history: Optional[HistorySeriesCache] = None,
+        image_check_s: float = IMAGE_VERSION_CHECK_S,
+    ) -> None:
+        self._hass = hass
+        self._storage = storage
+        self._cache = RenderCache(cache_max_bytes)
+        self._inflight: Dict[Tuple[RenderCacheKey, bool], "asyncio.Task[_RenderOutput]"] = {}
+        self._streams: Dict[Tuple[RenderCacheKey, bool], _BandStream] = {}
+        # Output formats each (device_id, page_index) has been fetched in.
+        self._served_pages: Dict[Tuple[str, int], Set[str]] = {}
+        self._frames: Dict[Tuple[str, int], PageFrames] = {}
+        self._conditions: Dict[Tuple[str, int], Tuple[int, PageConditions]] = {}
+        # Last image produced per (device_id, page_index, format) and when.
+        self._last_good: Dict[Tuple[str, int, str], Tuple[RenderCacheKey, bytes, float]] = {}
+        self._deadline_s = deadline_s
+        self._band_min_pixels = band_min_pixels
+        # Image widget path -> (path, mtime_ns) as last checked, and when.
+        self._image_versions: Dict[str, Tuple[Optional[Tuple[str, int]], float]] = {}
+        self._image_check_s = image_check_s
+        self._image_checks: Set[str] = set()
+        self._image_check: "Optional[asyncio.Task[None]]" = None
+        # Display features of each hardware template, by template id.
+        self._hardware_features: Dict[str, Dict[str, Any]] = {}
+        # Random epoch; see PageFrames.
+        self._frame_seq = int.from_bytes(os.urandom(4), "little")
+        self._etag_salt = os.urandom(16)
+        self._unsub_layout = storage.async_add_layout_listener(self._async_layout_changed)
+        self._scheduler = scheduler if scheduler is not None else RenderScheduler()
+        self._history = history if history is not None else HistorySeriesCache()
+        self._stats = RenderStats()
+        # Re-encoding a retained frame and building deltas are short jobs
+        # that need the frame in this process, so they stay on threads.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers),
+            thread_name_prefix=f"{DOMAIN}_encode",
+        )
+
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """Return render cache hit/miss counters and memory usage."""
+        return self._cache.stats
+
+    @property
+    def scheduler_stats(self) -> Dict[str, int]:
+        """Return render queue depth and submission counters."""
+        return self._scheduler.stats
+
+    @property
+    def history_stats(self) -> Dict[str, int]:
+        """Return graph series cache hit/miss counters."""
+        return self._history.stats
+
+    def diagnostics(self) -> Dict[str, Any]:
+        """Return render timings, the slow-widget list and cache/queue counters."""
+        return {
+            "render": self._stats.report(),
+            "cache": self.cache_stats,
+            "scheduler": self.scheduler_stats,
+            "history": self.history_stats,
+        }
+
+    def cache_key(
+        self, device: DeviceConfig, page_index: int, output_format: str = FORMAT_PNG
+    ) -> RenderCacheKey:
+        """Build the cache key for a page from its layout revision and inputs.
+
+        Entities of widgets hidden by their visibility condition are left out,
+        so they can change freely without invalidating the page. Image files
+        are keyed by mtime, so replacing one changes the key (and ETag) once
+        the file has been checked again (see _page_image_versions).
+        """
+        visible = self.page_visibility(device, page_index)
+        page = device.pages[page_index]
+        entity_ids, _time_dependent = page_dependencies(page, visible)
+        # Clock and graph pages are keyed by the time bucket they were drawn
+        # in and expire from the cache when it ends.
+        valid_until = page_valid_until(self._hass, page, visible)
+        return RenderCacheKey(
+            device.device_id,
+            page_index,
+            self._storage.get_layout_revision(device.device_id),
+            state_fingerprint(self._hass, entity_ids, *self._page_image_versions(page, visible)),
+            output_format,
+            valid_until.timestamp() if valid_until is not None else None,
+        )
+
+    def _page_image_versions(
+        self, page: PageConfig, visible: Sequence[bool]
+    ) -> List[Optional[Tuple[str, int]]]:
+        """Return the page's image file versions as last checked, without touching the disk.
+
+        Paths not checked within image_check_s are queued for a re-check in
+        the executor; until it lands the previous version (or None for a
+        path never seen) stands.
+        """
+        now = time.monotonic()
+        versions = []
+        for raw_path in page_image_paths(page, visible):
+            version, checked_at = self._image_versions.get(raw_path, (None, None))
+            if checked_at is None or now - checked_at >= self._image_check_s:
+                # Counted as checked from now, so it is queued once.
+                self._image_versions[raw_path] = (version, now)
+                self._image_checks.add(raw_path)
+            versions.append(version)
+        if self._image_checks and self._image_check is None:
+            self._image_check = asyncio.get_running_loop().create_task(self._async_check_images())
+        return versions
+
+    async def _async_check_images(self) -> None:
+        """Stat the queued image paths in the executor."""
+        try:
+            while self._image_checks:
+                raw_paths, self._image_checks = list(self._image_checks), set()
+                versions = await self._hass.async_add_executor_job(
+                    _image_file_versions, self._hass.config.config_dir, raw_paths
+                )
+                now = time.monotonic()
+                for raw_path, version in zip(raw_paths, versions):
+                    self._image_versions[raw_path] = (version, now)
+        finally:
+            self._image_check = None
+
+    def max_age(self, device: DeviceConfig, page_index: int, key: RenderCacheKey) -> Optional[int]:
+        """Return seconds a client may reuse the page image, or None if it must revalidate.
+
+        Only pages that change purely with the wall clock qualify: anything
+        else can change with the next state change, at any moment.
+        """
+        if key.valid_until is None:
+            return None
+        entity_ids, _time_dependent = page_dependencies(
+            device.pages[page_index], self.page_visibility(device, page_index)
+        )
+        if not set(entity_ids) <= _MINUTE_ENTITIES:
+            return None
+        now = time.time()
+        until = key.valid_until
+        if entity_ids:
+            until = min(until, (now // 60 + 1) * 60)
+        return max(0, math.ceil(until - now))
+
+    async def async_load_hardware_templates(self) -> None:
+        """Read the hardware templates' display features; call again after they change."""
+        features = await self._hass.async_add_executor_job(load_template_features, self._hass.config.config_dir)
+        if features != self._hardware_features:
+            # Cached images may have been quantized with another palette.
+            self._cache.clear()
+        self._hardware_features = features
+
+    def hardware_features(self, device: DeviceConfig) -> Mapping[str, Any]:
+        """Return the display features of the hardware template a device is built on."""
+        return self._hardware_features.get(device.device_model or "", {})
+
+    def page_visibility(self, device: DeviceConfig, page_index: int) -> Tuple[bool, ...]:
+        """Evaluate the page's widget visibility conditions against current states."""
+        ref = (device.device_id, page_index)
+        revision = self._storage.get_layout_revision(device.device_id)
+        compiled = self._conditions.get(ref)
+        if compiled is None or compiled[0] != revision:
+            compiled = (revision, compile_page_conditions(device.pages[page_index]))
+            self._conditions[ref] = compiled
+        return compiled[1].evaluate(self._hass)
+
+    def uses_bands(self, device: DeviceConfig, output_format: str) -> bool:
+        """Whether pages of this device are rendered in bands in this format."""
+        pixels = (device.width or IMAGE_WIDTH) * (device.height or IMAGE_HEIGHT)
+        return pixels >= self._band_min_pixels and supports_bands(
+            device, output_format, self.hardware_features(device)
+        )
+
+    @property
+    def served_pages(self) -> FrozenSet[Tuple[str, int]]:
+        """Return the (device_id, page_index) pairs devices have fetched."""
+        return frozenset(self._served_pages)
+
+    def served_formats(self, device_id: str, page_index: int) -> FrozenSet[str]:
+        """Return the output formats a page has been fetched in."""
+        return frozenset(self._served_pages.get((device_id, page_index), ()))
+
+    def mark_page_served(self, device_id: str, page_index: int, output_format: str = FORMAT_PNG) -> None:
+        """Remember that a device fetches this page in output_format, making it worth pre-rendering."""
+        self._served_pages.setdefault((device_id, page_index), set()).add(output_format)
+
+    def _async_layout_changed(self, device_id: str) -> None:
+        """Release images of the previous layout revision; forget deleted devices."""
+        self._cache.invalidate_device(device_id)
+        self._frames = {ref: frame for ref, frame in self._frames.items() if ref[0] != device_id}
+        self._conditions = {ref: compiled for ref, compiled in self._conditions.items() if ref[0] != device_id}
+        self._stats.forget_widgets(device_id)
+        # Last good images of the old layout stay: a slightly outdated page
+        # beats a failed fetch. Pages that no longer exist are dropped.
+        device = self._storage.get_device(device_id)
+        page_count = len(device.pages) if device is not None else 0
+        self._last_good = {
+            ref: good for ref, good in self._last_good.items() if ref[0] != device_id or ref[1] < page_count
+        }
+        if device is None:
+            self._served_pages = {
+                ref: formats for ref, formats in self._served_pages.items() if ref[0] != device_id
+            }
+
+    def page_hash(self, key: RenderCacheKey) -> bytes:
+        """Return a 12-byte digest identifying the image a cache key describes.
+
+        Cache keys carry the in-memory layout revision, which restarts with
+        the process (unlike the persisted DeviceConfig.revision), so the digest
+        is salted per service instance: a restart costs each panel one full
+        download rather than risking a stale match.
+        """
+        return hashlib.blake2b(repr(tuple(key)).encode("utf-8"), key=self._etag_salt, digest_size=12).digest()
+
+    def etag(self, key: RenderCacheKey) -> str:
+        """Return a strong HTTP entity tag for the image a cache key describes."""
+        return f'"{self.page_hash(key).hex()}"'
+
+    async def async_render_page(
+        self,
+        device: DeviceConfig,
+        page_index: int,
+        output_format: str = FORMAT_PNG,
+        key: Optional[RenderCacheKey] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> bytes:
+        """Render a single page of a device off the event loop.
+
+        Returns the page encoded as output_format (see framebuffer.py).
+        Concurrent requests for the same cache key share one render, so a
+        device fetching while a background pre-render runs just waits for it
+        (and promotes it to the device's priority). Raises RenderQueueFull if
+        the render queue has no room at this priority.
+        """
+        _key, data = await self._async_render_page(device, page_index, output_format, key, priority)
+        return data
+
+    async def _async_render_page(
+        self,
+        device: DeviceConfig,
+        page_index: int,
+        output_format: str,
+        key: Optional[RenderCacheKey],
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> Tuple[RenderCacheKey, bytes]:
+        """Render like async_render_page; also return the key the page was rendered from.
+
+        A queued job takes the inputs of the newest request for its page, so
+        that key can be newer than the one passed in.
+        """
+        if key is None:
+            key = self.cache_key(device, page_index, output_format)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return key, cached
+
+        frames = self._frames.get((device.device_id, page_index))
+        if frames is not None and frames.key.same_inputs(key):
+            # The pixels are current; only this encoding is missing.
+            loop = asyncio.get_running_loop()
+            data, timings = await loop.run_in_executor(
+                self._executor,
+                _encode_job,
+                frames.frame.image,
+                device,
+                output_format,
+                self.hardware_features(device),
+            )
+            self._stats.record(device.device_id, page_index, timings)
+            self._store_data(key, data)
+            return key, data
+
+        rendered_key, data, _frames = await self._async_render(
+            key, device, page_index, priority, self.uses_bands(device, output_format)
+        )
+        return rendered_key, data
+
+    async def async_serve_page(
+        self,
+        device: DeviceConfig,
+        page_index: int,
+        output_format: str = FORMAT_PNG,
+        key: Optional[RenderCacheKey] = None,
+    ) -> ServedPage:
+        """Render a page for a waiting device, falling back to its last good image.
+
+        Waits up to the render deadline. If the fresh render is slower, or
+        fails, the last image produced for this page and format is returned
+        with its age while the render carries on filling the cache for the
+        next fetch. Without a previous image this waits (or raises) like
+        async_render_page. The result carries the key the body was rendered
+        from, which can be newer than key; derive ETags from it.
+        """
+        if key is None:
+            key = self.cache_key(device, page_index, output_format)
+        stale = self._last_good.get((device.device_id, page_index, output_format))
+        render = asyncio.ensure_future(self._async_render_page(device, page_index, output_format, key))
+        if stale is None or self._deadline_s is None:
+            return ServedPage(*await render)
+
+        try:
+            return ServedPage(*await asyncio.wait_for(asyncio.shield(render), self._deadline_s))
+        except asyncio.TimeoutError:
+            _LOGGER.debug(
+                "%s: Render of %s page %s missed its deadline; serving last good image",
+                DOMAIN,
+                device.device_id,
+                page_index,
+            )
+            render.add_done_callback(_log_background_failure)
+        except Exception:  # noqa: BLE001
+            _LOGGER.exception(
+                "%s: Render of %s page %s failed; serving last good image", DOMAIN, device.device_id, page_index
+            )
+        stale_key, data, rendered_at = stale
+        return ServedPage(stale_key, data, max(0, int(time.monotonic() - rendered_at)))
+
+    async def async_serve_stream(
+        self,
+        device: DeviceConfig,
+        page_index: int,
+        output_format: str = FORMAT_PNG,
+        key: Optional[RenderCacheKey] = None,
+    ) -> Union[ServedPage, StreamedPage]:
+        """Start streaming a banded page for a waiting device, falling back to its last good image.
+
+        Like async_serve_page, but the deadline covers the first band, since
+        that is when the response starts. If it is slower, or the render fails
+        before it, the last good image is returned and the remaining bands
+        render in the background to fill the cache for the next fetch.
+        """
+        if key is None:
+            key = self.cache_key(device, page_index, output_format)
+        chunks = self.async_stream_page(device, page_index, output_format, key)
+        stale = self._last_good.get((device.device_id, page_index, output_format))
+        first = asyncio.ensure_future(anext(chunks))
+        if stale is None or self._deadline_s is None:
+            return StreamedPage(await first, chunks)
+
+        try:
+            return StreamedPage(await asyncio.wait_for(asyncio.shield(first), self._deadline_s), chunks)
+        except asyncio.TimeoutError:
+            _LOGGER.debug(
+                "%s: Streamed render of %s page %s missed its deadline; serving last good image",
+                DOMAIN,
+                device.device_id,
+                page_index,
+            )
+            asyncio.ensure_future(_drain_stream(first, chunks)).add_done_callback(_log_background_failure)
+        except Exception:  # noqa: BLE001
+            _LOGGER.exception(
+                "%s: Streamed render of %s page %s failed; serving last good image",
+                DOMAIN,
+                device.device_id,
+                page_index,
+            )
+        stale_key, data, rendered_at = stale
+        return ServedPage(stale_key, data, max(0, int(time.monotonic() - rendered_at)))
+
+    async def async_stream_page(
+        self,
+        device: DeviceConfig,
+        page_index: int,
+        output_format: str = FORMAT_PNG,
+        key: Optional[RenderCacheKey] = None,
+    ) -> AsyncIterator[bytes]:
+        """Render a page band by band, yielding encoded chunks as they complete.
+
+        Meant for request-driven renders of pages where uses_bands is true:
+        bands are drawn one at a time on the encode threads, so the client
+        receives rows while later ones render and memory stays at one band
+        plus the encoder state. The joined output is cached like any render.
+
+        Worker processes cannot hand back bands as they finish, so streams
+        bypass the scheduler; instead every request for the same key reads
+        one shared render, which also stands in for scheduled banded renders
+        (pre-renders) of that key, and the other way round.
+        """
+        if key is None:
+            key = self.cache_key(device, page_index, output_format)
+        cached = self._cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        ref = (key, True)
+        stream = self._streams.get(ref)
+        if stream is None:
+            task = self._inflight.get(ref)
+            if task is not None:
+                # A scheduled banded render of this key is already running.
+                _key, data, _frames = await asyncio.shield(task)
+                yield data
+                return
+            stream = _BandStream()
+            self._streams[ref] = stream
+            # Run as its own task so the render outlives a client that disconnects.
+            task = asyncio.get_running_loop().create_task(
+                self._async_run_stream(stream, key, device, page_index)
+            )
+            self._inflight[ref] = task
+            task.add_done_callback(lambda done: self._async_stream_done(ref, done))
+        async for chunk in stream.read():
+            yield chunk
+
+    def _async_stream_done(
+        self, ref: Tuple[RenderCacheKey, bool], task: "asyncio.Task[_RenderOutput]"
+    ) -> None:
+        self._streams.pop(ref, None)
+        self._async_render_done(ref, task)
+
+    async def _async_run_stream(
+        self, stream: "_BandStream", key: RenderCacheKey, device: DeviceConfig, page_index: int
+    ) -> _RenderOutput:
+        try:
+            visible = self.page_visibility(device, page_index)
+            snapshot = await self._async_snapshot(device, page_index, visible)
+            widgets: List[WidgetTiming] = []
+            chunks = _page_band_chunks(
+                snapshot, device, page_index, key.output_format, visible, widgets, self.hardware_features(device)
+            )
+            loop = asyncio.get_running_loop()
+            elapsed = 0.0
+            while True:
+                chunk, seconds = await loop.run_in_executor(self._executor, _next_chunk_timed, chunks)
+                elapsed += seconds
+                if chunk is None:
+                    break
+                stream.push(chunk)
+        except BaseException as err:
+            stream.finish(err)
+            raise
+        stream.finish()
+        data = b"".join(stream.chunks)
+        self._stats.record(device.device_id, page_index, _banded_timings(widgets, elapsed, len(data)))
+        self._store_data(key, data)
+        return key, data, None
+
+    async def async_current_frames(self, device: DeviceConfig, page_index: int) -> PageFrames:
+        """Return the page's frame history, rendering first if it is not current.
+
+        A cache hit can serve an older image without touching the retained
+        frame, so the frame is checked against the current key explicitly.
+        """
+        key = self.cache_key(device, page_index)
+        frames = self._frames.get((device.device_id, page_index))
+        if frames is not None and frames.key.same_inputs(key):
+            return frames
+        _key, _data, frames = await self._async_render(key, device, page_index)
+        return frames
+
+    async def async_render_delta(self, device: DeviceConfig, page_index: int, since: Optional[int]) -> Tuple[bytes, int]:
+        """Return (delta payload, frame seq) with the regions changed after frame `since`."""
+        frames = await self.async_current_frames(device, page_index)
+        boxes = frames.changed_since(since) if since is not None else None
+        loop = asyncio.get_running_loop()
+        payload = await loop.run_in_executor(
+            self._executor,
+            encode_delta,
+            frames.frame.image,
+            boxes,
+            frames.seq,
+            device.orientation == "portrait",
+        )
+        return payload, frames.seq
+
+    async def _async_render(
+        self,
+        key: RenderCacheKey,
+        device: DeviceConfig,
+        page_index: int,
+        priority: int = PRIORITY_INTERACTIVE,
+        banded: bool = False,
+    ) -> _RenderOutput:
+        """Render through the scheduler; banded renders return no frames."""
+        task = self._inflight.get((key, banded))
+        if task is None:
+            # Run as its own task so a client disconnecting mid-render does
+            # not throw away work other callers (or the cache) can use.
+            task = asyncio.get_running_loop().create_task(
+                self._async_run_render(key, device, page_index, priority, banded)
+            )
+            self._inflight[(key, banded)] = task
+            task.add_done_callback(lambda done: self._async_render_done((key, banded), done))
+        else:
+            self._scheduler.promote(_job_key(key, banded), priority)
+        return await asyncio.shield(task)
+
+    def _async_render_done(
+        self, ref: Tuple[RenderCacheKey, bool], task: "asyncio.Task[_RenderOutput]"
+    ) -> None:
+        self._inflight.pop(ref, None)
+        if not task.cancelled():
+            # Retrieve the exception so unawaited failures are not reported twice.
+            task.exception()
+
+    async def _async_snapshot(
+        self, device: DeviceConfig, page_index: int, visible: Sequence[bool]
+    ) -> HassSnapshot:
+        """Capture what the page reads, fetching its graph series first."""
+        page = device.pages[page_index]
+        keys = page_series_keys(page, visible)
+        series = await asyncio.gather(*(self._history.async_series(self._hass, key) for key in keys))
+        entity_ids, _time_dependent = page_dependencies(page, visible)
+        return HassSnapshot.capture(self._hass, entity_ids, dict(zip(keys, series)))
+
+    async def _async_run_render(
+        self, key: RenderCacheKey, device: DeviceConfig, page_index: int, priority: int, banded: bool
+    ) -> _RenderOutput:
+        visible = self.page_visibility(device, page_index)
+        features = self.hardware_features(device)
+        snapshot = await self._async_snapshot(device, page_index, visible)
+        if banded:
+            result: RenderResult = await self._scheduler.async_submit(
+                _job_key(key, banded), priority, _render_banded_job, key, snapshot, device, visible, features
+            )
+            self._stats.record(device.device_id, page_index, result.timings)
+            self._store_data(result.key, result.data)
+            return result.key, result.data, None
+
+        page_ref = (device.device_id, page_index)
+        retained = self._frames.get(page_ref)
+        if retained is not None and retained.key.layout_revision != key.layout_revision:
+            retained = None
+
+        result = await self._scheduler.async_submit(
+            _job_key(key),
+            priority,
+            _render_job,
+            key,
+            snapshot,
+            device,
+            retained.frame.signatures if retained is not None else None,
+            retained.seq if retained is not None else None,
+            visible,
+            features,
+        )
+        if isinstance(result.frame, FramePatch):
+            base = next(
+                (
+                    frames.frame
+                    for frames in (retained, self._frames.get(page_ref))
+                    if frames is not None and frames.seq == result.base_seq
+                ),
+                None,
+            )
+            if base is None:
+                # The frame the patch applies to was replaced meanwhile; get the whole canvas.
+                result = await self._scheduler.async_submit(
+                    _job_key(key), priority, _render_job, key, snapshot, device, None, None, visible, features
+                )
+            else:
+                result = result._replace(frame=result.frame.apply(base))
+        self._stats.record(device.device_id, page_index, result.timings)
+        frames = self._store_frame(page_ref, result)
+        self._store_data(result.key, result.data)
+        return result.key, result.data, frames
+
+    def _store_data(self, key: RenderCacheKey, data: bytes) -> None:
+        self._cache.put(key, data)
+        self._last_good[(key.device_id, key.page_index, key.output_format)] = (key, data, time.monotonic())
+
+    def _store_frame(self, page_ref: Tuple[str, int], result: RenderResult) -> PageFrames:
+        current = self._frames.get(page_ref)
+        if current is not None and current.key == result.key:
+            # Another caller shared this job and already stored it.
+            return current
+        if current is not None and (
+            current.seq != result.base_seq or current.key.layout_revision != result.key.layout_revision
+        ):
+            # The frame was drawn against an older base; record it as a full redraw.
+            dirty = None
+        else:
+            dirty = result.frame.dirty
+
+        if current is not None and dirty == []:
+            # Same pixels as the retained frame; keep its sequence number.
+            frames = PageFrames(result.key, result.frame, current.seq, current.log)
+        else:
+            self._frame_seq = (self._frame_seq + 1) & 0xFFFFFFFF
+            frames = PageFrames(result.key, result.frame, self._frame_seq)
+            if current is not None and current.key.layout_revision == result.key.layout_revision:
+                frames.log = current.log
+                frames.log.append((current.seq, frames.seq, dirty))
+        self._frames[page_ref] = frames
+        return frames
+
+    def shutdown(self) -> None:
+        """Stop accepting renders and release worker processes and threads."""
+        self._unsub_layout()
+        if self._image_check is not None:
+            self._image_check.cancel()
+        self._scheduler.shutdown()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        _LOGGER.debug("%s: Render service shut down", DOMAIN)
+
+
+async def _drain_stream(first: "asyncio.Future[bytes]", chunks: AsyncIterator[bytes]) -> None:
+    """Finish a stream nobody is reading so its output still gets cached."""
+    await first
+    async for _chunk in chunks:
+        pass
+
+
+def _image_file_versions(config_dir: str, raw_paths: List[str]) -> List[Optional[Tuple[str, int]]]:
+    return [image_file_version(config_dir, raw_path) for raw_path in raw_paths]
+
+
+def _log_background_failure(render: "asyncio.Future[Any]") -> None:
+    if not render.cancelled() and render.exception() is not None:
+        _LOGGER.warning("%s: Background render failed: %s", DOMAIN, render.exception())
+
+
+def _job_key(key: RenderCacheKey, banded: bool = False) -> Tuple[str, int, int, str, bool]:
+    """Coalesce render jobs per (device, page, layout revision, format) and kind."""
+    return key.device_id, key.page_index, key.layout_revision, key.output_format, banded
@@ -0,0 +1,181 @@
+"""
+Render timing statistics for the diagnostics report.
+
+When a page gets slow, a widget error in the log is the only signal today,
+which cannot tell fonts, images, graphs or encoding apart. Each render job
+therefore reports how long every widget took to draw, how long the page took
+to encode and how many bytes came out (RenderTimings). Jobs run in worker
+processes, so the timings travel back with the render result and are
+aggregated here, in the service's process, into fixed-bucket histograms:
+
+- per widget type: draw time,
+- per device: page draw time, encode time and output bytes,
+- per widget instance: mean and worst draw time, for the slow-widget list.
+
+Memory is bounded by the number of widget types, devices and widgets, not
+by the number of renders.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .const import RENDER_STATS_SLOW_WIDGETS
+
+# Histogram bucket upper bounds; the last bucket is open-ended.
+_MS_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+_BYTE_BOUNDS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class WidgetTiming(NamedTuple):
+    """How long one widget took to draw."""
+
+    widget_id: str
+    widget_type: str
+    seconds: float
+
+
+class RenderTimings(NamedTuple):
+    """What a render job measured.
+
+    draw_s is None when an existing canvas was only re-encoded.
+    """
+
+    widgets: Tuple[WidgetTiming, ...]
+    draw_s: Optional[float]
+    encode_s: float
+    size: int
+
+
+class Histogram:
+    """Counts of observations per bucket, plus count, sum and maximum."""
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self._bounds = tuple(bounds)
+        self.buckets = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add one observation."""
+        self.buckets[bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Return the upper bound of the bucket holding the given fraction of observations."""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target and count:
+                return self._bounds[index] if index < len(self._bounds) else self.max
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Summarize for the diagnostics report."""
+        labels = [f"<={bound}" for bound in self._bounds] + [f">{self._bounds[-1]}"]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "max": round(self.max, 3),
+            "buckets": {label: count for label, count in zip(labels, self.buckets) if count},
+        }
+
+
+@dataclass
+class _WidgetRecord:
+    widget_type: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+class _DeviceStats:
+    def __init__(self) -> None:
+        self.draw_ms = Histogram(_MS_BOUNDS)
+        self.encode_ms = Histogram(_MS_BOUNDS)
+        self.size = Histogram(_BYTE_BOUNDS)
+
+
+class RenderStats:
+    """Aggregate RenderTimings into per widget type and per device histograms."""
+
+    def __init__(self, slow_widgets: int = RENDER_STATS_SLOW_WIDGETS) -> None:
+        self._slow_widgets = slow_widgets
+        self._widget_types: Dict[str, Histogram] = {}
+        self._devices: Dict[str, _DeviceStats] = {}
+        self._widgets: Dict[Tuple[str, int, str], _WidgetRecord] = {}
+
+    def record(self, device_id: str, page_index: int, timings: Optional[RenderTimings]) -> None:
+        """Add the measurements of one render or re-encode of a page."""
+        if timings is None:
+            return
+        device = self._devices.get(device_id)
+        if device is None:
+            device = self._devices[device_id] = _DeviceStats()
+        if timings.draw_s is not None:
+            device.draw_ms.observe(timings.draw_s * 1000)
+        device.encode_ms.observe(timings.encode_s * 1000)
+        device.size.observe(timings.size)
+
+        for widget in timings.widgets:
+            ms = widget.seconds * 1000
+            histogram = self._widget_types.get(widget.widget_type)
+            if histogram is None:
+                histogram = self._widget_types[widget.widget_type] = Histogram(_MS_BOUNDS)
+            histogram.observe(ms)
+
+            ref = (device_id, page_index, widget.widget_id)
+            record = self._widgets.get(ref)
+            if record is None or record.widget_type != widget.widget_type:
+                record = self._widgets[ref] = _WidgetRecord(widget.widget_type)
+            record.count += 1
+            record.total_ms += ms
+            record.max_ms = max(record.max_ms, ms)
+
+    def forget_widgets(self, device_id: str) -> None:
+        """Drop a device's per-widget figures; its widgets may have changed or gone."""
+        for ref in [ref for ref in self._widgets if ref[0] == device_id]:
+            del self._widgets[ref]
+
+    def slow_widgets(self) -> List[Dict[str, Any]]:
+        """Return the widgets with the highest mean draw time, slowest first."""
+        ranked = sorted(self._widgets.items(), key=lambda item: item[1].total_ms / item[1].count, reverse=True)
+        return [
+            {
+                "device_id": device_id,
+                "page_index": page_index,
+                "widget_id": widget_id,
+                "type": record.widget_type,
+                "draws": record.count,
+                "mean_ms": round(record.total_ms / record.count, 3),
+                "max_ms": round(record.max_ms, 3),
+            }
+            for (device_id, page_index, widget_id), record in ranked[: self._slow_widgets]
+        ]
+
+    def report(self) -> Dict[str, Any]:
+        """Return every histogram and the slow-widget list as plain data."""
+        return {
+            "widget_types": {
+                widget_type: histogram.as_dict() for widget_type, histogram in sorted(self._widget_types.items())
+            },
+            "devices": {
+                device_id: {
+                    "draw_ms": device.draw_ms.as_dict(),
+                    "encode_ms": device.encode_ms.as_dict(),
+                    "bytes": device.size.as_dict(),
+                }
+                for device_id, device in sorted(self._devices.items())
+            },
+            "slow_widgets": self.slow_widgets(),
+        }
@@ -14,36 +14,43 @@ from __future__ import annotations
 
 import io
 import logging
-from typing import Any, Tuple
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
 
 from PIL import Image, ImageDraw, ImageFont
 
 from homeassistant.core import HomeAssistant, State
 
-from .const import IMAGE_WIDTH, IMAGE_HEIGHT
+from .const import IMAGE_WIDTH, IMAGE_HEIGHT, RENDER_BAND_HEIGHT
+from .fonts import FONT_REGISTRY
+from .history_series import Series, SeriesKey, parse_duration, series_valid_until
+from .image_cache import IMAGE_CACHE
 from .models import DeviceConfig, PageConfig, WidgetConfig
+from .paths import resolve_image_path
+from .render_stats import WidgetTiming
+from .visibility import compile_page_conditions
 
 _LOGGER = logging.getLogger(__name__)
 
-# Attempt to load a reasonable default font; HA containers usually have DejaVu.
-# Fallback to PIL's default if needed.
-try:
-    DEFAULT_FONT = ImageFont.truetype("DejaVuSans.ttf", 18)
-    DEFAULT_FONT_SMALL = ImageFont.truetype("DejaVuSans.ttf", 14)
-    DEFAULT_FONT_LARGE = ImageFont.truetype("DejaVuSans.ttf", 24)
-except Exception:  # noqa: BLE001
-    DEFAULT_FONT = ImageFont.load_default()
-    DEFAULT_FONT_SMALL = ImageFont.load_default()
-    DEFAULT_FONT_LARGE = ImageFont.load_default()
-
-
-def _get_font(size: int | None) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
-    if not size:
-        return DEFAULT_FONT
+# (x1, y1, x2, y2) in canvas pixels, exclusive of x2/y2.
+Box = Tuple[int, int, int, int]
+
+
+def _get_font(
+    size: int | None, family: str | None = None, weight: int | None = None
+) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
     try:
-        return ImageFont.truetype("DejaVuSans.ttf", size)
-    except Exception:  # noqa: BLE001
-        return DEFAULT_FONT
+        return FONT_REGISTRY.font(size, family, int(weight) if weight else None)
+    except (TypeError, ValueError):
+        return FONT_REGISTRY.font(size)
+
+
+def _widget_font(w_cfg: WidgetConfig, size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """Return the widget's configured font family and weight at the given size."""
+    return _get_font(size, w_cfg.props.get("font_family"), w_cfg.props.get("font_weight"))
 
 
 def _get_state(hass: HomeAssistant, entity_id: str | None) -> State | None:
@@ -52,9 +59,14 @@ def _get_state(hass: HomeAssistant, entity_id: str | None) -> State | None:
     return hass.states.get(entity_id)
 
 
+def _text_size(text: str, font) -> Tuple[int, int]:
+    """Measure text's bounding box; results are memoized per font and string."""
+    return FONT_REGISTRY.text_size(font, text)
+
+
 def _draw_text_centered(draw: ImageDraw.ImageDraw, box: Tuple[int, int, int, int], text: str, font) -> None:
     x1, y1, x2, y2 = box
-    w, h = draw.textsize(text, font=font)
+    w, h = _text_size(text, font)
     x = x1 + (x2 - x1 - w) / 2
     y = y1 + (y2 - y1 - h) / 2
     draw.text((x, y), text, fill=0, font=font)
@@ -70,8 +82,8 @@ def _draw_widget_sensor(
     x2, y2 = x1 + w_cfg.width, y1 + w_cfg.height
 
     font_size = int(w_cfg.props.get("font_size", 18))
-    font = _get_font(font_size)
-    title_font = _get_font(int(w_cfg.props.get("title_font_size", font_size - 2)))
+    font = _widget_font(w_cfg, font_size)
+    title_font = _widget_font(w_cfg, int(w_cfg.props.get("title_font_size", font_size - 2)))
 
     if state is None:
         label = w_cfg.title or (w_cfg.entity_id or "")
@@ -101,7 +113,7 @@ def _draw_widget_sensor(
 
     # Value
     text = f"{value_str}{unit}"
-    vw, vh = draw.textsize(text, font=font)
+    vw, vh = _text_size(text, font)
     vx = min(x1 + 4, x2 - vw - 2)
     draw.text((vx, value_y - vh / 2), text, fill=0, font=font)
 
@@ -115,7 +127,7 @@ def _draw_widget_label(
     text = w_cfg.title or w_cfg.props.get("text", "") or ""
     if not text:
         return
-    font = _get_font(int(w_cfg.props.get("font_size", 18)))
+    font = _widget_font(w_cfg, int(w_cfg.props.get("font_size", 18)))
     _draw_text_centered(draw, (x1, y1, x2, y2), text, font)
 
 
@@ -129,24 +141,20 @@ def _draw_widget_clock(
     x1, y1 = w_cfg.x, w_cfg.y
     x2, y2 = x1 + w_cfg.width, y1 + w_cfg.height
 
-    font_time = _get_font(int(w_cfg.props.get("time_font_size", 28)))
-    font_date = _get_font(int(w_cfg.props.get("date_font_size", 16)))
+    font_time = _widget_font(w_cfg, int(w_cfg.props.get("time_font_size", 28)))
+    font_date = _widget_font(w_cfg, int(w_cfg.props.get("date_font_size", 16)))
 
     if now:
         time_str = now.state
     else:
-        from datetime import datetime
-
         time_str = datetime.now().strftime("%H:%M")
 
     # Date from system since no specific entity is enforced
-    from datetime import datetime
-
     date_str = datetime.now().strftime("%a, %b %d")
 
     # Time top, date below
-    tw, th = draw.textsize(time_str, font=font_time)
-    dw, dh = draw.textsize(date_str, font=font_date)
+    tw, th = _text_size(time_str, font_time)
+    dw, dh = _text_size(date_str, font_date)
 
     cx = x1 + (w_cfg.width - tw) / 2
     cy = y1 + (w_cfg.height - (th + dh + 4)) / 2
@@ -155,6 +163,90 @@ def _draw_widget_clock(
     draw.text((x1 + (w_cfg.width - dw) / 2, cy + th + 4), date_str, fill=0, font=font_date)
 
 
+# Widget types drawn from an image file (see image_cache.py).
+_IMAGE_WIDGET_TYPES = frozenset({"image", "online_image"})
+
+# The image plugin's render_mode choices -> ESPHome image type.
+_IMAGE_RENDER_MODES = {"Binary": "BINARY", "Grayscale": "GRAYSCALE", "Color (RGB565)": "RGB565"}
+
+
+def _image_raw_path(w_cfg: WidgetConfig) -> str:
+    return w_cfg.props.get("path") or w_cfg.props.get("url") or ""
+
+
+def _config_dir(hass: HomeAssistant) -> Optional[str]:
+    return getattr(getattr(hass, "config", None), "config_dir", None)
+
+
+def _image_source(hass: HomeAssistant, w_cfg: WidgetConfig) -> Optional[Path]:
+    """Resolve an image widget's file within the image roots the proxy allows.
+
+    Remote online_image URLs are not fetched server-side and resolve to None.
+    """
+    raw_path = _image_raw_path(w_cfg)
+    config_dir = _config_dir(hass)
+    if not config_dir or "://" in raw_path:
+        return None
+    return resolve_image_path(config_dir, raw_path)
+
+
+def image_file_version(config_dir: Optional[str], raw_path: str) -> Optional[Tuple[str, int]]:
+    """Return (path, mtime_ns) of an image widget's file, or None if it has none.
+
+    Reads the filesystem, so callers on the event loop must use an executor.
+    """
+    if not config_dir or "://" in raw_path:
+        return None
+    path = resolve_image_path(config_dir, raw_path)
+    if path is None:
+        return None
+    try:
+        return str(path), path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _image_version(hass: HomeAssistant, w_cfg: WidgetConfig) -> Optional[Tuple[str, int]]:
+    return image_file_version(_config_dir(hass), _image_raw_path(w_cfg))
+
+
+def page_image_paths(page: PageConfig, visible: Optional[Sequence[bool]] = None) -> List[str]:
+    """Return the configured file path of each visible image widget."""
+    return [
+        _image_raw_path(w_cfg)
+        for index, w_cfg in enumerate(page.widgets)
+        if visible is None or visible[index]
+        if (w_cfg.type or "label").lower() in _IMAGE_WIDGET_TYPES
+    ]
+
+
+def _draw_widget_image(
+    hass: HomeAssistant,
+    canvas: Image.Image,
+    draw: ImageDraw.ImageDraw,
+    w_cfg: WidgetConfig,
+) -> None:
+    x1, y1 = w_cfg.x, w_cfg.y
+    x2, y2 = x1 + w_cfg.width, y1 + w_cfg.height
+    path = _image_source(hass, w_cfg)
+    bitmap = None
+    if path is not None:
+        image_type = _IMAGE_RENDER_MODES.get(str(w_cfg.props.get("render_mode") or ""))
+        bitmap = IMAGE_CACHE.bitmap(
+            path,
+            (w_cfg.width, w_cfg.height),
+            image_type or str(w_cfg.props.get("image_type") or "BINARY"),
+            str(w_cfg.props.get("dither") or "FLOYDSTEINBERG"),
+            bool(w_cfg.props.get("invert")),
+        )
+    if bitmap is None:
+        # Same placeholder frame the editor shows for a missing image.
+        draw.rectangle((x1, y1, x2 - 1, y2 - 1), outline=0)
+        return
+    # ESPHome draws images from their top-left corner.
+    canvas.paste(bitmap, (x1, y1))
+
+
 def _draw_widget_list(
     hass: HomeAssistant,
     draw: ImageDraw.ImageDraw,
@@ -165,7 +257,7 @@ def _draw_widget_list(
     y = w_cfg.y + 4
     max_y = w_cfg.y + w_cfg.height - 4
 
-    font = _get_font(int(w_cfg.props.get("font_size", 14)))
+    font = _widget_font(w_cfg, int(w_cfg.props.get("font_size", 14)))
     line_height = font.size + 4 if hasattr(font, "size") else 18
 
     items = []
@@ -193,23 +285,273 @@ def _draw_widget_list(
         draw.text((x, item_y), f"- {item}", fill=0, font=font)
 
 
-def render_page_to_png(
+# Widget types plotting an entity's recorded history (see history_series.py).
+_GRAPH_WIDGET_TYPES = frozenset({"graph", "history"})
+
+
+def _graph_border(w_cfg: WidgetConfig) -> int:
+    """Return the graph frame's line width; the editor draws 2px unless disabled."""
+    if w_cfg.props.get("border_width") is not None:
+        try:
+            return max(0, int(w_cfg.props["border_width"]))
+        except (TypeError, ValueError):
+            return 0
+    return 2 if w_cfg.props.get("border", True) is not False else 0
+
+
+def graph_series_key(w_cfg: WidgetConfig) -> Optional[SeriesKey]:
+    """Return the series a graph widget plots, one value per column inside its frame."""
+    if (w_cfg.type or "label").lower() not in _GRAPH_WIDGET_TYPES:
+        return None
+    entity_id = w_cfg.entity_id or w_cfg.props.get("entity_id")
+    if not isinstance(entity_id, str) or not entity_id.strip():
+        return None
+    if w_cfg.props.get("duration") is None and w_cfg.props.get("time_window") is not None:
+        # The legacy history widget's window is in minutes.
+        duration_s = parse_duration(f"{w_cfg.props['time_window']}m")
+    else:
+        duration_s = parse_duration(w_cfg.props.get("duration"))
+    width = max(1, w_cfg.width - 2 * _graph_border(w_cfg))
+    return SeriesKey(entity_id.strip(), duration_s, width)
+
+
+def page_series_keys(page: PageConfig, visible: Optional[Sequence[bool]] = None) -> List[SeriesKey]:
+    """Return the history series the page's visible graph widgets plot."""
+    keys = {
+        key
+        for index, w_cfg in enumerate(page.widgets)
+        if visible is None or visible[index]
+        if (key := graph_series_key(w_cfg)) is not None
+    }
+    return sorted(keys)
+
+
+def _page_series(hass: HomeAssistant, key: Optional[SeriesKey]) -> Optional[Series]:
+    """Look up a prefetched series; renders from a live hass have none."""
+    if key is None:
+        return None
+    return (getattr(hass, "history", None) or {}).get(key)
+
+
+def _coerce_float(value: Any, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _draw_widget_graph(
     hass: HomeAssistant,
-    device: DeviceConfig,
-    page: PageConfig,
-) -> bytes:
+    draw: ImageDraw.ImageDraw,
+    w_cfg: WidgetConfig,
+) -> None:
+    x1, y1 = w_cfg.x, w_cfg.y
+    x2, y2 = x1 + w_cfg.width, y1 + w_cfg.height
+    border = _graph_border(w_cfg)
+    if border:
+        draw.rectangle((x1, y1, x2 - 1, y2 - 1), outline=0, width=border)
+    top = y1 + border
+    if w_cfg.title:
+        font = _widget_font(w_cfg, int(w_cfg.props.get("font_size", 12)))
+        _tw, th = _text_size(w_cfg.title, font)
+        _draw_text_centered(draw, (x1, top, x2, top + th + 4), w_cfg.title, font)
+        top += th + 4
+    left, right, bottom = x1 + border, x2 - border, y2 - border
+
+    key = graph_series_key(w_cfg)
+    series = _page_series(hass, key)
+    if key is None or not series or bottom - top < 2:
+        return
+    columns = list(series)
+    # The series ends at its last refresh boundary; add the value shown now.
+    state = _get_state(hass, key.entity_id)
+    try:
+        value = float(state.state) if state is not None else None
+    except (TypeError, ValueError):
+        value = None
+    if value is not None:
+        last = columns[-1]
+        columns[-1] = (value, value) if last is None else (min(last[0], value), max(last[1], value))
+
+    values = [bound for column in columns if column is not None for bound in column]
+    if not values:
+        return
+    if w_cfg.props.get("auto_scale", True) is not False:
+        low, high = min(values), max(values)
+        pad = (high - low) * 0.1 or 1.0
+        low, high = low - pad, high + pad
+    else:
+        low = _coerce_float(w_cfg.props.get("min_value"), 0.0)
+        high = _coerce_float(w_cfg.props.get("max_value"), 100.0)
+    if high <= low:
+        high = low + 1.0
+
+    def to_y(v: float) -> int:
+        fraction = min(max((v - low) / (high - low), 0.0), 1.0)
+        return round(bottom - 1 - fraction * (bottom - 1 - top))
+
+    thickness = max(1, int(_coerce_float(w_cfg.props.get("line_thickness"), 3)))
+    before, after = (thickness - 1) // 2, thickness // 2
+    line_type = str(w_cfg.props.get("line_type") or "SOLID").upper()
+    for offset, column in enumerate(columns[: right - left]):
+        if column is None:
+            continue
+        if (line_type == "DASHED" and offset % 10 >= 5) or (line_type == "DOTTED" and offset % 4 >= 2):
+            continue
+        x = left + offset
+        draw.rectangle(
+            (
+                max(x - before, left),
+                max(to_y(column[1]) - before, top),
+                min(x + after, right - 1),
+                min(to_y(column[0]) + after, bottom - 1),
+            ),
+            fill=0,
+        )
+
+
+# Entities some widget types read on their own, beyond the widget's references.
+_IMPLICIT_WIDGET_ENTITIES = {
+    "clock": ("sensor.time",),
+}
+
+# Widget types whose output depends on the wall clock rather than HA states.
+_TIME_DEPENDENT_WIDGET_TYPES = frozenset({"clock"})
+
+
+def widget_valid_until(hass: HomeAssistant, w_cfg: WidgetConfig, now: datetime) -> Optional[datetime]:
+    """Return when the widget's pixels next change with time, or None if they do not.
+
+    A clock shows sensor.time when that entity exists (its changes are state
+    changes) and the system's %H:%M otherwise; its date line rolls over at
+    midnight either way. A graph moves when its history window does.
     """
-    Render a single page to PNG bytes.
+    series_key = graph_series_key(w_cfg)
+    if series_key is not None:
+        return datetime.fromtimestamp(series_valid_until(series_key, now.timestamp()))
+    if (w_cfg.type or "label").lower() not in _TIME_DEPENDENT_WIDGET_TYPES:
+        return None
+    if hass.states.get("sensor.time") is None:
+        return now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    return datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
 
-    - Creates an 800x480 white canvas.
-    - Draws each widget based on its type.
-    - Returns PNG bytes suitable for direct response to the device.
-    """
 
-    # Use dimensions from device config, falling back to defaults
-    width = device.width or IMAGE_WIDTH
-    height = device.height or IMAGE_HEIGHT
+def page_valid_until(
+    hass: HomeAssistant,
+    page: PageConfig,
+    visible: Optional[Sequence[bool]] = None,
+    now: Optional[datetime] = None,
+) -> Optional[datetime]:
+    """Return the earliest moment a visible widget changes with time alone."""
+    now = now or datetime.now()
+    moments = [
+        moment
+        for index, w_cfg in enumerate(page.widgets)
+        if visible is None or visible[index]
+        if (moment := widget_valid_until(hass, w_cfg, now)) is not None
+    ]
+    return min(moments, default=None)
+
+
+def page_dependencies(
+    page: PageConfig, visible: Optional[Sequence[bool]] = None
+) -> Tuple[List[str], bool]:
+    """Return (entity_ids, time_dependent) for everything a page render reads.
+
+    Hidden widgets (see visibility.py) only contribute their condition entity.
+    """
+    entity_ids: List[str] = []
+    time_dependent = False
+    for index, w_cfg in enumerate(page.widgets):
+        if visible is not None and not visible[index]:
+            if w_cfg.condition_entity:
+                entity_ids.append(str(w_cfg.condition_entity).strip())
+            continue
+        wtype = (w_cfg.type or "label").lower()
+        entity_ids.extend(w_cfg.entity_ids())
+        entity_ids.extend(_IMPLICIT_WIDGET_ENTITIES.get(wtype, ()))
+        if wtype in _TIME_DEPENDENT_WIDGET_TYPES:
+            time_dependent = True
+    return sorted(set(entity_ids)), time_dependent
+
+
+def _widget_box(w_cfg: WidgetConfig, width: int, height: int) -> Box:
+    """Return the widget's bounding box clipped to the canvas."""
+    x1 = min(max(w_cfg.x, 0), width)
+    y1 = min(max(w_cfg.y, 0), height)
+    x2 = min(max(w_cfg.x + w_cfg.width, 0), width)
+    y2 = min(max(w_cfg.y + w_cfg.height, 0), height)
+    return x1, y1, x2, y2
+
+
+def _widget_signature(hass: HomeAssistant, w_cfg: WidgetConfig, now: datetime, visible: bool = True) -> Any:
+    """Summarize everything a widget's pixels depend on besides its config."""
+    wtype = (w_cfg.type or "label").lower()
+    if not visible:
+        return (wtype, w_cfg.x, w_cfg.y, w_cfg.width, w_cfg.height, None)
+    inputs = []
+    for entity_id in (*w_cfg.entity_ids(), *_IMPLICIT_WIDGET_ENTITIES.get(wtype, ())):
+        state = _get_state(hass, entity_id)
+        inputs.append((entity_id, None, None) if state is None else (entity_id, state.state, str(state.last_updated)))
+    if wtype in _TIME_DEPENDENT_WIDGET_TYPES:
+        inputs.append(widget_valid_until(hass, w_cfg, now))
+    if wtype in _GRAPH_WIDGET_TYPES:
+        inputs.append(_page_series(hass, graph_series_key(w_cfg)))
+    if wtype in _IMAGE_WIDGET_TYPES:
+        inputs.append(_image_version(hass, w_cfg))
+    return (wtype, w_cfg.x, w_cfg.y, w_cfg.width, w_cfg.height, tuple(inputs))
+
+
+def _boxes_intersect(a: Box, b: Box) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _draw_widget(
+    hass: HomeAssistant,
+    canvas: Image.Image,
+    draw: ImageDraw.ImageDraw,
+    device: DeviceConfig,
+    w_cfg: WidgetConfig,
+    timings: Optional[List[WidgetTiming]] = None,
+) -> None:
+    wtype = (w_cfg.type or "label").lower()
 
+    started = time.perf_counter()
+    try:
+        if wtype in ("sensor", "sensor_text"):
+            _draw_widget_sensor(hass, draw, w_cfg)
+        elif wtype in ("label", "text"):
+            _draw_widget_label(draw, w_cfg)
+        elif wtype == "clock":
+            _draw_widget_clock(hass, draw, w_cfg)
+        elif wtype == "list":
+            _draw_widget_list(hass, draw, w_cfg)
+        elif wtype in _IMAGE_WIDGET_TYPES:
+            _draw_widget_image(hass, canvas, draw, w_cfg)
+        elif wtype in _GRAPH_WIDGET_TYPES:
+            _draw_widget_graph(hass, draw, w_cfg)
+        else:
+            _LOGGER.debug("Skipping unknown widget type: %s", wtype)
+    except Exception as exc: # noqa: BLE001
+        _LOGGER.error(
+            "Error rendering widget %s in device %s: %s",
+            w_cfg.id,
+            device.device_id,
+            exc,
+        )
+    if timings is not None:
+        timings.append(WidgetTiming(w_cfg.id, wtype, time.perf_counter() - started))
+
+
+def _draw_page(
+    hass: HomeAssistant,
+    device: DeviceConfig,
+    widgets: List[WidgetConfig],
+    width: int,
+    height: int,
+    timings: Optional[List[WidgetTiming]] = None,
+) -> Image.Image:
+    """Draw the given widgets onto a fresh white canvas."""
     # Base white canvas, 1-channel (L) for grayscale. E-ink can dither this.
     image = Image.new("L", (width, height), color=255)
     draw = ImageDraw.Draw(image)
@@ -217,32 +559,165 @@ def render_page_to_png(
     # Optional: draw a subtle border
     draw.rectangle((0, 0, width - 1, height - 1), outline=0)
 
+    for w_cfg in widgets:
+        _draw_widget(hass, image, draw, device, w_cfg, timings)
+    return image
+
+
+@dataclass
+class RenderedFrame:
+    """A rendered page canvas plus what is needed to update it incrementally.
+
+    signatures/boxes are aligned with page.widgets. dirty lists the boxes that
+    changed relative to the previous frame; None means the whole canvas.
+    Frames are never mutated after creation, so they can be shared safely.
+    """
+
+    image: Image.Image
+    signatures: List[Any]
+    boxes: List[Box]
+    dirty: Optional[List[Box]] = None
+
+
+def changed_boxes(old_signatures: Sequence[Any], signatures: Sequence[Any], boxes: Sequence[Box]) -> List[Box]:
+    """Return the on-canvas boxes of widgets whose signature changed."""
+    return [
+        box
+        for box, old, new in zip(boxes, old_signatures, signatures)
+        if old != new and box[0] < box[2] and box[1] < box[3]
+    ]
+
+
+def render_page(
+    hass: HomeAssistant,
+    device: DeviceConfig,
+    page: PageConfig,
+    previous: Optional[RenderedFrame] = None,
+    visible: Optional[Sequence[bool]] = None,
+    timings: Optional[List[WidgetTiming]] = None,
+) -> RenderedFrame:
+    """
+    Render a single page to a grayscale canvas.
+
+    Widgets whose visibility condition is false are skipped; pass `visible`
+    (one flag per widget) to reuse flags already evaluated for the cache key.
+    Pass a list as `timings` to collect the draw time of every widget drawn.
+
+    When a previous frame of the same layout is supplied, only widgets whose
+    inputs changed are redrawn: widgets overlapping their boxes are drawn onto
+    a scratch canvas and just the dirty boxes are pasted over a copy of the
+    previous image. Callers must not pass a frame from a different layout
+    revision.
+    """
+
+    # Use dimensions from device config, falling back to defaults
+    width = device.width or IMAGE_WIDTH
+    height = device.height or IMAGE_HEIGHT
+
     for w_cfg in page.widgets:
         # Ensure widget is in bounds
         w_cfg.clamp_to_canvas()
 
-        wtype = (w_cfg.type or "label").lower()
+    if visible is None:
+        visible = compile_page_conditions(page).evaluate(hass)
+    shown = [w_cfg for w_cfg, is_visible in zip(page.widgets, visible) if is_visible]
+
+    now = datetime.now()
+    signatures = [
+        _widget_signature(hass, w_cfg, now, is_visible) for w_cfg, is_visible in zip(page.widgets, visible)
+    ]
+    boxes = [_widget_box(w_cfg, width, height) for w_cfg in page.widgets]
+
+    if (
+        previous is None
+        or previous.image.size != (width, height)
+        or len(previous.signatures) != len(signatures)
+    ):
+        image = _draw_page(hass, device, shown, width, height, timings)
+        return RenderedFrame(image, signatures, boxes)
+
+    dirty = changed_boxes(previous.signatures, signatures, boxes)
+    if not dirty:
+        return RenderedFrame(previous.image, signatures, boxes, dirty=[])
+
+    dirty_area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in dirty)
+    if dirty_area * 2 >= width * height:
+        image = _draw_page(hass, device, shown, width, height, timings)
+        return RenderedFrame(image, signatures, boxes)
+
+    # Redraw every widget touching a dirty box, in z-order, so overlaps stay correct.
+    affected = [
+        w_cfg
+        for w_cfg, box, is_visible in zip(page.widgets, boxes, visible)
+        if is_visible and any(_boxes_intersect(box, dirty_box) for dirty_box in dirty)
+    ]
+    scratch = _draw_page(hass, device, affected, width, height, timings)
+    image = previous.image.copy()
+    for box in dirty:
+        image.paste(scratch.crop(box), box[:2])
+    return RenderedFrame(image, signatures, boxes, dirty=dirty)
+
+
+def render_page_bands(
+    hass: HomeAssistant,
+    device: DeviceConfig,
+    page: PageConfig,
+    visible: Optional[Sequence[bool]] = None,
+    band_height: int = RENDER_BAND_HEIGHT,
+    timings: Optional[List[WidgetTiming]] = None,
+) -> Iterator[Image.Image]:
+    """
+    Render a page top to bottom as horizontal bands of band_height rows.
+
+    Only one band exists at a time: each is drawn with just the widgets whose
+    box crosses it, shifted up by the band's top, so stacking the bands gives
+    the canvas render_page draws without ever allocating all of it. As with
+    incremental redraws, pixels a widget paints outside its own box are
+    clipped to the bands that box covers. A widget spanning several bands
+    adds one timing per band to `timings`.
+    """
+    width = device.width or IMAGE_WIDTH
+    height = device.height or IMAGE_HEIGHT
 
-        try:
-            if wtype in ("sensor", "sensor_text"):
-                _draw_widget_sensor(hass, draw, w_cfg)
-            elif wtype in ("label", "text"):
-                _draw_widget_label(draw, w_cfg)
-            elif wtype == "clock":
-                _draw_widget_clock(hass, draw, w_cfg)
-            elif wtype == "list":
-                _draw_widget_list(hass, draw, w_cfg)
-            else:
-                _LOGGER.debug("Skipping unknown widget type: %s", wtype)
-        except Exception as exc: # noqa: BLE001
-            _LOGGER.error(
-                "Error rendering widget %s in device %s: %s",
-                w_cfg.id,
-                device.device_id,
-                exc,
-            )
-
-    # Export as PNG
+    for w_cfg in page.widgets:
+        w_cfg.clamp_to_canvas()
+
+    if visible is None:
+        visible = compile_page_conditions(page).evaluate(hass)
+    shown = [
+        (w_cfg, _widget_box(w_cfg, width, height))
+        for w_cfg, is_visible in zip(page.widgets, visible)
+        if is_visible
+    ]
+
+    for top in range(0, height, band_height):
+        bottom = min(height, top + band_height)
+        band = Image.new("L", (width, bottom - top), color=255)
+        draw = ImageDraw.Draw(band)
+        draw.rectangle((0, -top, width - 1, height - 1 - top), outline=0)
+        for w_cfg, box in shown:
+            if box[1] < bottom and box[3] > top:
+                _draw_widget(hass, band, draw, device, replace(w_cfg, y=w_cfg.y - top), timings)
+        yield band
+
+
+def encode_png(image: Image.Image) -> bytes:
+    """Encode a rendered canvas as PNG bytes."""
     output = io.BytesIO()
     image.save(output, format="PNG", optimize=True)
-    return output.getvalue()
\ No newline at end of file
+    return output.getvalue()
+
+
+def render_page_to_png(
+    hass: HomeAssistant,
+    device: DeviceConfig,
+    page: PageConfig,
+) -> bytes:
+    """
+    Render a single page to PNG bytes.
+
+    - Creates an 800x480 white canvas.
+    - Draws each widget based on its type.
+    - Returns PNG bytes suitable for direct response to the device.
+    """
+    return encode_png(render_page(hass, device, page).image)
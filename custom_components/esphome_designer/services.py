@@ -54,7 +54,7 @@ async def _handle_set_page(hass: HomeAssistant, call: ServiceCall) -> None:
     def updater(device):
         device.set_page(page_index)
 
-    updated = await storage.async_update_device(device_id, updater)
+    updated = await storage.async_update_device(device_id, updater, layout_changed=False)
     if not updated:
         _LOGGER.warning("%s: set_page failed, unknown device_id=%s", DOMAIN, device_id)
 
@@ -68,7 +68,7 @@ async def _handle_next_page(hass: HomeAssistant, call: ServiceCall) -> None:
     def updater(device):
         device.next_page()
 
-    updated = await storage.async_update_device(device_id, updater)
+    updated = await storage.async_update_device(device_id, updater, layout_changed=False)
     if not updated:
         _LOGGER.warning("%s: next_page failed, unknown device_id=%s", DOMAIN, device_id)
 
@@ -82,7 +82,7 @@ async def _handle_prev_page(hass: HomeAssistant, call: ServiceCall) -> None:
     def updater(device):
         device.prev_page()
 
-    updated = await storage.async_update_device(device_id, updater)
+    updated = await storage.async_update_device(device_id, updater, layout_changed=False)
     if not updated:
         _LOGGER.warning("%s: prev_page failed, unknown device_id=%s", DOMAIN, device_id)
 
@@ -3,29 +3,185 @@ Persistent storage for the ESPHome Designer Designer.
 
 Uses Home Assistant's Store helper to persist the DashboardState defined in models.py.
 This is the single source of truth for all devices, pages, and widgets.
+
+State is sharded: a small index store (STORAGE_KEY) lists the device ids and
+the last active layout, and each DeviceConfig lives in its own store
+(STORAGE_KEY.device.<id>). Saving one layout serializes and writes only that
+device, however many other layouts the install holds. The original single
+blob ({"devices": {id: device}}) is split into shards on first load.
+
+Stored layouts are deserialized lazily. Loading keeps each device's raw dict
+and builds its DeviceConfig on first access, while the index also carries a
+summary per device (name, page count, model and the entities its widgets
+read) so layout listings and the entity dependency index are served without
+touching layouts nobody opens.
+
+Each device's serialized form (to_dict and its JSON text) is cached against
+the device's layout revision, so saving or serving an unchanged layout does
+not walk and deep-copy it again.
+
+Every mutation also bumps the device's persisted DeviceConfig.revision. The
+layout API serves it as an ETag and passes If-Match values as
+expected_revisions, so a stale editor tab or automation is rejected with
+RevisionConflictError instead of silently overwriting a newer layout.
+
+Mutations are written behind: each one marks its device (and the index)
+dirty and (re)arms a delayed Store write, so an editor autosave burst or a
+run of page-flip service calls writes once. async_flush writes any pending
+change immediately and runs when Home Assistant stops.
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
-from typing import Any, Dict, List, Optional
+import re
+from typing import Any, Callable, Container, Dict, Iterator, List, MutableMapping, NamedTuple, Optional, Set, Tuple, Union
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.json import json_dumps
 from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN, STORAGE_KEY, STORAGE_VERSION
+from .const import DOMAIN, STORAGE_KEY, STORAGE_SAVE_DELAY_S, STORAGE_VERSION
+from .dependency_index import EntityDependencyIndex, device_dependencies
 from .models import DashboardState, DeviceConfig
 
 _LOGGER = logging.getLogger(__name__)
 
+# Device ids that can be used verbatim in a store file name.
+_SAFE_KEY = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def device_store_key(storage_key: str, device_id: str) -> str:
+    """Return the store key holding one device's layout."""
+    if not _SAFE_KEY.match(device_id):
+        device_id = hashlib.sha1(device_id.encode("utf-8")).hexdigest()
+    return f"{storage_key}.device.{device_id}"
+
+
+class _IndexStore(Store):
+    """The STORAGE_KEY store; version 1 held the whole state in one blob.
+
+    The version bump makes older integration versions refuse the index
+    instead of reading it as an empty state and overwriting it. A version 1
+    blob is passed through unchanged and split by DashboardStorage.async_load.
+    """
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        if old_major_version == 1:
+            return old_data
+        raise NotImplementedError(f"Cannot migrate {self.key} from version {old_major_version}")
+
+
+class RevisionConflictError(Exception):
+    """Raised when a layout write expects a revision the stored layout no longer has."""
+
+    def __init__(self, device_id: str, current: Optional[int]) -> None:
+        super().__init__(f"layout {device_id} is at revision {current}")
+        self.device_id = device_id
+        # None when the layout does not exist.
+        self.current = current
+
+
+class _SerializedLayout(NamedTuple):
+    revision: int
+    data: Dict[str, Any]
+    json: Optional[str] = None
+
+
+def _coerce_revision(value: Any) -> int:
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _device_summary(device: DeviceConfig) -> Dict[str, Any]:
+    """Return what the index keeps about a device so it can stay unparsed."""
+    return {
+        "name": device.name,
+        "page_count": len(device.pages),
+        "device_model": device.device_model,
+        "revision": device.revision,
+        "dependencies": [list(dependency) for dependency in device_dependencies(device)],
+    }
+
+
+class _LazyDevices(MutableMapping[str, DeviceConfig]):
+    """Device map that builds each DeviceConfig from its stored dict on first access."""
+
+    def __init__(self, raw: Dict[str, Dict[str, Any]]) -> None:
+        self._entries: Dict[str, Union[DeviceConfig, Dict[str, Any]]] = dict(raw)
+
+    def is_loaded(self, device_id: str) -> bool:
+        """Return True once a device has been deserialized."""
+        return isinstance(self._entries.get(device_id), DeviceConfig)
+
+    def __getitem__(self, device_id: str) -> DeviceConfig:
+        entry = self._entries[device_id]
+        if isinstance(entry, DeviceConfig):
+            return entry
+        try:
+            device = DeviceConfig.from_dict(entry)
+        except (AttributeError, KeyError, TypeError, ValueError) as exc:
+            _LOGGER.error("%s: Failed to parse stored layout %s, dropping it: %s", DOMAIN, device_id, exc)
+            del self._entries[device_id]
+            raise KeyError(device_id) from exc
+        self._entries[device_id] = device
+        return device
+
+    def __setitem__(self, device_id: str, device: DeviceConfig) -> None:
+        self._entries[device_id] = device
+
+    def __delitem__(self, device_id: str) -> None:
+        del self._entries[device_id]
+
+    def __contains__(self, device_id: object) -> bool:
+        return device_id in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 
 class DashboardStorage:
     """Wrapper around Store to manage DashboardState."""
 
-    def __init__(self, hass: HomeAssistant, storage_key: str = STORAGE_KEY, version: int = STORAGE_VERSION) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        storage_key: str = STORAGE_KEY,
+        version: int = STORAGE_VERSION,
+        save_delay: float = STORAGE_SAVE_DELAY_S,
+    ) -> None:
         self._hass = hass
-        self._store = Store(hass, version, storage_key)
+        self._storage_key = storage_key
+        self._version = version
+        self._store = _IndexStore(hass, version, storage_key)
+        self._device_stores: Dict[str, Store] = {}
+        self._save_delay = save_delay
         self._state: Optional[DashboardState] = None
+        # Set by mutations, cleared when the index or a device is serialized for a write.
+        self._index_dirty = False
+        self._dirty_devices: Set[str] = set()
+        # device_id -> _device_summary(); filled from the index or on mutation.
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+        # device_id -> serialized form at a layout revision.
+        self._serialized: Dict[str, _SerializedLayout] = {}
+        # device_id -> last persisted DeviceConfig.revision, kept after deletion
+        # so a re-created layout continues the sequence.
+        self._device_revisions: Dict[str, int] = {}
+        # In-memory layout revisions, bumped on every mutation so render caches
+        # can tell when a device's layout changed without diffing it.
+        self._revision_counter = 0
+        self._revisions: Dict[str, int] = {}
+        self.dependency_index = EntityDependencyIndex()
+        self._layout_listeners: List[Callable[[str], None]] = []
 
     @property
     def state(self) -> DashboardState:
@@ -35,6 +191,20 @@ class DashboardStorage:
             self._state = DashboardState()
         return self._state
 
+    @state.setter
+    def state(self, value: DashboardState) -> None:
+        """Replace the whole in-memory state and re-index it."""
+        self._state = value
+        self._summaries.clear()
+        self.dependency_index.rebuild(value.devices)
+
+    def _device_store(self, device_id: str) -> Store:
+        store = self._device_stores.get(device_id)
+        if store is None:
+            store = Store(self._hass, self._version, device_store_key(self._storage_key, device_id))
+            self._device_stores[device_id] = store
+        return store
+
     async def async_load(self) -> None:
         """Load state from disk into memory."""
         data = await self._store.async_load()
@@ -49,41 +219,222 @@ class DashboardStorage:
             if legacy_data:
                 _LOGGER.info("%s: Found legacy 0.8.6.2 layouts, migrating to %s...", DOMAIN, DOMAIN)
                 data = legacy_data
-                # We will save this to the new store automatically on next save, 
-                # or we can force it immediately below. For safety, let's just use it as 'data'.
 
-        if isinstance(data, dict):
+        if isinstance(data, dict) and isinstance(data.get("devices"), list):
+            await self._async_load_shards(data)
+            _LOGGER.debug("%s: Loaded dashboard state for %d devices", DOMAIN, len(self.state.devices))
+        elif isinstance(data, dict):
             try:
-                self._state = DashboardState.from_dict(data)
-                _LOGGER.debug("%s: Loaded dashboard state from storage", DOMAIN)
-
-                # If we just loaded legacy data (and thus self._state is dirty relative to new store),
-                # we should probably persist it to the new store soon.
-                # However, to avoid side effects during load, we'll let the user's first action 
-                # (or auto-save on change) trigger the save. 
-                # But actually, if they never change anything, they might lose it?
-                # Let's force a save if we see it was a migration? 
-                # No, async_load is often called at startup. Calling async_save here might be risky 
-                # if the loop isn't ready or if it causes a loop. 
-                # Safe approach: Just load it into memory. It will be saved when they make a change.
+                self.state = DashboardState.from_dict(data)
+                self._summaries = {
+                    device_id: _device_summary(device) for device_id, device in self.state.devices.items()
+                }
+                self._device_revisions = {
+                    device_id: device.revision for device_id, device in self.state.devices.items()
+                }
             except (AttributeError, KeyError, TypeError, ValueError) as exc:
                 _LOGGER.error("%s: Failed to parse stored state, starting fresh: %s", DOMAIN, exc)
-                self._state = DashboardState()
+                self.state = DashboardState()
+                return
+            # Single-blob (or legacy) state: split it into shards now. Shards are
+            # written before the index replaces the blob, so an interrupted
+            # migration leaves the blob intact and simply runs again.
+            _LOGGER.info("%s: Splitting stored state into %d device stores", DOMAIN, len(self.state.devices))
+            self._dirty_devices.update(self.state.devices)
+            self._index_dirty = True
+            await self.async_save()
         elif data:
             _LOGGER.error("%s: Stored state had unexpected type %s, starting fresh", DOMAIN, type(data).__name__)
-            self._state = DashboardState()
+            self.state = DashboardState()
         else:
             _LOGGER.debug("%s: No storage found (new or legacy), starting fresh", DOMAIN)
-            self._state = DashboardState()
+            self.state = DashboardState()
+
+    async def _async_load_shards(self, index: Dict[str, Any]) -> None:
+        """Load the raw device stores the index lists and index them from their summaries."""
+        device_ids = [str(device_id) for device_id in index["devices"]]
+        payloads = await asyncio.gather(*(self._device_store(device_id).async_load() for device_id in device_ids))
+        raw: Dict[str, Dict[str, Any]] = {}
+        for device_id, payload in zip(device_ids, payloads):
+            if isinstance(payload, dict):
+                raw[device_id] = payload
+            else:
+                _LOGGER.error("%s: Device store for %s is missing or invalid, skipping it", DOMAIN, device_id)
+
+        devices = _LazyDevices(raw)
+        self._state = DashboardState(devices=devices, last_active_layout_id=index.get("last_active_layout_id"))
+        summaries = index.get("summaries")
+        summaries = summaries if isinstance(summaries, dict) else {}
+        self.dependency_index.rebuild({})
+        for device_id in list(devices):
+            summary = summaries.get(device_id)
+            if isinstance(summary, dict):
+                self._summaries[device_id] = summary
+            else:
+                # Index written before summaries existed: parse this device once.
+                summary = self._summary(device_id)
+                if summary is None:
+                    continue
+                self._index_dirty = True
+            self._device_revisions[device_id] = _coerce_revision(summary.get("revision"))
+            self.dependency_index.update_dependencies(
+                device_id, [tuple(dependency) for dependency in summary.get("dependencies", [])]
+            )
+        if self._index_dirty:
+            self.async_schedule_save()
 
     async def async_save(self) -> None:
-        """Persist current state to disk."""
+        """Persist every pending change now, replacing any pending delayed writes."""
         if self._state is None:
             _LOGGER.warning("%s: async_save called with no state initialized", DOMAIN)
             return
-        data = self._state.to_dict()
-        await self._store.async_save(data)
-        _LOGGER.debug("%s: Dashboard state saved", DOMAIN)
+        device_ids = [device_id for device_id in self._dirty_devices if device_id in self._state.devices]
+        self._dirty_devices.clear()
+        await asyncio.gather(
+            *(self._device_store(device_id).async_save(self._device_data(device_id)) for device_id in device_ids)
+        )
+        await self._store.async_save(self._index_data())
+        _LOGGER.debug("%s: Dashboard state saved (%d devices written)", DOMAIN, len(device_ids))
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Write the index and dirty devices once mutations pause for the save delay."""
+        if self._state is None:
+            _LOGGER.warning("%s: async_schedule_save called with no state initialized", DOMAIN)
+            return
+        for device_id in list(self._dirty_devices):
+            if device_id not in self._state.devices:
+                # Deleted; async_delete_layout removed its store.
+                self._dirty_devices.discard(device_id)
+                continue
+            self._device_store(device_id).async_delay_save(
+                lambda device_id=device_id: self._delayed_device_data(device_id), self._save_delay
+            )
+        self._index_dirty = True
+        self._store.async_delay_save(self._index_data, self._save_delay)
+
+    def _summary(self, device_id: str) -> Optional[Dict[str, Any]]:
+        """Return a device's index summary, computing it if the device changed since."""
+        summary = self._summaries.get(device_id)
+        if summary is None:
+            device = self.state.devices.get(device_id)
+            if device is None:
+                return None
+            summary = self._summaries[device_id] = _device_summary(device)
+        return summary
+
+    def _device_data(self, device_id: str) -> Dict[str, Any]:
+        return self.layout_dict(self.state.devices[device_id])
+
+    def _serialized_layout(self, device: DeviceConfig) -> _SerializedLayout:
+        """Return the device's cached serialized form, re-serializing after a mutation."""
+        device_id = device.device_id
+        if self._state is None or self._state.devices.get(device_id) is not device:
+            # Not (or no longer) the stored device: nothing tracks its revision.
+            return _SerializedLayout(-1, device.to_dict())
+        revision = self.get_layout_revision(device_id)
+        cached = self._serialized.get(device_id)
+        if cached is None or cached.revision != revision:
+            cached = self._serialized[device_id] = _SerializedLayout(revision, device.to_dict())
+        return cached
+
+    def layout_dict(self, device: DeviceConfig) -> Dict[str, Any]:
+        """Return device.to_dict(), reused until the layout changes; treat it as read-only."""
+        return self._serialized_layout(device).data
+
+    def layout_json(self, device: DeviceConfig) -> str:
+        """Return the layout's JSON text, reused until the layout changes."""
+        cached = self._serialized_layout(device)
+        if cached.json is not None:
+            return cached.json
+        text = json_dumps(cached.data)
+        if self._serialized.get(device.device_id) is cached:
+            self._serialized[device.device_id] = cached._replace(json=text)
+        return text
+
+    @callback
+    def _index_data(self) -> Dict[str, Any]:
+        self._index_dirty = False
+        device_ids = sorted(self.state.devices)
+        summaries = {device_id: self._summary(device_id) for device_id in device_ids}
+        return {
+            "devices": device_ids,
+            "last_active_layout_id": self.state.last_active_layout_id,
+            "summaries": {device_id: summary for device_id, summary in summaries.items() if summary is not None},
+        }
+
+    @callback
+    def _delayed_device_data(self, device_id: str) -> Dict[str, Any]:
+        """Serialize a device when its delayed write fires, so it includes every mutation."""
+        self._dirty_devices.discard(device_id)
+        _LOGGER.debug("%s: Writing layout %s", DOMAIN, device_id)
+        return self._device_data(device_id)
+
+    @property
+    def has_pending_save(self) -> bool:
+        """Return True when mutations are waiting for the delayed write."""
+        return self._index_dirty or bool(self._dirty_devices)
+
+    async def async_flush(self) -> None:
+        """Write pending mutations immediately; used on shutdown."""
+        if self.has_pending_save:
+            await self.async_save()
+
+    def get_layout_revision(self, device_id: str) -> int:
+        """Return the current in-memory layout revision for a device."""
+        return self._revisions.get(device_id, 0)
+
+    def get_device_revision(self, device_id: str) -> Optional[int]:
+        """Return a stored layout's persisted revision, or None if it does not exist."""
+        if device_id not in self.state.devices:
+            return None
+        revision = self._device_revisions.get(device_id)
+        return self.state.devices[device_id].revision if revision is None else revision
+
+    def _check_revision(
+        self, device_id: str, expected_revisions: Optional[Container[Tuple[str, int]]]
+    ) -> Optional[int]:
+        """Return the layout's revision; raise RevisionConflictError if it is not an expected one."""
+        current = self.get_device_revision(device_id)
+        if expected_revisions is not None and (current is None or (device_id, current) not in expected_revisions):
+            raise RevisionConflictError(device_id, current)
+        return current
+
+    def mark_layout_changed(self, device_id: str) -> None:
+        """Record that a device's layout changed and needs writing; revisions are never reused.
+
+        Must be called after the mutation so the dependency index sees the
+        device's current pages (or its removal).
+        """
+        self._revision_counter += 1
+        self._revisions[device_id] = self._revision_counter
+        device = self.state.devices.get(device_id)
+        if device is not None:
+            device.revision = self._device_revisions.get(device_id, device.revision) + 1
+            self._device_revisions[device_id] = device.revision
+        self._dirty_devices.add(device_id)
+        self._summaries.pop(device_id, None)
+        if device_id not in self.state.devices:
+            self._serialized.pop(device_id, None)
+        self.dependency_index.update_device(device_id, device)
+        for listener in list(self._layout_listeners):
+            listener(device_id)
+
+    def mark_device_dirty(self, device_id: str) -> None:
+        """Record that a device needs writing although its layout is unchanged."""
+        # The serialized form is keyed on the layout revision, which stays put.
+        self._serialized.pop(device_id, None)
+        self._dirty_devices.add(device_id)
+
+    def async_add_layout_listener(self, listener: Callable[[str], None]) -> Callable[[], None]:
+        """Call listener(device_id) after every layout mutation; returns an unsubscribe callable."""
+        self._layout_listeners.append(listener)
+
+        def _remove() -> None:
+            if listener in self._layout_listeners:
+                self._layout_listeners.remove(listener)
+
+        return _remove
 
     #
     # Device-level helpers
@@ -91,8 +442,11 @@ class DashboardStorage:
     
     async def async_get_or_create_device(self, device_id: str, api_token: str) -> DeviceConfig:
         """Get or create a device configuration."""
+        created = device_id not in self.state.devices
         device = self.state.get_or_create_device(device_id, api_token)
-        await self.async_save()
+        if created:
+            self.mark_layout_changed(device_id)
+            self.async_schedule_save()
         return device
 
     async def async_get_default_device(self) -> DeviceConfig:
@@ -101,22 +455,26 @@ class DashboardStorage:
         if self._state is None:
             await self.async_load()
         
-        # Try to load the last active layout first
+        # Try to load the last active layout first; get_device() returns None
+        # for a stored layout that fails to parse (and drops it).
         last_active_id = self.state.last_active_layout_id
-        if last_active_id and last_active_id in self.state.devices:
+        device = self.get_device(last_active_id) if last_active_id else None
+        if device is not None:
             _LOGGER.debug("%s: Loading last active layout: %s", DOMAIN, last_active_id)
-            return self.state.devices[last_active_id]
+            return device
         
         # Fallback: use first available device if any exist
-        if self.state.devices:
-            # Sort keys to ensure deterministic "first" item
-            first_id = sorted(self.state.devices.keys())[0]
-            _LOGGER.debug("%s: No last active layout, using first available: %s", DOMAIN, first_id)
-            return self.state.devices[first_id]
+        # Sort keys to ensure deterministic "first" item
+        for first_id in sorted(self.state.devices.keys()):
+            device = self.get_device(first_id)
+            if device is not None:
+                _LOGGER.debug("%s: No last active layout, using first available: %s", DOMAIN, first_id)
+                return device
         
         # No devices exist, create default
         device = self.state.get_or_create_device("reterminal_e1001", api_token="")
-        await self.async_save()
+        self.mark_layout_changed(device.device_id)
+        self.async_schedule_save()
         return device
 
     async def async_get_layout_default(self) -> DeviceConfig:
@@ -127,7 +485,7 @@ class DashboardStorage:
         """Persist a DeviceConfig as the default device."""
         await self.async_set_device(device)
         self.state.last_active_layout_id = device.device_id
-        await self.async_save()
+        self.async_schedule_save()
 
     async def async_get_layout(self, layout_id: str) -> Optional[DeviceConfig]:
         """Get a specific layout by ID."""
@@ -136,17 +494,20 @@ class DashboardStorage:
         return self.get_device(layout_id)
 
     async def async_list_layouts(self) -> List[Dict[str, Any]]:
-        """List all available layouts with compact info."""
+        """List all available layouts with compact info, from the index summaries."""
         if self._state is None:
             await self.async_load()
         
         results = []
-        for dev_id, device in self.state.devices.items():
+        for dev_id in list(self.state.devices):
+            summary = self._summary(dev_id)
+            if summary is None:
+                continue
             results.append({
                 "id": dev_id,
-                "name": device.name,
-                "page_count": len(device.pages),
-                "device_model": device.device_model
+                "name": summary["name"],
+                "page_count": summary["page_count"],
+                "device_model": summary["device_model"]
             })
         return results
 
@@ -160,9 +521,11 @@ class DashboardStorage:
             await self.async_load()
         if layout_id in self.state.devices:
             del self.state.devices[layout_id]
+            self.mark_layout_changed(layout_id)
+            await self._device_store(layout_id).async_remove()
             if self.state.last_active_layout_id == layout_id:
                 self.state.last_active_layout_id = None
-            await self.async_save()
+            self.async_schedule_save()
 
     def get_device(self, device_id: str) -> Optional[DeviceConfig]:
         """Get an existing device configuration, or None."""
@@ -171,13 +534,20 @@ class DashboardStorage:
     async def async_set_device(self, device: DeviceConfig) -> None:
         """Insert or replace a device configuration."""
         self.state.devices[device.device_id] = device
-        await self.async_save()
+        self.mark_layout_changed(device.device_id)
+        self.async_schedule_save()
 
-    async def async_update_device(self, device_id: str, updater) -> Optional[DeviceConfig]:
+    async def async_update_device(
+        self, device_id: str, updater, layout_changed: bool = True
+    ) -> Optional[DeviceConfig]:
         """
         Apply an update function to a device config and save.
 
         updater: Callable[[DeviceConfig], None]
+
+        Pass layout_changed=False for runtime state such as current_page: the
+        device is written, but its revisions, render caches and layout
+        listeners are left alone.
         """
         device = self.get_device(device_id)
         if device is None:
@@ -190,7 +560,11 @@ class DashboardStorage:
             _LOGGER.error("%s: Error while updating device %s: %s", DOMAIN, device_id, exc)
             return None
 
-        await self.async_save()
+        if layout_changed:
+            self.mark_layout_changed(device_id)
+        else:
+            self.mark_device_dirty(device_id)
+        self.async_schedule_save()
         return device
 
     #
@@ -221,7 +595,12 @@ class DashboardStorage:
     # - widget props schema evolution
     #
 
-    async def async_update_layout(self, device_id: str, raw_layout: Dict[str, Any]) -> Optional[DeviceConfig]:
+    async def async_update_layout(
+        self,
+        device_id: str,
+        raw_layout: Dict[str, Any],
+        expected_revisions: Optional[Container[Tuple[str, int]]] = None,
+    ) -> Optional[DeviceConfig]:
         """
         Replace a device layout from raw layout dict (from editor).
 
@@ -229,6 +608,10 @@ class DashboardStorage:
         - Force device_id/api_token from existing device when missing.
         - Merge with existing data to preserve all fields.
         - Let DeviceConfig.from_dict handle defaults and validation.
+
+        With expected_revisions, (device_id, revision) pairs from the request's
+        If-Match, the write is refused with RevisionConflictError unless the
+        stored layout matches one of them.
         """
         # Ensure state loaded
         if self._state is None:
@@ -243,7 +626,7 @@ class DashboardStorage:
         # Merge logic
         merged: Dict[str, Any] = {}
         if existing:
-            merged = existing.to_dict()
+            merged = dict(self.layout_dict(existing))
 
         if raw_layout:
             merged.update(raw_layout)
@@ -259,11 +642,14 @@ class DashboardStorage:
             _LOGGER.error("%s: Failed to parse layout for %s: %s", DOMAIN, device_id, exc)
             return None
 
+        # A revision in the payload is ignored; storage alone advances it.
+        device.revision = self._check_revision(device.device_id, expected_revisions) or 0
         device.ensure_pages()
         self.state.devices[device.device_id] = device
+        self.mark_layout_changed(device.device_id)
         # Track this as the last active layout
         self.state.last_active_layout_id = device.device_id
-        await self.async_save()
+        self.async_schedule_save()
         return device
 
     async def async_set_last_active_layout(self, layout_id: str) -> None:
@@ -271,16 +657,21 @@ class DashboardStorage:
         if self._state is None:
             await self.async_load()
         self.state.last_active_layout_id = layout_id
-        await self.async_save()
+        self.async_schedule_save()
         _LOGGER.debug("%s: Set last active layout to: %s", DOMAIN, layout_id)
 
-    async def async_update_layout_default(self, raw_layout: Dict[str, Any]) -> Optional[DeviceConfig]:
+    async def async_update_layout_default(
+        self,
+        raw_layout: Dict[str, Any],
+        expected_revisions: Optional[Container[Tuple[str, int]]] = None,
+    ) -> Optional[DeviceConfig]:
         """
         Update the default device layout from raw layout dict (from editor).
 
         This is the primary entrypoint for the editor's POST /layout.
         Uses DeviceConfig.from_dict after merging with existing data to ensure
         all fields (rendering_mode, hardware configs, etc.) are preserved.
+        expected_revisions works as in async_update_layout.
         """
         # Ensure state loaded
         if self._state is None:
@@ -296,7 +687,7 @@ class DashboardStorage:
         # Start with current state to ensure no fields are lost when frontend omissions occur
         merged_payload: Dict[str, Any] = {}
         if existing:
-            merged_payload = existing.to_dict()
+            merged_payload = dict(self.layout_dict(existing))
 
         # Override with all data from frontend (handles camelCase and snake_case via from_dict)
         if raw_layout:
@@ -312,11 +703,14 @@ class DashboardStorage:
             _LOGGER.error("%s: Failed to parse default layout: %s", DOMAIN, exc)
             return None
 
+        # A revision in the payload is ignored; storage alone advances it.
+        device.revision = self._check_revision(device.device_id, expected_revisions) or 0
         device.ensure_pages()
         self.state.devices[device.device_id] = device
+        self.mark_layout_changed(device.device_id)
         # Track this as the last active layout
         self.state.last_active_layout_id = device.device_id
-        await self.async_save()
+        self.async_schedule_save()
         return device
 
     async def async_update_layout_from_device(self, device: DeviceConfig) -> DeviceConfig:
@@ -339,7 +733,8 @@ class DashboardStorage:
 
         device.ensure_pages()
         self.state.devices[device.device_id] = device
+        self.mark_layout_changed(device.device_id)
         # Track this as the last active layout
         self.state.last_active_layout_id = device.device_id
-        await self.async_save()
+        self.async_schedule_save()
         return device
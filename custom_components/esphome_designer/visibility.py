@@ -0,0 +1,161 @@
+"""
+Server-side evaluation of widget visibility conditions.
+
+Widgets can be shown or hidden by the state of a ``condition_entity``. The
+rules mirror the editor preview (``isWidgetVisibleInPreview`` in
+frontend/js/core/canvas_renderer.js) so a rendered page matches what the
+designer shows:
+
+- no condition entity, or the entity has no state yet: visible
+- condition_min / condition_max set: the state must be numeric and in range
+- otherwise condition_state is compared with condition_operator; binary
+  domains normalize on/open/home/... to true and off/closed/... to false
+
+Conditions are compiled once per layout revision into small immutable
+objects, so evaluating a page is one state lookup per conditional widget and
+compiled pages can be handed to render workers as-is.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, FrozenSet, Optional, Tuple
+
+from .models import PageConfig, WidgetConfig
+
+# Keep in sync with HA_BINARY_DOMAINS in frontend/js/io/adapters/entity_dedup.js.
+BINARY_DOMAINS = (
+    "binary_sensor.",
+    "switch.",
+    "light.",
+    "input_boolean.",
+    "fan.",
+    "cover.",
+    "vacuum.",
+    "lock.",
+)
+_TRUE_STATES = frozenset({"1", "true", "on", "open", "locked", "home", "active", "occupied", "detected", "online"})
+_FALSE_STATES = frozenset({"0", "false", "off", "closed", "unlocked", "not_home", "inactive", "clear", "offline"})
+
+
+def _normalize_binary(value: Any) -> str:
+    normalized = str(value if value is not None else "").strip().lower()
+    if normalized in _TRUE_STATES:
+        return "true"
+    if normalized in _FALSE_STATES:
+        return "false"
+    return normalized
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+@dataclass(frozen=True)
+class Condition:
+    """A compiled visibility rule for one widget."""
+
+    entity_id: str
+    binary: bool
+    operator: str = "=="
+    expected: Optional[str] = None
+    expected_number: Optional[float] = None
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+
+    def __call__(self, hass: Any) -> bool:
+        """Return whether the widget is visible given the current states."""
+        state_obj = hass.states.get(self.entity_id)
+        if state_obj is None or state_obj.state is None:
+            return True
+        state = _normalize_binary(state_obj.state) if self.binary else str(state_obj.state)
+
+        if self.minimum is not None or self.maximum is not None:
+            number = _to_float(state)
+            return (
+                number is not None
+                and (self.minimum is None or number >= self.minimum)
+                and (self.maximum is None or number <= self.maximum)
+            )
+
+        if self.expected is None:
+            return True
+
+        number = _to_float(state)
+        numeric = number is not None and self.expected_number is not None
+        if self.operator == "==":
+            return number == self.expected_number if numeric else state == self.expected
+        if self.operator == "!=":
+            return number != self.expected_number if numeric else state != self.expected
+        if not numeric:
+            return False
+        if self.operator == "<":
+            return number < self.expected_number
+        if self.operator == ">":
+            return number > self.expected_number
+        if self.operator == "<=":
+            return number <= self.expected_number
+        if self.operator == ">=":
+            return number >= self.expected_number
+        return True
+
+
+def compile_condition(widget: WidgetConfig) -> Optional[Condition]:
+    """Compile a widget's visibility settings; None means always visible."""
+    entity_id = str(widget.condition_entity or "").strip()
+    if not entity_id:
+        return None
+
+    binary = entity_id.startswith(BINARY_DOMAINS)
+    minimum = _to_float(widget.condition_min)
+    maximum = _to_float(widget.condition_max)
+
+    # condition_value / condition_invert are older editor keys that only
+    # survive in props.
+    expected = widget.condition_state
+    if expected is None or str(expected).strip() == "":
+        expected = widget.props.get("condition_value")
+    if expected is None or str(expected).strip() == "":
+        expected = None
+    else:
+        expected = str(expected)
+        if binary:
+            expected = _normalize_binary(expected)
+            if widget.props.get("condition_invert"):
+                expected = "false" if expected == "true" else "true"
+
+    return Condition(
+        entity_id=entity_id,
+        binary=binary,
+        operator=widget.condition_operator or "==",
+        expected=expected,
+        expected_number=_to_float(expected),
+        minimum=minimum,
+        maximum=maximum,
+    )
+
+
+@dataclass(frozen=True)
+class PageConditions:
+    """The compiled visibility rules of every widget on a page, in order."""
+
+    conditions: Tuple[Optional[Condition], ...]
+
+    @property
+    def entity_ids(self) -> FrozenSet[str]:
+        """Entities read to decide visibility; they matter even when hidden."""
+        return frozenset(condition.entity_id for condition in self.conditions if condition is not None)
+
+    def evaluate(self, hass: Any) -> Tuple[bool, ...]:
+        """Return one visibility flag per widget."""
+        return tuple(condition is None or condition(hass) for condition in self.conditions)
+
+
+def compile_page_conditions(page: PageConfig) -> PageConditions:
+    """Compile the visibility rules of all widgets on a page."""
+    return PageConditions(tuple(compile_condition(widget) for widget in page.widgets))
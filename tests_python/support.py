@@ -9,6 +9,13 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 PACKAGE_ROOT = ROOT / "custom_components" / "esphome_designer"
 
+try:
+    import PIL  # noqa: F401
+
+    HAS_PIL = True
+except ModuleNotFoundError:
+    HAS_PIL = False
+
 
 class FakeResponse:
     def __init__(self, body="", status=200, content_type="application/json", text=None, headers=None):
@@ -18,6 +25,22 @@ class FakeResponse:
         self.headers = headers or {}
 
 
+class FakeStreamResponse(FakeResponse):
+    def __init__(self, status=200, headers=None):
+        super().__init__(body=b"", status=status, content_type="application/octet-stream", headers=headers)
+        self.prepared = False
+        self.eof = False
+
+    async def prepare(self, request):
+        self.prepared = True
+
+    async def write(self, data):
+        self.body += data
+
+    async def write_eof(self):
+        self.eof = True
+
+
 class FakeFileResponse(FakeResponse):
     def __init__(self, path, status=200, content_type="application/octet-stream", headers=None):
         super().__init__(body="", status=status, content_type=content_type, headers=headers)
@@ -52,22 +75,63 @@ class FakeServiceRegistry:
         self.registrations.pop((domain, service), None)
 
 
+class FakeState:
+    def __init__(self, entity_id, state, attributes=None):
+        self.entity_id = entity_id
+        self.state = state
+        self.attributes = dict(attributes or {})
+        self.last_changed = None
+        self.last_updated = None
+
+
+class FakeStates:
+    def __init__(self):
+        self._states = {}
+        self._updates = 0
+
+    def get(self, entity_id):
+        return self._states.get(entity_id)
+
+    def set(self, entity_id, state, attributes=None):
+        self._updates += 1
+        new_state = FakeState(entity_id, state, attributes)
+        new_state.last_updated = self._updates
+        self._states[entity_id] = new_state
+
+
 class FakeHass:
     def __init__(self, config_dir=None):
         self.data = {}
         self.services = FakeServiceRegistry()
         self.created_tasks = []
+        self.state_listeners = []
+        self.call_later_actions = []
         base_dir = Path(config_dir or ROOT)
         self.config = types.SimpleNamespace(
             config_dir=str(base_dir),
             path=lambda *parts: str(base_dir.joinpath(*parts)),
         )
-        self.states = types.SimpleNamespace(get=lambda entity_id: None)
+        self.states = FakeStates()
 
     def async_create_task(self, coro):
         self.created_tasks.append(coro)
         return coro
 
+    def async_create_background_task(self, coro, name):
+        self.created_tasks.append(coro)
+        return coro
+
+    def fire_state_changed(self, entity_id):
+        event = types.SimpleNamespace(data={"entity_id": entity_id})
+        for entity_ids, action in list(self.state_listeners):
+            if entity_id in entity_ids:
+                action(event)
+
+    def run_call_later(self):
+        actions, self.call_later_actions = self.call_later_actions, []
+        for action in actions:
+            action(None)
+
     async def async_add_executor_job(self, func, *args):
         return func(*args)
 
@@ -86,6 +150,8 @@ class FakeStore:
         self.version = version
         self.key = key
         self.saved_payloads = []
+        self.delayed_save = None
+        self.removed = False
         FakeStore.instances.append(self)
 
     @classmethod
@@ -97,8 +163,47 @@ class FakeStore:
         return self.load_map.get(self.key)
 
     async def async_save(self, data):
+        self.delayed_save = None
         self.saved_payloads.append(data)
 
+    def async_delay_save(self, data_func, delay=0):
+        """Remember the latest pending write; tests fire it via run_delayed_save()."""
+        self.delayed_save = (data_func, delay)
+
+    def run_delayed_save(self):
+        if self.delayed_save is not None:
+            data_func, _delay = self.delayed_save
+            self.delayed_save = None
+            self.saved_payloads.append(data_func())
+
+    async def async_remove(self):
+        self.delayed_save = None
+        self.removed = True
+        self.load_map.pop(self.key, None)
+
+    @classmethod
+    def run_delayed_saves(cls):
+        """Fire every store's pending delayed write, as Home Assistant's timers would."""
+        for store in list(cls.instances):
+            store.run_delayed_save()
+
+    @classmethod
+    def by_key(cls, key):
+        return next(store for store in reversed(cls.instances) if store.key == key)
+
+
+def fake_track_state_change_event(hass, entity_ids, action):
+    """Record a state listener on the fake hass; returns an unsubscribe callable."""
+    listener = (list(entity_ids), action)
+    hass.state_listeners.append(listener)
+    return lambda: hass.state_listeners.remove(listener)
+
+
+def fake_call_later(hass, delay, action):
+    """Queue a delayed action on the fake hass; tests run it via hass.run_call_later()."""
+    hass.call_later_actions.append(action)
+    return lambda: hass.call_later_actions.remove(action)
+
 
 def _module_from_path(module_name: str, path: Path, *, is_package: bool = False):
     search_locations = [str(path.parent)] if is_package else None
@@ -120,6 +225,9 @@ def _install_stub_modules():
 
     core = types.ModuleType("homeassistant.core")
     core.HomeAssistant = FakeHass
+    core.State = FakeState
+    core.Event = type("Event", (), {})
+    core.callback = lambda func: func
     core.ServiceCall = FakeServiceCall
 
     helpers = types.ModuleType("homeassistant.helpers")
@@ -132,9 +240,16 @@ def _install_stub_modules():
     config_validation.string = lambda value: value
     config_validation.positive_int = lambda value: value
 
+    event_helpers = types.ModuleType("homeassistant.helpers.event")
+    event_helpers.async_track_state_change_event = fake_track_state_change_event
+    event_helpers.async_call_later = fake_call_later
+
     json_helpers = types.ModuleType("homeassistant.helpers.json")
     json_helpers.json_dumps = json.dumps
 
+    config_entries = types.ModuleType("homeassistant.config_entries")
+    config_entries.ConfigEntry = type("ConfigEntry", (), {})
+
     components = types.ModuleType("homeassistant.components")
     components.__path__ = []
 
@@ -145,6 +260,7 @@ def _install_stub_modules():
     web = types.ModuleType("aiohttp.web")
     web.Response = FakeResponse
     web.FileResponse = FakeFileResponse
+    web.StreamResponse = FakeStreamResponse
     web.Request = type("Request", (), {})
     aiohttp.web = web
     aiohttp.ClientSession = type("ClientSession", (), {})
@@ -156,9 +272,11 @@ def _install_stub_modules():
 
     sys.modules["homeassistant"] = homeassistant
     sys.modules["homeassistant.core"] = core
+    sys.modules["homeassistant.config_entries"] = config_entries
     sys.modules["homeassistant.helpers"] = helpers
     sys.modules["homeassistant.helpers.storage"] = storage
     sys.modules["homeassistant.helpers.config_validation"] = config_validation
+    sys.modules["homeassistant.helpers.event"] = event_helpers
     sys.modules["homeassistant.helpers.json"] = json_helpers
     sys.modules["homeassistant.components"] = components
     sys.modules["homeassistant.components.http"] = http
@@ -167,17 +285,40 @@ def _install_stub_modules():
     sys.modules["voluptuous"] = voluptuous
 
 
+def init_render_worker():
+    """Process pool initializer: install the stubs and integration modules in a spawned worker."""
+    load_integration_modules()
+
+
 def load_integration_modules():
     FakeStore.reset()
 
     prefixes = [
+        "custom_components.esphome_designer.api.image",
+        "custom_components.esphome_designer.api.diagnostics",
+        "custom_components.esphome_designer.diagnostics",
+        "custom_components.esphome_designer.render_stats",
+        "custom_components.esphome_designer.prerender",
+        "custom_components.esphome_designer.render_service",
+        "custom_components.esphome_designer.render_scheduler",
+        "custom_components.esphome_designer.render_cache",
+        "custom_components.esphome_designer.fonts",
+        "custom_components.esphome_designer.image_cache",
+        "custom_components.esphome_designer.dither",
+        "custom_components.esphome_designer.framebuffer",
+        "custom_components.esphome_designer.renderer",
+        "custom_components.esphome_designer.visibility",
         "custom_components.esphome_designer.api.import_export",
         "custom_components.esphome_designer.api.layout",
         "custom_components.esphome_designer.api.proxy",
+        "custom_components.esphome_designer.paths",
+        "custom_components.esphome_designer.hardware_templates",
         "custom_components.esphome_designer.api.history",
+        "custom_components.esphome_designer.history_series",
         "custom_components.esphome_designer.api.base",
         "custom_components.esphome_designer.services",
         "custom_components.esphome_designer.storage",
+        "custom_components.esphome_designer.dependency_index",
         "custom_components.esphome_designer.models",
         "custom_components.esphome_designer.yaml_parser",
         "custom_components.esphome_designer.const",
@@ -209,27 +350,98 @@ def load_integration_modules():
         PACKAGE_ROOT / "yaml_parser" / "__init__.py",
         is_package=True,
     )
+    dependency_index = _module_from_path(
+        "custom_components.esphome_designer.dependency_index",
+        PACKAGE_ROOT / "dependency_index.py",
+    )
+    visibility = _module_from_path(
+        "custom_components.esphome_designer.visibility",
+        PACKAGE_ROOT / "visibility.py",
+    )
     storage = _module_from_path("custom_components.esphome_designer.storage", PACKAGE_ROOT / "storage.py")
     services = _module_from_path("custom_components.esphome_designer.services", PACKAGE_ROOT / "services.py")
     base = _module_from_path("custom_components.esphome_designer.api.base", PACKAGE_ROOT / "api" / "base.py")
     layout = _module_from_path("custom_components.esphome_designer.api.layout", PACKAGE_ROOT / "api" / "layout.py")
     import_export = _module_from_path("custom_components.esphome_designer.api.import_export", PACKAGE_ROOT / "api" / "import_export.py")
+    paths = _module_from_path("custom_components.esphome_designer.paths", PACKAGE_ROOT / "paths.py")
+    hardware_templates = _module_from_path(
+        "custom_components.esphome_designer.hardware_templates",
+        PACKAGE_ROOT / "hardware_templates.py",
+    )
     proxy = _module_from_path("custom_components.esphome_designer.api.proxy", PACKAGE_ROOT / "api" / "proxy.py")
+    history_series = _module_from_path(
+        "custom_components.esphome_designer.history_series",
+        PACKAGE_ROOT / "history_series.py",
+    )
     history = _module_from_path("custom_components.esphome_designer.api.history", PACKAGE_ROOT / "api" / "history.py")
+    render_cache = _module_from_path(
+        "custom_components.esphome_designer.render_cache",
+        PACKAGE_ROOT / "render_cache.py",
+    )
+    render_scheduler = _module_from_path(
+        "custom_components.esphome_designer.render_scheduler",
+        PACKAGE_ROOT / "render_scheduler.py",
+    )
+    render_stats = _module_from_path(
+        "custom_components.esphome_designer.render_stats",
+        PACKAGE_ROOT / "render_stats.py",
+    )
+    diagnostics = _module_from_path(
+        "custom_components.esphome_designer.diagnostics",
+        PACKAGE_ROOT / "diagnostics.py",
+    )
+
+    fonts = image_cache = renderer = dither = framebuffer = render_service = prerender = image = None
+    api_diagnostics = None
+    if HAS_PIL:
+        fonts = _module_from_path("custom_components.esphome_designer.fonts", PACKAGE_ROOT / "fonts.py")
+        dither = _module_from_path("custom_components.esphome_designer.dither", PACKAGE_ROOT / "dither.py")
+        image_cache = _module_from_path("custom_components.esphome_designer.image_cache", PACKAGE_ROOT / "image_cache.py")
+        renderer = _module_from_path("custom_components.esphome_designer.renderer", PACKAGE_ROOT / "renderer.py")
+        framebuffer = _module_from_path("custom_components.esphome_designer.framebuffer", PACKAGE_ROOT / "framebuffer.py")
+        render_service = _module_from_path(
+            "custom_components.esphome_designer.render_service",
+            PACKAGE_ROOT / "render_service.py",
+        )
+        prerender = _module_from_path("custom_components.esphome_designer.prerender", PACKAGE_ROOT / "prerender.py")
+        image = _module_from_path("custom_components.esphome_designer.api.image", PACKAGE_ROOT / "api" / "image.py")
+        api_diagnostics = _module_from_path(
+            "custom_components.esphome_designer.api.diagnostics",
+            PACKAGE_ROOT / "api" / "diagnostics.py",
+        )
 
     return {
         "const": const,
         "models": models,
         "yaml_parser": yaml_parser,
+        "dependency_index": dependency_index,
+        "visibility": visibility,
         "storage": storage,
         "services": services,
         "base": base,
         "layout": layout,
         "import_export": import_export,
+        "paths": paths,
+        "hardware_templates": hardware_templates,
         "proxy": proxy,
         "history": history,
+        "history_series": history_series,
+        "render_cache": render_cache,
+        "render_scheduler": render_scheduler,
+        "render_stats": render_stats,
+        "diagnostics": diagnostics,
+        "api_diagnostics": api_diagnostics,
+        "renderer": renderer,
+        "fonts": fonts,
+        "image_cache": image_cache,
+        "dither": dither,
+        "framebuffer": framebuffer,
+        "render_service": render_service,
+        "prerender": prerender,
+        "image": image,
         "FakeStore": FakeStore,
         "FakeResponse": FakeResponse,
         "FakeHass": FakeHass,
         "FakeServiceCall": FakeServiceCall,
+        "FakeStates": FakeStates,
     }
@@ -0,0 +1,543 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import unittest
+
+from support import HAS_PIL, load_integration_modules
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class FakeImageRequest:
+    def __init__(self, query=None, headers=None):
+        self.query = query or {}
+        self.headers = headers or {}
+
+
+class FakeStorage:
+    def __init__(self, device):
+        self.device = device
+        self.revision = 1
+
+    def get_layout_revision(self, device_id):
+        return self.revision
+
+    def async_add_layout_listener(self, listener):
+        return lambda: None
+
+    def get_device_by_token(self, device_id, token):
+        if device_id != self.device.device_id or token != self.device.api_token:
+            return None
+        return self.device
+
+
+@unittest.skipUnless(HAS_PIL, "Pillow is unavailable")
+class PageImageViewTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        modules = load_integration_modules()
+        self.models = modules["models"]
+        self.image = modules["image"]
+        self.render_service_module = modules["render_service"]
+        self.hass = modules["FakeHass"]()
+        self.hass.states.set("sensor.outdoor", "21.456", {"unit_of_measurement": "°C"})
+
+        self.device = self.models.DeviceConfig.from_dict({
+            "device_id": "hallway",
+            "api_token": "secret",
+            "pages": [{
+                "id": "page_0",
+                "name": "Main",
+                "widgets": [
+                    {"id": "t", "type": "sensor", "entity_id": "sensor.outdoor", "x": 10, "y": 10, "width": 200, "height": 60},
+                    {"id": "l", "type": "label", "title": "Hello", "x": 10, "y": 100, "width": 200, "height": 40},
+                ],
+            }],
+        })
+        self.storage = FakeStorage(self.device)
+        self.render_service = self.render_service_module.RenderService(
+            self.hass,
+            self.storage,
+            max_workers=1,
+            scheduler=modules["render_scheduler"].RenderScheduler(max_workers=1, use_processes=False),
+        )
+        self.addCleanup(self.render_service.shutdown)
+        self.view = self.image.ReTerminalPageImageView(self.hass, self.storage, self.render_service)
+
+    async def test_hardware_template_palette_is_applied(self):
+        from io import BytesIO
+
+        from PIL import Image
+
+        self.device.device_model = "sunton_esp32_2432s028"
+        await self.render_service.async_load_hardware_templates()
+
+        self.assertEqual(self.render_service.hardware_features(self.device)["color_palette"], "8BIT")
+        data = await self.render_service.async_render_page(self.device, 0)
+        colors = {color for _count, color in Image.open(BytesIO(data)).convert("RGB").getcolors(1 << 16)}
+        self.assertLessEqual(colors, set(load_integration_modules()["dither"].PALETTES["8BIT"]))
+
+    async def test_rejects_missing_or_wrong_token(self):
+        missing = await self.view.get(FakeImageRequest(), "hallway", "0")
+        wrong = await self.view.get(FakeImageRequest({"token": "nope"}), "hallway", "0")
+
+        self.assertEqual(missing.status, 401)
+        self.assertEqual(wrong.status, 401)
+
+    async def test_rejects_invalid_page_index(self):
+        out_of_range = await self.view.get(FakeImageRequest({"token": "secret"}), "hallway", "3")
+        not_a_number = await self.view.get(FakeImageRequest({"token": "secret"}), "hallway", "abc")
+
+        self.assertEqual(out_of_range.status, 404)
+        self.assertEqual(not_a_number.status, 400)
+
+    async def test_serves_png_for_valid_token(self):
+        response = await self.view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.content_type, "image/png")
+        self.assertTrue(response.body.startswith(PNG_SIGNATURE))
+
+    async def test_matching_etag_returns_304_without_rendering(self):
+        first = await self.view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+        etag = first.headers["ETag"]
+        misses = self.render_service.cache_stats["misses"]
+
+        again = await self.view.get(FakeImageRequest({"token": "secret"}, {"If-None-Match": f'W/"other", {etag}'}), "hallway", "0")
+
+        self.assertEqual(again.status, 304)
+        self.assertEqual(again.headers["ETag"], etag)
+        self.assertFalse(again.body)
+        self.assertEqual(self.render_service.cache_stats["misses"], misses)
+        self.assertEqual(self.render_service.cache_stats["hits"], 0)
+
+    async def test_state_change_or_format_changes_etag(self):
+        framebuffer_view = self.image.ReTerminalPageFramebufferView(self.hass, self.storage, self.render_service)
+        first = await self.view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+        packed = await framebuffer_view.get(FakeImageRequest({"token": "secret", "format": "1bpp"}), "hallway", "0")
+        self.hass.states.set("sensor.outdoor", "30.0", {"unit_of_measurement": "°C"})
+
+        stale = await self.view.get(
+            FakeImageRequest({"token": "secret"}, {"If-None-Match": first.headers["ETag"]}), "hallway", "0"
+        )
+
+        self.assertNotEqual(packed.headers["ETag"], first.headers["ETag"])
+        self.assertEqual(stale.status, 200)
+        self.assertNotEqual(stale.headers["ETag"], first.headers["ETag"])
+
+    async def test_clock_only_page_may_be_reused_until_the_next_minute(self):
+        self.device.pages[0].widgets[:] = [
+            self.models.WidgetConfig.from_dict({"id": "c", "type": "clock", "x": 0, "y": 0, "width": 200, "height": 80}),
+        ]
+
+        response = await self.view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+        self.hass.states.set("sensor.time", "12:00")
+        with_sensor = await self.view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+
+        for page in (response, with_sensor):
+            directive, _, seconds = page.headers["Cache-Control"].partition("=")
+            self.assertEqual(directive, "max-age")
+            self.assertTrue(0 <= int(seconds) <= 60)
+
+    async def test_page_with_entities_must_revalidate(self):
+        response = await self.view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+
+    async def test_render_runs_on_dedicated_worker_thread(self):
+        seen_threads = []
+        original = self.render_service_module.render_page
+
+        def recording_render(hass, device, page, previous=None, visible=None, timings=None):
+            seen_threads.append(threading.current_thread().name)
+            return original(hass, device, page, previous, visible, timings)
+
+        self.render_service_module.render_page = recording_render
+
+        await self.render_service.async_render_page(self.device, 0)
+
+        self.assertEqual(len(seen_threads), 1)
+        self.assertNotEqual(seen_threads[0], threading.current_thread().name)
+        self.assertTrue(seen_threads[0].startswith("esphome_designer_render"))
+
+    async def test_delta_sends_full_frame_then_only_changed_regions(self):
+        delta_view = self.image.ReTerminalPageDeltaView(self.hass, self.storage, self.render_service)
+        framebuffer = load_integration_modules()["framebuffer"]
+
+        first = await delta_view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+        seq = first.headers["X-Frame-Revision"]
+        unchanged = await delta_view.get(FakeImageRequest({"token": "secret", "since": seq}), "hallway", "0")
+        self.hass.states.set("sensor.outdoor", "30.0", {"unit_of_measurement": "°C"})
+        changed = await delta_view.get(FakeImageRequest({"token": "secret", "since": seq}), "hallway", "0")
+
+        first_header = framebuffer.DELTA_HEADER.unpack_from(first.body)
+        unchanged_header = framebuffer.DELTA_HEADER.unpack_from(unchanged.body)
+        changed_header = framebuffer.DELTA_HEADER.unpack_from(changed.body)
+        changed_rect = framebuffer.DELTA_RECT.unpack_from(changed.body, framebuffer.DELTA_HEADER.size)
+
+        self.assertEqual(first_header[5] & framebuffer.DELTA_FLAG_FULL, framebuffer.DELTA_FLAG_FULL)
+        self.assertEqual(unchanged.headers["X-Frame-Revision"], seq)
+        self.assertEqual(unchanged_header[-1], 0)
+        self.assertNotEqual(changed.headers["X-Frame-Revision"], seq)
+        self.assertEqual(changed_header[5] & framebuffer.DELTA_FLAG_FULL, 0)
+        self.assertEqual(changed_rect, (8, 10, 208, 60))
+
+    async def test_framebuffer_defaults_to_profile_format(self):
+        view = self.image.ReTerminalPageFramebufferView(self.hass, self.storage, self.render_service)
+
+        response = await view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.headers["X-Frame-Format"], "1bpp")
+        self.assertEqual(response.content_type, "application/octet-stream")
+        self.assertEqual(len(response.body), 800 * 480 // 8)
+
+    async def test_framebuffer_format_is_selectable_per_request(self):
+        view = self.image.ReTerminalPageFramebufferView(self.hass, self.storage, self.render_service)
+
+        rgb565 = await view.get(FakeImageRequest({"token": "secret", "format": "rgb565"}), "hallway", "0")
+        png = await view.get(FakeImageRequest({"token": "secret", "format": "png"}), "hallway", "0")
+        unknown = await view.get(FakeImageRequest({"token": "secret", "format": "jpeg"}), "hallway", "0")
+
+        self.assertEqual(len(rgb565.body), 800 * 480 * 2)
+        self.assertTrue(png.body.startswith(PNG_SIGNATURE))
+        self.assertEqual(unknown.status, 400)
+
+    async def test_other_format_of_current_frame_only_reencodes(self):
+        renders = []
+        original = self.render_service_module.render_page
+
+        def counting_render(hass, device, page, previous=None, visible=None, timings=None):
+            renders.append(page)
+            return original(hass, device, page, previous, visible, timings)
+
+        self.render_service_module.render_page = counting_render
+
+        await self.render_service.async_render_page(self.device, 0, "png")
+        packed = await self.render_service.async_render_page(self.device, 0, "1bpp")
+
+        self.assertEqual(len(renders), 1)
+        self.assertEqual(len(packed), 800 * 480 // 8)
+
+    def _bundle_pages(self, framebuffer, body):
+        header = framebuffer.BUNDLE_HEADER.unpack_from(body)
+        offset = framebuffer.BUNDLE_HEADER.size
+        pages = []
+        for _ in range(header[-1]):
+            index, flags, page_hash, length = framebuffer.BUNDLE_PAGE.unpack_from(body, offset)
+            offset += framebuffer.BUNDLE_PAGE.size
+            pages.append((index, flags, page_hash, body[offset:offset + length]))
+            offset += length
+        self.assertEqual(offset, len(body))
+        return header, pages
+
+    async def test_bundle_returns_every_page_and_elides_known_hashes(self):
+        framebuffer = load_integration_modules()["framebuffer"]
+        self.device.pages.append(self.models.PageConfig.from_dict({
+            "id": "page_1",
+            "widgets": [{"id": "p", "type": "label", "title": "Second", "x": 0, "y": 0, "width": 100, "height": 40}],
+        }))
+        view = self.image.ReTerminalDeviceBundleView(self.hass, self.storage, self.render_service)
+
+        first = await view.get(FakeImageRequest({"token": "secret"}), "hallway")
+        header, pages = self._bundle_pages(framebuffer, first.body)
+        have = ",".join(page[2].hex() for page in pages)
+
+        self.hass.states.set("sensor.outdoor", "30.0", {"unit_of_measurement": "°C"})
+        misses = self.render_service.cache_stats["misses"]
+        second = await view.get(FakeImageRequest({"token": "secret", "have": have}), "hallway")
+        _header, second_pages = self._bundle_pages(framebuffer, second.body)
+
+        self.assertEqual(header[:3], (b"EDB1", framebuffer.FORMAT_CODES["1bpp"], 0))
+        self.assertEqual([page[0] for page in pages], [0, 1])
+        self.assertTrue(all(len(page[3]) == 800 * 480 // 8 for page in pages))
+        self.assertEqual(second_pages[0][1], 0)
+        self.assertNotEqual(second_pages[0][2], pages[0][2])
+        self.assertEqual(second_pages[1][1], framebuffer.BUNDLE_PAGE_UNCHANGED)
+        self.assertEqual(second_pages[1][3], b"")
+        self.assertEqual(self.render_service.cache_stats["misses"], misses + 1)
+
+    async def test_unchanged_bundle_returns_304(self):
+        view = self.image.ReTerminalDeviceBundleView(self.hass, self.storage, self.render_service)
+
+        first = await view.get(FakeImageRequest({"token": "secret", "format": "png"}), "hallway")
+        again = await view.get(
+            FakeImageRequest({"token": "secret", "format": "png"}, {"If-None-Match": first.headers["ETag"]}), "hallway"
+        )
+        unauthorized = await view.get(FakeImageRequest({"token": "nope"}), "hallway")
+
+        self.assertEqual(first.status, 200)
+        self.assertEqual(again.status, 304)
+        self.assertEqual(unauthorized.status, 401)
+
+    def _deadline_view(self, deadline_s):
+        modules = load_integration_modules()
+        service = modules["render_service"].RenderService(
+            self.hass,
+            self.storage,
+            max_workers=1,
+            scheduler=modules["render_scheduler"].RenderScheduler(max_workers=1, use_processes=False),
+            deadline_s=deadline_s,
+        )
+        self.addCleanup(service.shutdown)
+        return modules["render_service"], service, modules["image"].ReTerminalPageImageView(self.hass, self.storage, service)
+
+    async def test_slow_render_serves_last_good_image_with_age(self):
+        module, service, view = self._deadline_view(0.05)
+        first = await view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+        gate = threading.Event()
+        self.addCleanup(gate.set)
+        original = module.render_page
+
+        def slow_render(hass, device, page, previous=None, visible=None, timings=None):
+            gate.wait(5)
+            return original(hass, device, page, previous, visible, timings)
+
+        module.render_page = slow_render
+        self.hass.states.set("sensor.outdoor", "30.0", {"unit_of_measurement": "°C"})
+
+        stale = await view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+        gate.set()
+        while service.cache_stats["entries"] < 2:
+            await asyncio.sleep(0.01)
+        fresh = await view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+
+        self.assertEqual(stale.status, 200)
+        self.assertEqual(stale.body, first.body)
+        self.assertEqual(stale.headers["ETag"], first.headers["ETag"])
+        self.assertIn("Age", stale.headers)
+        self.assertNotEqual(fresh.body, first.body)
+        self.assertNotIn("Age", fresh.headers)
+
+    async def test_failed_render_serves_last_good_image(self):
+        module, _service, view = self._deadline_view(5)
+        first = await view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+
+        def broken_render(hass, device, page, previous=None, visible=None, timings=None):
+            raise RuntimeError("boom")
+
+        module.render_page = broken_render
+        self.hass.states.set("sensor.outdoor", "30.0", {"unit_of_measurement": "°C"})
+        with self.assertLogs(module.__name__, level="ERROR"):
+            stale = await view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+
+        self.assertEqual(stale.status, 200)
+        self.assertEqual(stale.body, first.body)
+        self.assertEqual(stale.headers["Age"], "0")
+
+    async def test_large_page_is_streamed_in_bands_then_cached(self):
+        from io import BytesIO
+
+        from PIL import Image
+
+        self.device.width, self.device.height = 1280, 800
+
+        streamed = await self.view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+        again = await self.view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+
+        self.assertTrue(streamed.prepared and streamed.eof)
+        self.assertEqual(streamed.content_type, "image/png")
+        self.assertEqual(Image.open(BytesIO(streamed.body)).size, (1280, 800))
+        self.assertEqual(again.body, streamed.body)
+        self.assertEqual(self.render_service.cache_stats["hits"], 1)
+
+        packed = await self.render_service.async_render_page(self.device, 0, "1bpp")
+        self.assertEqual(len(packed), 1280 // 8 * 800)
+
+    async def test_concurrent_streams_of_a_page_share_one_render(self):
+        self.device.width, self.device.height = 1280, 800
+        module = self.render_service_module
+        gate = threading.Event()
+        self.addCleanup(gate.set)
+        original = module.render_page_bands
+        renders = []
+
+        def gated_bands(*args, **kwargs):
+            renders.append(args)
+            gate.wait(5)
+            yield from original(*args, **kwargs)
+
+        module.render_page_bands = gated_bands
+        self.addCleanup(setattr, module, "render_page_bands", original)
+
+        async def read_stream():
+            return b"".join([chunk async for chunk in self.render_service.async_stream_page(self.device, 0)])
+
+        streams = [asyncio.ensure_future(read_stream()) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        prerender = asyncio.ensure_future(
+            self.render_service.async_render_page(self.device, 0, priority=module.PRIORITY_INTERACTIVE)
+        )
+        await asyncio.sleep(0.05)
+        gate.set()
+        first, second, rendered = await asyncio.gather(*streams, prerender)
+
+        self.assertEqual(len(renders), 1)
+        self.assertEqual(first, second)
+        self.assertEqual(rendered, first)
+
+    async def test_coalesced_render_is_tagged_with_the_key_it_was_rendered_from(self):
+        scheduler = self.render_service._scheduler
+        gate = threading.Event()
+        self.addCleanup(gate.set)
+        blocker = asyncio.ensure_future(
+            scheduler.async_submit("blocker", self.render_service_module.PRIORITY_INTERACTIVE, gate.wait, 5)
+        )
+        await asyncio.sleep(0)
+        older = asyncio.ensure_future(self.view.get(FakeImageRequest({"token": "secret"}), "hallway", "0"))
+        await asyncio.sleep(0.05)
+        self.hass.states.set("sensor.outdoor", "30.0", {"unit_of_measurement": "°C"})
+        newer = asyncio.ensure_future(self.view.get(FakeImageRequest({"token": "secret"}), "hallway", "0"))
+        await asyncio.sleep(0.05)
+        gate.set()
+        older, newer, _ = await asyncio.gather(older, newer, blocker)
+
+        self.assertEqual(self.render_service.scheduler_stats["coalesced"], 1)
+        self.assertEqual(older.body, newer.body)
+        self.assertEqual(older.headers["ETag"], newer.headers["ETag"])
+
+    async def test_slow_streamed_render_serves_last_good_image(self):
+        module, service, view = self._deadline_view(0.05)
+        self.device.width, self.device.height = 1280, 800
+        first = await view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+        gate = threading.Event()
+        self.addCleanup(gate.set)
+        original = module.render_page_bands
+
+        def slow_bands(*args, **kwargs):
+            gate.wait(5)
+            yield from original(*args, **kwargs)
+
+        module.render_page_bands = slow_bands
+        self.hass.states.set("sensor.outdoor", "30.0", {"unit_of_measurement": "°C"})
+
+        stale = await view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+        gate.set()
+        while service.cache_stats["entries"] < 2:
+            await asyncio.sleep(0.01)
+        fresh = await view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+
+        self.assertTrue(first.prepared)
+        self.assertEqual(stale.body, first.body)
+        self.assertEqual(stale.headers["ETag"], first.headers["ETag"])
+        self.assertIn("Age", stale.headers)
+        self.assertNotEqual(fresh.body, first.body)
+
+    async def test_delta_with_unknown_revision_sends_full_frame(self):
+        delta_view = self.image.ReTerminalPageDeltaView(self.hass, self.storage, self.render_service)
+        framebuffer = load_integration_modules()["framebuffer"]
+
+        response = await delta_view.get(FakeImageRequest({"token": "secret", "since": "999"}), "hallway", "0")
+
+        header = framebuffer.DELTA_HEADER.unpack_from(response.body)
+        self.assertEqual(header[5] & framebuffer.DELTA_FLAG_FULL, framebuffer.DELTA_FLAG_FULL)
+
+    async def test_delta_revision_from_before_a_restart_sends_full_frame(self):
+        framebuffer = load_integration_modules()["framebuffer"]
+        delta_view = self.image.ReTerminalPageDeltaView(self.hass, self.storage, self.render_service)
+        first = await delta_view.get(FakeImageRequest({"token": "secret"}), "hallway", "0")
+
+        restarted = self.render_service_module.RenderService(
+            self.hass,
+            self.storage,
+            max_workers=1,
+            scheduler=self.render_service_module.RenderScheduler(max_workers=1, use_processes=False),
+        )
+        self.addCleanup(restarted.shutdown)
+        restarted_view = self.image.ReTerminalPageDeltaView(self.hass, self.storage, restarted)
+        since = first.headers["X-Frame-Revision"]
+        response = await restarted_view.get(FakeImageRequest({"token": "secret", "since": since}), "hallway", "0")
+
+        header = framebuffer.DELTA_HEADER.unpack_from(response.body)
+        self.assertNotEqual(response.headers["X-Frame-Revision"], since)
+        self.assertEqual(header[5] & framebuffer.DELTA_FLAG_FULL, framebuffer.DELTA_FLAG_FULL)
+
+    async def test_unchanged_page_is_served_from_cache(self):
+        first = await self.render_service.async_render_page(self.device, 0)
+        second = await self.render_service.async_render_page(self.device, 0)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.render_service.cache_stats["hits"], 1)
+        self.assertEqual(self.render_service.cache_stats["misses"], 1)
+
+    async def test_state_or_layout_change_misses_cache(self):
+        await self.render_service.async_render_page(self.device, 0)
+
+        self.hass.states.set("sensor.outdoor", "30.0", {"unit_of_measurement": "°C"})
+        await self.render_service.async_render_page(self.device, 0)
+        self.storage.revision = 2
+        await self.render_service.async_render_page(self.device, 0)
+
+        self.assertEqual(self.render_service.cache_stats["hits"], 0)
+        self.assertEqual(self.render_service.cache_stats["misses"], 3)
+
+    async def test_hidden_widget_entities_do_not_invalidate_cache(self):
+        self.device.pages[0].widgets[0].condition_entity = "input_boolean.show_outdoor"
+        self.device.pages[0].widgets[0].condition_state = "on"
+        self.hass.states.set("input_boolean.show_outdoor", "off")
+        await self.render_service.async_render_page(self.device, 0)
+
+        self.hass.states.set("sensor.outdoor", "30.0", {"unit_of_measurement": "°C"})
+        await self.render_service.async_render_page(self.device, 0)
+        self.hass.states.set("input_boolean.show_outdoor", "on")
+        await self.render_service.async_render_page(self.device, 0)
+
+        self.assertEqual(self.render_service.cache_stats["hits"], 1)
+        self.assertEqual(self.render_service.cache_stats["misses"], 2)
+
+    async def test_graph_page_renders_fetched_history_once_per_window(self):
+        fetched = []
+
+        async def fetch(hass, entity_id, start_time, end_time):
+            fetched.append(entity_id)
+            return [{"state": "18.5", "last_changed": start_time.isoformat()}]
+
+        modules = load_integration_modules()
+        service = modules["render_service"].RenderService(
+            self.hass,
+            self.storage,
+            scheduler=modules["render_scheduler"].RenderScheduler(max_workers=1, use_processes=False),
+            history=modules["history_series"].HistorySeriesCache(fetch=fetch),
+        )
+        self.addCleanup(service.shutdown)
+        self.device.pages[0].widgets[:] = [
+            self.models.WidgetConfig.from_dict({
+                "id": "g", "type": "graph", "entity_id": "sensor.outdoor", "x": 0, "y": 0, "width": 200, "height": 80,
+            }),
+        ]
+
+        await service.async_render_page(self.device, 0)
+        self.storage.revision = 2
+        await service.async_render_page(self.device, 0)
+
+        self.assertEqual(fetched, ["sensor.outdoor"])
+        self.assertEqual(service.history_stats["hits"], 1)
+        self.assertIsNotNone(service.cache_key(self.device, 0).valid_until)
+
+    async def test_diagnostics_report_widget_and_device_timings(self):
+        import json
+
+        modules = load_integration_modules()
+        await self.render_service.async_render_page(self.device, 0)
+        await self.render_service.async_render_page(self.device, 0, "1bpp")
+        self.hass.data["esphome_designer"] = {"render_service": self.render_service}
+
+        view = modules["api_diagnostics"].ReTerminalRenderDiagnosticsView(self.hass, self.render_service)
+        report = json.loads((await view.get(FakeImageRequest())).body)
+        entry = await modules["diagnostics"].async_get_config_entry_diagnostics(self.hass, None)
+
+        render = report["render"]
+        self.assertEqual(sorted(render["widget_types"]), ["label", "sensor"])
+        # The 1bpp request re-encodes the retained canvas: encoded twice, drawn once.
+        self.assertEqual(render["devices"]["hallway"]["draw_ms"]["count"], 1)
+        self.assertEqual(render["devices"]["hallway"]["bytes"]["count"], 2)
+        self.assertEqual({widget["widget_id"] for widget in render["slow_widgets"]}, {"t", "l"})
+        self.assertEqual(entry["render"]["render"]["devices"].keys(), render["devices"].keys())
+
+    async def test_unrelated_state_change_keeps_cache_hit(self):
+        await self.render_service.async_render_page(self.device, 0)
+
+        self.hass.states.set("light.unrelated", "on")
+        await self.render_service.async_render_page(self.device, 0)
+
+        self.assertEqual(self.render_service.cache_stats["hits"], 1)
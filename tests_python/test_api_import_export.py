@@ -38,6 +38,12 @@ class FakeStorage:
         self.saved_default_layouts.append(layout)
         self.layout = layout
 
+    def layout_dict(self, device):
+        return device.to_dict()
+
+    def layout_json(self, device):
+        return json.dumps(device.to_dict())
+
 
 class ImportExportApiTests(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
@@ -21,11 +21,11 @@ class FakeStorage:
         self.calls = []
         self.detail_calls = []
 
-    async def async_update_layout_default(self, body):
+    async def async_update_layout_default(self, body, expected_revisions=None):
         self.calls.append(body)
         return self.updated_layout
 
-    async def async_update_layout(self, layout_id, body):
+    async def async_update_layout(self, layout_id, body, expected_revisions=None):
         self.detail_calls.append((layout_id, body))
         return self.updated_layout
 
@@ -35,12 +35,19 @@ class FakeStorage:
     async def async_save_layout_default(self, device):
         self.updated_layout = device
 
+    def layout_dict(self, device):
+        return device.to_dict()
+
+    def layout_json(self, device):
+        return json.dumps(device.to_dict())
+
 
 class LayoutApiTests(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
         modules = load_integration_modules()
         self.layout_module = modules["layout"]
         self.models = modules["models"]
+        self.storage_module = modules["storage"]
 
     async def test_parse_json_body_returns_payload_for_valid_json(self):
         request = FakeRequest(b'{"pages":[{"id":"page_0"}]}')
@@ -134,3 +141,79 @@ class LayoutApiTests(unittest.IsolatedAsyncioTestCase):
         payload = json.loads(response.body)
         self.assertEqual(payload["device_id"], "default")
         self.assertEqual(payload["name"], "Default Layout")
+
+    async def test_layout_revision_is_served_as_etag_and_guards_writes(self):
+        storage = self.storage_module.DashboardStorage(object())
+        kiosk = self.models.DeviceConfig(device_id="kiosk", api_token="", name="Kiosk", pages=[])
+        kiosk.ensure_pages()
+        storage._state = self.models.DashboardState(devices={"kiosk": kiosk})
+        view = self.layout_module.ReTerminalLayoutDetailView(None, storage)
+
+        response = await view.get(FakeRequest(b""), "kiosk")
+        self.assertEqual(response.headers["ETag"], '"kiosk:0:0"')
+
+        storage.layout_json = None  # a 304 must not serialize the layout
+        response = await view.get(FakeRequest(b"", {"If-None-Match": '"kiosk:0:0"'}), "kiosk")
+        self.assertEqual(response.status, 304)
+        self.assertEqual(response.headers["ETag"], '"kiosk:0:0"')
+        del storage.layout_json
+
+        response = await view.post(FakeRequest(b'{"name":"Edited"}', {"If-Match": '"kiosk:0"'}), "kiosk")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.headers["ETag"], '"kiosk:1:0"')
+
+        response = await view.post(FakeRequest(b'{"name":"Stale"}', {"If-Match": '"kiosk:0"'}), "kiosk")
+        self.assertEqual(response.status, 412)
+        self.assertEqual(json.loads(response.body), {"error": "revision_conflict", "revision": 1})
+        self.assertEqual(storage.state.devices["kiosk"].name, "Edited")
+
+        response = await view.post(FakeRequest(b'{"name":"Forced"}', {"If-Match": "*"}), "kiosk")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.headers["ETag"], '"kiosk:2:0"')
+
+        default_view = self.layout_module.ReTerminalLayoutView(None, storage)
+        storage._state.last_active_layout_id = "kiosk"
+        response = await default_view.post(FakeRequest(b'{"device_id":"kiosk","name":"X"}', {"If-Match": 'W/"kiosk:2"'}))
+        self.assertEqual(response.status, 412)
+
+    async def test_page_flip_changes_the_layout_etag(self):
+        storage = self.storage_module.DashboardStorage(object())
+        kiosk = self.models.DeviceConfig(device_id="kiosk", api_token="", name="Kiosk", pages=[])
+        kiosk.ensure_pages()
+        kiosk.pages.append(self.models.PageConfig(id="page_1", name="Second"))
+        storage._state = self.models.DashboardState(devices={"kiosk": kiosk})
+        storage.async_schedule_save = lambda: None
+        view = self.layout_module.ReTerminalLayoutDetailView(None, storage)
+        etag = (await view.get(FakeRequest(b""), "kiosk")).headers["ETag"]
+
+        await storage.async_update_device("kiosk", lambda device: device.set_page(1), layout_changed=False)
+        response = await view.get(FakeRequest(b"", {"If-None-Match": etag}), "kiosk")
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(json.loads(response.body)["current_page"], 1)
+        self.assertEqual(response.headers["ETag"], '"kiosk:0:1"')
+
+    async def test_layout_etag_does_not_match_another_device_at_the_same_revision(self):
+        storage = self.storage_module.DashboardStorage(object())
+        devices = {}
+        for device_id in ("kiosk", "hallway"):
+            devices[device_id] = self.models.DeviceConfig(device_id=device_id, api_token="", name=device_id, pages=[])
+            devices[device_id].ensure_pages()
+        storage._state = self.models.DashboardState(devices=devices, last_active_layout_id="hallway")
+        view = self.layout_module.ReTerminalLayoutView(None, storage)
+
+        response = await view.get(FakeRequest(b"", {"If-None-Match": '"kiosk:0:0"'}))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.headers["ETag"], '"hallway:0:0"')
+
+        response = await view.post(FakeRequest(b'{"device_id":"hallway","name":"X"}', {"If-Match": '"kiosk:0"'}))
+        self.assertEqual(response.status, 412)
+
+    def test_parse_if_match_reads_device_and_revision(self):
+        parse = self.layout_module.parse_if_match
+        tag = self.layout_module.layout_etag("a:b,c", 7)
+
+        self.assertIsNone(parse(None))
+        self.assertIsNone(parse('"kiosk:1", *'))
+        self.assertEqual(parse(f'{tag}, W/"kiosk:2", "kiosk:x", "3"'), {("a:b,c", 7)})
+        self.assertEqual(parse('"kiosk:4:1", "kiosk:5:x", "kiosk:6:1:2"'), {("kiosk", 4)})
@@ -37,6 +37,12 @@ class FakeStorage:
             for layout in self.layouts.values()
         ]
 
+    def layout_dict(self, device):
+        return device.to_dict()
+
+    def layout_json(self, device):
+        return json.dumps(device.to_dict())
+
 
 class LayoutManagementApiTests(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
@@ -80,6 +80,7 @@ class ProxyApiTests(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
         modules = load_integration_modules()
         self.proxy_module = modules["proxy"]
+        self.paths_module = modules["paths"]
 
     def test_resolve_image_path_allows_known_image_roots(self):
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -87,7 +88,7 @@ class ProxyApiTests(unittest.IsolatedAsyncioTestCase):
             image_path.parent.mkdir(parents=True)
             image_path.write_text("png", encoding="utf-8")
 
-            resolved = self.proxy_module._resolve_image_path(tmpdir, "/config/esphome/images/logo.png")
+            resolved = self.paths_module.resolve_image_path(tmpdir, "/config/esphome/images/logo.png")
 
             self.assertEqual(resolved, image_path.resolve())
 
@@ -97,7 +98,7 @@ class ProxyApiTests(unittest.IsolatedAsyncioTestCase):
             image_path.parent.mkdir(parents=True)
             image_path.write_text("png", encoding="utf-8")
 
-            resolved = self.proxy_module._resolve_image_path(tmpdir, "/config/esphome/image/logo.png")
+            resolved = self.paths_module.resolve_image_path(tmpdir, "/config/esphome/image/logo.png")
 
             self.assertEqual(resolved, image_path.resolve())
 
@@ -107,8 +108,8 @@ class ProxyApiTests(unittest.IsolatedAsyncioTestCase):
             image_path.parent.mkdir(parents=True)
             image_path.write_text("png", encoding="utf-8")
 
-            resolved_config_path = self.proxy_module._resolve_image_path(tmpdir, "/config/www/backgrounds/wallpaper.png")
-            resolved_local_alias = self.proxy_module._resolve_image_path(tmpdir, "/local/backgrounds/wallpaper.png")
+            resolved_config_path = self.paths_module.resolve_image_path(tmpdir, "/config/www/backgrounds/wallpaper.png")
+            resolved_local_alias = self.paths_module.resolve_image_path(tmpdir, "/local/backgrounds/wallpaper.png")
 
             self.assertEqual(resolved_config_path, image_path.resolve())
             self.assertEqual(resolved_local_alias, image_path.resolve())
@@ -118,7 +119,7 @@ class ProxyApiTests(unittest.IsolatedAsyncioTestCase):
             secret_path = Path(tmpdir) / "secrets.yaml"
             secret_path.write_text("api_key: secret", encoding="utf-8")
 
-            resolved = self.proxy_module._resolve_image_path(tmpdir, "/config/secrets.yaml")
+            resolved = self.paths_module.resolve_image_path(tmpdir, "/config/secrets.yaml")
 
             self.assertIsNone(resolved)
 
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import unittest
+
+from support import load_integration_modules
+
+
+def _layout(device_id, pages):
+    return {
+        "device_id": device_id,
+        "api_token": "token",
+        "pages": [
+            {"id": f"page_{index}", "name": f"Page {index}", "widgets": widgets}
+            for index, widgets in enumerate(pages)
+        ],
+    }
+
+
+def _widget(widget_id, **fields):
+    return {"id": widget_id, "type": fields.pop("type", "sensor"), "x": 0, "y": 0, "width": 10, "height": 10, **fields}
+
+
+class EntityDependencyIndexTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        modules = load_integration_modules()
+        self.models = modules["models"]
+        self.index_module = modules["dependency_index"]
+        self.storage_module = modules["storage"]
+
+    def _device(self, device_id, pages):
+        return self.models.DeviceConfig.from_dict(_layout(device_id, pages))
+
+    def test_indexes_widget_fields_and_entity_props(self):
+        index = self.index_module.EntityDependencyIndex()
+        device = self._device("hallway", [[
+            _widget("energy", type="energy", props={
+                "solar_entity": "sensor.solar",
+                "grid_entity": "sensor.grid",
+                "battery_soc_entity": "sensor.battery",
+                "title": "not.an_entity",
+            }),
+            _widget("temp", entity_id="sensor.temp", entity_id_2="sensor.humidity", condition_entity="binary_sensor.night"),
+        ]])
+
+        index.update_device("hallway", device)
+
+        self.assertEqual(
+            index.entity_ids,
+            {"sensor.solar", "sensor.grid", "sensor.battery", "sensor.temp", "sensor.humidity", "binary_sensor.night"},
+        )
+        self.assertEqual(index.widgets_for("sensor.grid"), {self.index_module.WidgetRef("hallway", 0, "energy")})
+        self.assertEqual(index.pages_for("binary_sensor.night"), {("hallway", 0)})
+
+    def test_update_device_replaces_previous_references(self):
+        index = self.index_module.EntityDependencyIndex()
+        index.update_device("hallway", self._device("hallway", [
+            [_widget("a", entity_id="sensor.temp")],
+            [_widget("b", entity_id="sensor.temp")],
+        ]))
+        index.update_device("kitchen", self._device("kitchen", [[_widget("c", entity_id="sensor.temp")]]))
+
+        index.update_device("hallway", self._device("hallway", [[_widget("a", entity_id="sensor.power")]]))
+
+        self.assertEqual(index.pages_for("sensor.temp"), {("kitchen", 0)})
+        self.assertEqual(index.pages_for("sensor.power"), {("hallway", 0)})
+        self.assertEqual(index.entities_for_page("hallway", 1), frozenset())
+
+        index.update_device("kitchen", None)
+
+        self.assertNotIn("sensor.temp", index)
+
+    def test_page_stays_indexed_while_any_widget_still_reads_entity(self):
+        index = self.index_module.EntityDependencyIndex()
+        index.update_device("hallway", self._device("hallway", [[
+            _widget("a", entity_id="sensor.temp"),
+            _widget("b", entity_id="sensor.temp"),
+        ]]))
+
+        self.assertEqual(index.pages_for_entities(["sensor.temp", "sensor.other"]), {("hallway", 0)})
+        self.assertEqual(len(index.widgets_for("sensor.temp")), 2)
+
+    async def test_storage_keeps_index_current_across_mutations(self):
+        storage = self.storage_module.DashboardStorage(object())
+        storage._store.load_map[storage._store.key] = {
+            "devices": {"hallway": _layout("hallway", [[_widget("a", entity_id="sensor.temp")]])},
+        }
+        await storage.async_load()
+
+        self.assertEqual(storage.dependency_index.pages_for("sensor.temp"), {("hallway", 0)})
+
+        await storage.async_update_layout("hallway", {
+            "pages": [{"id": "page_0", "name": "Main", "widgets": [_widget("a", entity_id="sensor.power")]}],
+        })
+        self.assertNotIn("sensor.temp", storage.dependency_index)
+        self.assertEqual(storage.dependency_index.pages_for("sensor.power"), {("hallway", 0)})
+
+        await storage.async_delete_layout("hallway")
+        self.assertEqual(storage.dependency_index.entity_ids, frozenset())
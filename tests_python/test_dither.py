@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import unittest
+
+from support import HAS_PIL, load_integration_modules
+
+
+@unittest.skipUnless(HAS_PIL, "Pillow is unavailable")
+class DitherTests(unittest.TestCase):
+    def setUp(self):
+        from PIL import Image
+
+        self.Image = Image
+        modules = load_integration_modules()
+        self.dither = modules["dither"]
+        self.framebuffer = modules["framebuffer"]
+        self.models = modules["models"]
+        self.gradient = Image.linear_gradient("L").resize((64, 48))
+
+    def _mean(self, image):
+        return sum(image.tobytes()) / (image.width * image.height)
+
+    def test_every_mode_keeps_only_palette_levels_and_preserves_tone(self):
+        for mode in range(8):
+            with self.subTest(mode=mode):
+                out = self.dither.dither_image(self.gradient, self.dither.PALETTES["BW"], mode)
+
+                self.assertEqual(out.mode, "L")
+                self.assertLessEqual(set(out.tobytes()), {0, 255})
+                if mode != self.dither.DITHER_NONE:
+                    self.assertAlmostEqual(self._mean(out), self._mean(self.gradient), delta=8)
+
+    def test_color_palette_returns_rgb_palette_colors(self):
+        palette = self.dither.PALETTES["7COLOR"]
+
+        out = self.dither.dither_image(self.gradient, palette, self.dither.DITHER_ATKINSON)
+
+        self.assertEqual(out.mode, "RGB")
+        self.assertLessEqual({out.getpixel((x, y)) for x in range(64) for y in range(48)}, set(palette))
+
+    def test_pillow_fallback_without_numpy(self):
+        original = self.dither.np
+        self.dither.np = None
+        try:
+            out = self.dither.dither_image(self.gradient, self.dither.PALETTES["GRAY4"], self.dither.DITHER_BURKES)
+        finally:
+            self.dither.np = original
+
+        self.assertEqual(out.mode, "L")
+        self.assertLessEqual(set(out.tobytes()), {0, 85, 170, 255})
+
+    def test_resolve_palette_treats_esphome_none_as_unquantized(self):
+        self.assertIsNone(self.dither.resolve_palette("NONE"))
+        self.assertIsNone(self.dither.resolve_palette(""))
+        self.assertEqual(len(self.dither.resolve_palette("8bit")), 256)
+
+    def test_device_dither_follows_profile_and_oepl_setting(self):
+        def device(**data):
+            return self.models.DeviceConfig.from_dict({"device_id": "d", **data})
+
+        mono = device(device_model="reterminal_e1001")
+        color = device(device_model="reterminal_e1002")
+        oepl = device(renderingMode="oepl", oeplDither=3, protocolHardware={"colorMode": "color_3"})
+
+        self.assertEqual(self.framebuffer.device_dither(mono), (None, self.dither.DITHER_NONE))
+        self.assertEqual(self.framebuffer.device_dither(color), (self.dither.PALETTES["6COLOR"], self.dither.DITHER_FLOYD_STEINBERG))
+        self.assertEqual(self.framebuffer.device_dither(oepl), (self.dither.PALETTES["BWR"], self.dither.DITHER_ATKINSON))
+
+    def test_dithered_1bpp_differs_from_threshold(self):
+        plain = self.framebuffer.encode_framebuffer(self.gradient, "1bpp")
+        dithered = self.framebuffer.encode_framebuffer(self.gradient, "1bpp", dither_mode=self.dither.DITHER_ORDERED)
+
+        self.assertEqual(len(plain), len(dithered))
+        self.assertNotEqual(plain, dithered)
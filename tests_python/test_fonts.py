@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import unittest
+from pathlib import Path
+
+from support import HAS_PIL, load_integration_modules
+
+
+@unittest.skipUnless(HAS_PIL, "Pillow is unavailable")
+class FontRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.fonts = load_integration_modules()["fonts"]
+        self.registry = self.fonts.FontRegistry(max_fonts=2)
+
+    def test_repeated_lookups_reuse_the_loaded_font(self):
+        first = self.registry.font(20)
+        second = self.registry.font(20, None, 400)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.registry.stats["misses"], 1)
+        self.assertEqual(self.registry.stats["hits"], 1)
+
+    def test_bundled_family_resolves_by_file_name_and_nearest_weight(self):
+        black = self.registry.font(24, "Montserrat", 900)
+        bold = self.registry.font(24, "montserrat", 700)
+
+        self.assertTrue(str(black.path).endswith("Montserrat-Black.ttf"))
+        self.assertEqual(bold.path, black.path)
+
+    def test_bundled_fonts_resolve_from_inside_the_component(self):
+        # Release zips ship only custom_components/esphome_designer.
+        component_dir = Path(self.fonts.__file__).resolve().parent
+        font = self.fonts.FONT_REGISTRY.font(24, "Montserrat", 900)
+
+        self.assertEqual(self.fonts.BUNDLED_FONT_DIR.resolve().parent, component_dir)
+        self.assertTrue(Path(font.path).resolve().is_relative_to(component_dir))
+
+    def test_unknown_family_falls_back_to_default_face(self):
+        font = self.registry.font(16, "No Such Family")
+
+        self.assertEqual(getattr(font, "path", None), getattr(self.registry.font(16), "path", None))
+
+    def test_font_cache_is_bounded(self):
+        first = self.registry.font(10)
+        self.registry.font(11)
+        self.registry.font(12)
+
+        self.assertEqual(self.registry.stats["fonts"], 2)
+        self.assertIsNot(self.registry.font(10), first)
+
+    def test_text_size_is_memoized_per_font_and_string(self):
+        font = self.registry.font(18)
+
+        size = self.registry.text_size(font, "21.5°C")
+
+        self.assertEqual(self.registry.text_size(font, "21.5°C"), size)
+        self.assertEqual(self.registry.stats["extents"], 1)
+        self.assertGreater(size[0], 0)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import unittest
+
+from support import HAS_PIL, load_integration_modules
+
+
+@unittest.skipUnless(HAS_PIL, "Pillow is unavailable")
+class FramebufferTests(unittest.TestCase):
+    def setUp(self):
+        from PIL import Image
+
+        self.Image = Image
+        self.framebuffer = load_integration_modules()["framebuffer"]
+
+    def test_pack_1bpp_is_msb_first_with_white_bits_set(self):
+        image = self.Image.new("L", (10, 1), color=255)
+        image.putpixel((0, 0), 0)
+        image.putpixel((9, 0), 0)
+
+        packed = self.framebuffer.pack_1bpp(image)
+
+        self.assertEqual(packed, bytes([0b01111111, 0b10000000]))
+
+    def test_merge_boxes_aligns_to_bytes_and_merges_overlaps(self):
+        merged = self.framebuffer.merge_boxes([(3, 0, 10, 5), (12, 2, 20, 8), (40, 40, 41, 41)], 44, 48)
+
+        self.assertEqual(merged, [(0, 0, 24, 8), (40, 40, 44, 41)])
+
+    def test_encode_delta_full_frame_header_and_payload(self):
+        image = self.Image.new("L", (16, 2), color=255)
+
+        payload = self.framebuffer.encode_delta(image, None, seq=7, portrait=True)
+
+        header = self.framebuffer.DELTA_HEADER.unpack_from(payload)
+        rect = self.framebuffer.DELTA_RECT.unpack_from(payload, self.framebuffer.DELTA_HEADER.size)
+        self.assertEqual(header, (b"EDD1", 7, 16, 2, 1, 0x03, 1))
+        self.assertEqual(rect, (0, 0, 16, 2))
+        self.assertEqual(len(payload), self.framebuffer.DELTA_HEADER.size + self.framebuffer.DELTA_RECT.size + 4)
+
+    def test_encode_delta_without_changes_has_no_rects(self):
+        image = self.Image.new("L", (16, 2), color=255)
+
+        payload = self.framebuffer.encode_delta(image, [], seq=3)
+
+        self.assertEqual(self.framebuffer.DELTA_HEADER.unpack_from(payload)[-1], 0)
+
+    def test_pack_2bpp_maps_gray_levels_and_pads_rows(self):
+        image = self.Image.new("L", (5, 1))
+        for x, value in enumerate((0, 85, 170, 255, 255)):
+            image.putpixel((x, 0), value)
+
+        packed = self.framebuffer.pack_2bpp(image)
+
+        self.assertEqual(packed, bytes([0b00011011, 0b11000000]))
+
+    def test_pack_rgb565_is_big_endian(self):
+        image = self.Image.new("RGB", (2, 1), color=(255, 0, 0))
+        image.putpixel((1, 0), (0, 0, 255))
+
+        self.assertEqual(self.framebuffer.pack_rgb565(image), bytes([0xF8, 0x00, 0x00, 0x1F]))
+
+    def test_encode_framebuffer_rejects_unknown_format(self):
+        with self.assertRaises(ValueError):
+            self.framebuffer.encode_framebuffer(self.Image.new("L", (8, 1)), "jpeg")
+
+    def test_banded_encoding_matches_whole_canvas(self):
+        from io import BytesIO
+
+        models = load_integration_modules()["models"]
+        device = models.DeviceConfig.from_dict({"device_id": "d", "device_model": "m5stack_tab5"})
+        image = self.Image.linear_gradient("L").resize((40, 24))
+        bands = [image.crop((0, top, 40, min(24, top + 8))) for top in range(0, 24, 8)]
+
+        png = b"".join(self.framebuffer.encode_bands_for_device(bands, device, "png", 40, 24))
+        packed = b"".join(self.framebuffer.encode_bands_for_device(bands, device, "rgb565", 40, 24))
+
+        self.assertEqual(self.Image.open(BytesIO(png)).tobytes(), image.tobytes())
+        self.assertEqual(packed, self.framebuffer.pack_rgb565(image))
+
+    def test_error_diffusion_devices_do_not_support_bands(self):
+        models = load_integration_modules()["models"]
+
+        def device(**data):
+            return models.DeviceConfig.from_dict({"device_id": "d", **data})
+
+        self.assertTrue(self.framebuffer.supports_bands(device(device_model="m5stack_tab5"), "rgb565"))
+        self.assertFalse(self.framebuffer.supports_bands(device(device_model="reterminal_e1002"), "png"))
+        self.assertTrue(
+            self.framebuffer.supports_bands(device(renderingMode="oepl", oeplDither=1, protocolHardware={"colorMode": "bw"}), "png")
+        )
+
+    def test_palette_comes_from_device_hardware_template(self):
+        import tempfile
+        from pathlib import Path
+
+        modules = load_integration_modules()
+        with tempfile.TemporaryDirectory() as config_dir:
+            profiles = Path(config_dir) / "esphomedesigner_custom_profiles"
+            profiles.mkdir()
+            (profiles / "spectra-panel.yaml").write_text(
+                "display:\n  - platform: epaper_spi\n    color_palette: 6COLOR\n", encoding="utf-8"
+            )
+            features = modules["hardware_templates"].load_template_features(config_dir)
+
+        dither = modules["dither"]
+        device = modules["models"].DeviceConfig.from_dict({"device_id": "d", "device_model": "custom_spectra_panel"})
+        palette, mode = self.framebuffer.device_dither(device, features[device.device_model])
+
+        self.assertEqual(palette, dither.PALETTES["6COLOR"])
+        self.assertEqual(mode, dither.DITHER_FLOYD_STEINBERG)
+        self.assertEqual(
+            self.framebuffer.device_dither(device, features["sunton_esp32_2432s028"])[0], dither.PALETTES["8BIT"]
+        )
+        self.assertEqual(self.framebuffer.device_dither(device), (None, dither.DITHER_NONE))
+
+    def test_default_output_format_follows_hardware_profile(self):
+        models = load_integration_modules()["models"]
+
+        def device(**data):
+            return models.DeviceConfig.from_dict({"device_id": "d", **data})
+
+        self.assertEqual(self.framebuffer.default_output_format(device(device_model="reterminal_e1001")), "1bpp")
+        self.assertEqual(self.framebuffer.default_output_format(device(device_model="m5stack_paper")), "2bpp")
+        self.assertEqual(self.framebuffer.default_output_format(device(device_model="m5stack_tab5")), "rgb565")
+        self.assertEqual(self.framebuffer.default_output_format(device(device_model="reterminal_e1002")), "png")
+        self.assertEqual(
+            self.framebuffer.default_output_format(device(device_model="custom", customHardware={"tech": "lcd"})),
+            "rgb565",
+        )
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+from support import load_integration_modules
+
+
+class HistorySeriesTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        modules = load_integration_modules()
+        self.module = modules["history_series"]
+        self.hass = modules["FakeHass"]()
+        self.calls = []
+
+    async def _fetch(self, hass, entity_id, start_time, end_time):
+        self.calls.append((entity_id, start_time, end_time))
+        await asyncio.sleep(0)
+        start = start_time.timestamp()
+        return [
+            {"state": "10", "last_changed": self._iso(start - 30)},
+            {"state": "20", "last_changed": self._iso(start + 1500)},
+            {"state": "unavailable", "last_changed": self._iso(start + 2000)},
+            {"state": "5", "last_changed": self._iso(start + 3000)},
+        ]
+
+    @staticmethod
+    def _iso(stamp):
+        from datetime import datetime, timezone
+
+        return datetime.fromtimestamp(stamp, timezone.utc).isoformat()
+
+    def test_parse_duration_matches_editor_units(self):
+        parse = self.module.parse_duration
+
+        self.assertEqual([parse("15min"), parse("1h"), parse("3d"), parse("1w"), parse(90), parse("1.5h")],
+                         [900, 3600, 259200, 604800, 90, 5400])
+        self.assertEqual([parse(""), parse(None), parse("soon"), parse("2y")], [3600] * 4)
+
+    def test_downsample_keeps_extremes_carries_states_and_leaves_gaps(self):
+        points = [(0, 1.0), (1, 9.0), (2, 4.0), (3.5, None), (7, 3.0)]
+
+        series = self.module.downsample(points, 0, 10, 5)
+
+        # Each column spans from the value carried in, so the line stays connected.
+        self.assertEqual(series, ((1.0, 9.0), (4.0, 9.0), None, (3.0, 3.0), (3.0, 3.0)))
+
+    async def test_series_is_reused_until_its_window_moves(self):
+        cache = self.module.HistorySeriesCache(fetch=self._fetch)
+        key = self.module.SeriesKey("sensor.temp", 3600, 4)
+        now = 36000.0 + 10
+
+        first, second = await asyncio.gather(
+            cache.async_series(self.hass, key, now), cache.async_series(self.hass, key, now)
+        )
+        third = await cache.async_series(self.hass, key, now + 800)
+        await cache.async_series(self.hass, key, now + 900)
+
+        # 900s columns: the 10 seeds the first, 20 holds until unavailable, then 5.
+        self.assertEqual(first, ((10.0, 10.0), (10.0, 20.0), (20.0, 20.0), (5.0, 5.0)))
+        self.assertIs(first, second)
+        self.assertIs(first, third)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.calls[0][2].timestamp(), 36000.0)
+        self.assertEqual(cache.stats["hits"], 1)
+
+    async def test_failed_query_yields_an_empty_series_and_is_retried(self):
+        async def boom(*_args):
+            raise RuntimeError("recorder exploded")
+
+        cache = self.module.HistorySeriesCache(fetch=boom)
+        key = self.module.SeriesKey("sensor.temp", 3600, 3)
+
+        with self.assertLogs(self.module.__name__, level="WARNING"):
+            self.assertEqual(await cache.async_series(self.hass, key, 36000.0), (None, None, None))
+        self.assertEqual(cache.stats["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
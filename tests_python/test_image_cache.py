@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import HAS_PIL, load_integration_modules
+
+
+@unittest.skipUnless(HAS_PIL, "Pillow is unavailable")
+class DecodedImageCacheTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        from PIL import Image
+
+        self.Image = Image
+        modules = load_integration_modules()
+        self.image_cache = modules["image_cache"]
+        self.renderer = modules["renderer"]
+        self.models = modules["models"]
+        self.modules = modules
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.hass = modules["FakeHass"](self.tmpdir.name)
+        images = Path(self.tmpdir.name) / "esphome" / "images"
+        images.mkdir(parents=True)
+        self.logo = images / "logo.png"
+        Image.linear_gradient("L").resize((400, 200)).save(self.logo)
+        self.cache = self.image_cache.DecodedImageCache()
+
+    def test_bitmap_fits_widget_and_is_dithered_then_reused(self):
+        first = self.cache.bitmap(self.logo, (100, 100))
+        second = self.cache.bitmap(self.logo, (100, 100))
+
+        self.assertEqual(first.size, (100, 50))
+        self.assertLessEqual(set(first.tobytes()), {0, 255})
+        self.assertIs(first, second)
+        self.assertEqual((self.cache.stats["misses"], self.cache.stats["hits"]), (1, 1))
+
+    def test_changed_file_or_rendering_is_decoded_again(self):
+        self.cache.bitmap(self.logo, (100, 100))
+        gray = self.cache.bitmap(self.logo, (100, 100), "GRAYSCALE")
+        stat = self.logo.stat()
+        os.utime(self.logo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.cache.bitmap(self.logo, (100, 100))
+
+        self.assertGreater(len(set(gray.tobytes())), 2)
+        self.assertEqual(self.cache.stats["misses"], 3)
+
+    def test_unreadable_file_yields_none(self):
+        broken = self.logo.with_name("broken.png")
+        broken.write_bytes(b"not an image")
+
+        with self.assertLogs(self.image_cache.__name__, level="WARNING"):
+            self.assertIsNone(self.cache.bitmap(broken, (50, 50)))
+        self.assertIsNone(self.cache.bitmap(broken, (50, 50)))
+        self.assertIsNone(self.cache.bitmap(broken.with_name("missing.png"), (50, 50)))
+
+    def test_renderer_draws_image_widgets_from_allowed_roots_only(self):
+        device = self.models.DeviceConfig.from_dict({
+            "device_id": "d",
+            "pages": [{"id": "p", "widgets": [
+                {"id": "logo", "type": "image", "x": 10, "y": 10, "width": 100, "height": 100,
+                 "props": {"path": "/config/esphome/images/logo.png", "render_mode": "Grayscale"}},
+                {"id": "secret", "type": "image", "x": 200, "y": 10, "width": 100, "height": 100,
+                 "props": {"path": "/config/secrets.yaml"}},
+            ]}],
+        })
+
+        image = self.renderer.render_page(self.hass, device, device.pages[0]).image
+
+        self.assertEqual(image.crop((10, 10, 110, 60)).tobytes(), self.cache.bitmap(self.logo, (100, 100), "GRAYSCALE").tobytes())
+        # The blocked path only gets the placeholder frame.
+        self.assertEqual(image.getpixel((200, 50)), 0)
+        self.assertEqual(image.getpixel((250, 50)), 255)
+
+    async def test_replacing_an_image_file_changes_the_page_cache_key(self):
+        device = self.models.DeviceConfig.from_dict({
+            "device_id": "d",
+            "pages": [{"id": "p", "widgets": [
+                {"id": "logo", "type": "image", "x": 10, "y": 10, "width": 100, "height": 100,
+                 "props": {"path": "/config/esphome/images/logo.png"}},
+            ]}],
+        })
+        storage = self.modules["storage"].DashboardStorage(self.hass)
+        service = self.modules["render_service"].RenderService(
+            self.hass,
+            storage,
+            max_workers=1,
+            scheduler=self.modules["render_scheduler"].RenderScheduler(max_workers=1, use_processes=False),
+            image_check_s=0,
+        )
+        self.addCleanup(service.shutdown)
+
+        # Files are checked in the executor, never while building a key.
+        unchecked = service.cache_key(device, 0)
+        await service._image_check
+        before = service.cache_key(device, 0)
+        stat = self.logo.stat()
+        os.utime(self.logo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertEqual(service.cache_key(device, 0), before)
+        await service._image_check
+        after = service.cache_key(device, 0)
+
+        self.assertNotEqual(unchecked.fingerprint, before.fingerprint)
+        self.assertNotEqual(before.fingerprint, after.fingerprint)
+        self.assertNotEqual(service.etag(before), service.etag(after))
+
+
+if __name__ == "__main__":
+    unittest.main()
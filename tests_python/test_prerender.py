@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import unittest
+
+from support import HAS_PIL, load_integration_modules
+
+
+def _layout(device_id, entity_ids):
+    return {
+        "device_id": device_id,
+        "api_token": "token",
+        "pages": [{
+            "id": f"page_{index}",
+            "name": f"Page {index}",
+            "widgets": [{"id": f"w{index}", "type": "sensor", "entity_id": entity_id, "x": 0, "y": 0, "width": 200, "height": 60}],
+        } for index, entity_id in enumerate(entity_ids)],
+    }
+
+
+@unittest.skipUnless(HAS_PIL, "Pillow is unavailable")
+class PreRendererTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        modules = load_integration_modules()
+        self.hass = modules["FakeHass"]()
+        self.storage = modules["storage"].DashboardStorage(self.hass)
+        self.storage._store.load_map[self.storage._store.key] = {
+            "devices": {"hallway": _layout("hallway", ["sensor.temp", "sensor.power"])},
+        }
+        await self.storage.async_load()
+        self.render_service = modules["render_service"].RenderService(
+            self.hass,
+            self.storage,
+            max_workers=1,
+            scheduler=modules["render_scheduler"].RenderScheduler(max_workers=1, use_processes=False),
+        )
+        self.addCleanup(self.render_service.shutdown)
+        self.prerenderer = modules["prerender"].PreRenderer(self.hass, self.storage, self.render_service, debounce_s=0)
+        self.prerenderer.async_start()
+        self.addCleanup(self.prerenderer.async_stop)
+
+    async def _run_pending_renders(self):
+        self.hass.run_call_later()
+        tasks, self.hass.created_tasks = self.hass.created_tasks, []
+        for task in tasks:
+            await task
+        return len(tasks)
+
+    async def test_subscribes_only_to_layout_entities(self):
+        self.assertEqual(len(self.hass.state_listeners), 1)
+        self.assertEqual(self.hass.state_listeners[0][0], ["sensor.power", "sensor.temp"])
+
+    async def test_state_change_prerenders_only_affected_served_page(self):
+        self.render_service.mark_page_served("hallway", 0)
+        self.render_service.mark_page_served("hallway", 1)
+
+        self.hass.states.set("sensor.temp", "21")
+        self.hass.fire_state_changed("sensor.temp")
+        rendered = await self._run_pending_renders()
+
+        self.assertEqual(rendered, 1)
+        await self.render_service.async_render_page(self.storage.get_device("hallway"), 0)
+        self.assertEqual(self.render_service.cache_stats["hits"], 1)
+
+    async def test_pages_are_prerendered_in_every_format_they_were_fetched_in(self):
+        self.render_service.mark_page_served("hallway", 0, "1bpp")
+        self.render_service.mark_page_served("hallway", 0, "rgb565")
+
+        self.hass.states.set("sensor.temp", "21")
+        self.hass.fire_state_changed("sensor.temp")
+        await self._run_pending_renders()
+
+        device = self.storage.get_device("hallway")
+        for output_format in ("1bpp", "rgb565"):
+            await self.render_service.async_render_page(device, 0, output_format)
+        self.assertEqual(self.render_service.cache_stats["hits"], 2)
+
+    async def test_burst_of_changes_is_coalesced_into_one_render_per_page(self):
+        self.render_service.mark_page_served("hallway", 0)
+
+        for value in ("1", "2", "3"):
+            self.hass.states.set("sensor.temp", value)
+            self.hass.fire_state_changed("sensor.temp")
+
+        self.assertEqual(len(self.hass.call_later_actions), 1)
+        self.assertEqual(await self._run_pending_renders(), 1)
+
+    async def test_unserved_pages_are_not_prerendered(self):
+        self.hass.fire_state_changed("sensor.temp")
+
+        self.assertEqual(self.hass.call_later_actions, [])
+
+    async def test_layout_change_updates_subscription(self):
+        await self.storage.async_update_layout("hallway", _layout("hallway", ["sensor.outdoor"]))
+
+        self.assertEqual(len(self.hass.state_listeners), 1)
+        self.assertEqual(self.hass.state_listeners[0][0], ["sensor.outdoor"])
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import time
+import unittest
+
+from support import load_integration_modules
+
+
+class RenderCacheTests(unittest.TestCase):
+    def setUp(self):
+        modules = load_integration_modules()
+        self.render_cache = modules["render_cache"]
+        self.hass = modules["FakeHass"]()
+
+    def _key(self, device_id="hallway", page_index=0, revision=1, fingerprint="f", valid_until=None):
+        return self.render_cache.RenderCacheKey(device_id, page_index, revision, fingerprint, "png", valid_until)
+
+    def test_get_counts_hits_and_misses(self):
+        cache = self.render_cache.RenderCache(max_bytes=100)
+        cache.put(self._key(), b"png")
+
+        self.assertEqual(cache.get(self._key()), b"png")
+        self.assertIsNone(cache.get(self._key(fingerprint="other")))
+        self.assertEqual(cache.stats["hits"], 1)
+        self.assertEqual(cache.stats["misses"], 1)
+
+    def test_evicts_least_recently_used_entries_over_byte_budget(self):
+        cache = self.render_cache.RenderCache(max_bytes=10)
+        cache.put(self._key(page_index=0), b"aaaa")
+        cache.put(self._key(page_index=1), b"bbbb")
+        cache.get(self._key(page_index=0))
+        cache.put(self._key(page_index=2), b"cccc")
+
+        self.assertIsNotNone(cache.get(self._key(page_index=0)))
+        self.assertIsNone(cache.get(self._key(page_index=1)))
+        self.assertEqual(cache.stats["bytes"], 8)
+        self.assertEqual(cache.stats["evictions"], 1)
+
+    def test_oversized_payloads_are_not_cached(self):
+        cache = self.render_cache.RenderCache(max_bytes=4)
+        cache.put(self._key(), b"too large")
+
+        self.assertEqual(cache.stats["entries"], 0)
+
+    def test_entries_expire_with_their_time_bucket(self):
+        cache = self.render_cache.RenderCache(max_bytes=100)
+        now = time.time()
+        cache.put(self._key(page_index=0, valid_until=now + 60), b"clock")
+        cache.put(self._key(page_index=1, valid_until=now - 1), b"stale")
+        cache.put(self._key(page_index=2, valid_until=now + 0.05), b"soon")
+
+        self.assertEqual(cache.get(self._key(page_index=0, valid_until=now + 60)), b"clock")
+        self.assertIsNone(cache.get(self._key(page_index=1, valid_until=now - 1)))
+        time.sleep(0.06)
+        self.assertIsNone(cache.get(self._key(page_index=2, valid_until=now + 0.05)))
+        self.assertEqual(cache.stats["entries"], 1)
+
+    def test_invalidate_device_drops_only_that_device(self):
+        cache = self.render_cache.RenderCache(max_bytes=100)
+        cache.put(self._key("hallway"), b"a")
+        cache.put(self._key("kitchen"), b"b")
+
+        cache.invalidate_device("hallway")
+
+        self.assertIsNone(cache.get(self._key("hallway")))
+        self.assertEqual(cache.get(self._key("kitchen")), b"b")
+
+    def test_fingerprint_tracks_only_requested_entities(self):
+        self.hass.states.set("sensor.a", "1")
+        before = self.render_cache.state_fingerprint(self.hass, ["sensor.a", "sensor.missing"])
+
+        self.hass.states.set("sensor.b", "2")
+        unrelated = self.render_cache.state_fingerprint(self.hass, ["sensor.a", "sensor.missing"])
+        self.hass.states.set("sensor.a", "1")
+        touched = self.render_cache.state_fingerprint(self.hass, ["sensor.a", "sensor.missing"])
+
+        self.assertEqual(before, unrelated)
+        self.assertNotEqual(before, touched)
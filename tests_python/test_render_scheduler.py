@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import operator
+import threading
+import unittest
+
+from support import HAS_PIL, init_render_worker, load_integration_modules
+
+
+class RenderSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.module = load_integration_modules()["render_scheduler"]
+        self.gate = threading.Event()
+        self.ran = []
+
+    def _scheduler(self, **kwargs):
+        scheduler = self.module.RenderScheduler(max_workers=1, use_processes=False, **kwargs)
+        self.addCleanup(scheduler.shutdown)
+        self.addCleanup(self.gate.set)
+        return scheduler
+
+    def _job(self, name):
+        self.gate.wait(5)
+        self.ran.append(name)
+        return name
+
+    async def _occupy_worker(self, scheduler):
+        blocker = asyncio.ensure_future(scheduler.async_submit("blocker", self.module.PRIORITY_BACKGROUND, self._job, "blocker"))
+        await asyncio.sleep(0)
+        return blocker
+
+    async def test_interactive_jobs_run_before_background_jobs(self):
+        scheduler = self._scheduler()
+        blocker = await self._occupy_worker(scheduler)
+
+        background = asyncio.ensure_future(scheduler.async_submit("a", self.module.PRIORITY_BACKGROUND, self._job, "a"))
+        interactive = asyncio.ensure_future(scheduler.async_submit("b", self.module.PRIORITY_INTERACTIVE, self._job, "b"))
+        await asyncio.sleep(0)
+        self.gate.set()
+        await asyncio.gather(blocker, background, interactive)
+
+        self.assertEqual(self.ran, ["blocker", "b", "a"])
+
+    async def test_queued_job_coalesces_and_takes_newest_inputs(self):
+        scheduler = self._scheduler()
+        blocker = await self._occupy_worker(scheduler)
+
+        first = asyncio.ensure_future(scheduler.async_submit("page", self.module.PRIORITY_BACKGROUND, self._job, "old"))
+        second = asyncio.ensure_future(scheduler.async_submit("page", self.module.PRIORITY_INTERACTIVE, self._job, "new"))
+        await asyncio.sleep(0)
+        self.gate.set()
+
+        self.assertEqual(await asyncio.gather(first, second), ["new", "new"])
+        await blocker
+        self.assertEqual(self.ran, ["blocker", "new"])
+        self.assertEqual(scheduler.stats["coalesced"], 1)
+
+    async def test_full_queue_sheds_background_work(self):
+        scheduler = self._scheduler(max_queue=1)
+        blocker = await self._occupy_worker(scheduler)
+
+        queued = asyncio.ensure_future(scheduler.async_submit("a", self.module.PRIORITY_BACKGROUND, self._job, "a"))
+        await asyncio.sleep(0)
+        with self.assertRaises(self.module.RenderQueueFull):
+            await scheduler.async_submit("b", self.module.PRIORITY_BACKGROUND, self._job, "b")
+
+        interactive = asyncio.ensure_future(scheduler.async_submit("c", self.module.PRIORITY_INTERACTIVE, self._job, "c"))
+        await asyncio.sleep(0)
+        self.gate.set()
+
+        with self.assertRaises(self.module.RenderQueueFull):
+            await queued
+        self.assertEqual(await interactive, "c")
+        await blocker
+        self.assertEqual(self.ran, ["blocker", "c"])
+        self.assertEqual(scheduler.stats["rejected"], 1)
+        self.assertEqual(scheduler.stats["evicted"], 1)
+
+    async def test_runs_jobs_in_worker_processes(self):
+        scheduler = self.module.RenderScheduler(max_workers=1)
+        self.addCleanup(scheduler.shutdown)
+
+        result = await scheduler.async_submit("mul", self.module.PRIORITY_INTERACTIVE, operator.mul, 6, 7)
+
+        self.assertEqual(result, 42)
+        self.assertTrue(scheduler.uses_processes)
+
+    @unittest.skipUnless(HAS_PIL, "Pillow is unavailable")
+    async def test_runs_render_jobs_in_worker_processes(self):
+        modules = load_integration_modules()
+        render_service = modules["render_service"]
+        scheduler = render_service.RenderScheduler(max_workers=1, initializer=init_render_worker)
+        self.addCleanup(scheduler.shutdown)
+        device = modules["models"].DeviceConfig.from_dict({
+            "device_id": "hallway",
+            "pages": [{
+                "id": "page_0",
+                "widgets": [
+                    {"id": "t", "type": "sensor", "entity_id": "sensor.outdoor", "x": 10, "y": 10, "width": 200, "height": 60},
+                    {"id": "l", "type": "label", "title": "Hello", "x": 10, "y": 100, "width": 200, "height": 40},
+                ],
+            }],
+        })
+
+        def snapshot(value):
+            return render_service.HassSnapshot({
+                "sensor.outdoor": render_service.StateSnapshot(value, {"unit_of_measurement": "°C"}, value),
+            })
+
+        key = render_service.RenderCacheKey("hallway", 0, 1, "first")
+        first = await scheduler.async_submit(
+            "render", self.module.PRIORITY_INTERACTIVE, render_service._render_job, key, snapshot("21.5"), device, None, None
+        )
+
+        self.assertTrue(scheduler.uses_processes)
+        self.assertTrue(first.data.startswith(b"\x89PNG"))
+        self.assertIsInstance(first.frame, render_service.RenderedFrame)
+
+        # The worker kept its canvas, so only the changed sensor comes back.
+        key = key._replace(fingerprint="second")
+        second = await scheduler.async_submit(
+            "render",
+            self.module.PRIORITY_INTERACTIVE,
+            render_service._render_job,
+            key,
+            snapshot("22.5"),
+            device,
+            first.frame.signatures,
+            1,
+        )
+
+        self.assertIsInstance(second.frame, render_service.FramePatch)
+        self.assertEqual(len(second.frame.tiles), 1)
+        self.assertEqual(second.frame.apply(first.frame).image.size, first.frame.image.size)
+
+    async def test_shutdown_stops_new_pools(self):
+        scheduler = self.module.RenderScheduler(max_workers=1)
+        scheduler.shutdown()
+
+        with self.assertRaises(RuntimeError):
+            await scheduler.async_submit("mul", self.module.PRIORITY_INTERACTIVE, operator.mul, 6, 7)
+        with self.assertRaises(RuntimeError):
+            scheduler._get_executor()
+        self.assertIsNone(scheduler._executor)
+
+    async def test_unpicklable_job_falls_back_to_threads(self):
+        scheduler = self.module.RenderScheduler(max_workers=1)
+        self.addCleanup(scheduler.shutdown)
+
+        with self.assertLogs(self.module.__name__, level="WARNING"):
+            result = await scheduler.async_submit("call", self.module.PRIORITY_INTERACTIVE, callable, lambda: None)
+
+        self.assertTrue(result)
+        self.assertFalse(scheduler.uses_processes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import unittest
+
+from support import load_integration_modules
+
+
+class RenderStatsTests(unittest.TestCase):
+    def setUp(self):
+        self.module = load_integration_modules()["render_stats"]
+
+    def test_histogram_buckets_and_percentiles(self):
+        histogram = self.module.Histogram((1, 10, 100))
+        for value in (0.5, 3, 4, 5, 250):
+            histogram.observe(value)
+
+        summary = histogram.as_dict()
+
+        self.assertEqual(summary["buckets"], {"<=1": 1, "<=10": 3, ">100": 1})
+        self.assertEqual(summary["p50"], 10)
+        self.assertEqual(summary["p95"], 250)
+        self.assertEqual(summary["max"], 250)
+        self.assertIsNone(self.module.Histogram((1,)).percentile(0.5))
+
+    def test_slow_widgets_rank_by_mean_and_forget_per_device(self):
+        stats = self.module.RenderStats(slow_widgets=2)
+        timing = self.module.WidgetTiming
+        for clock_s in (0.002, 0.004):
+            stats.record("hall", 0, self.module.RenderTimings(
+                (timing("clock", "datetime", clock_s), timing("icon", "icon", 0.001), timing("graph", "graph", 0.05)),
+                0.06, 0.01, 2048,
+            ))
+        stats.record("hall", 0, self.module.RenderTimings((), None, 0.002, 1024))
+
+        report = stats.report()
+
+        self.assertEqual([widget["widget_id"] for widget in report["slow_widgets"]], ["graph", "clock"])
+        self.assertEqual(report["slow_widgets"][1]["mean_ms"], 3.0)
+        self.assertEqual(report["devices"]["hall"]["draw_ms"]["count"], 2)
+        self.assertEqual(report["devices"]["hall"]["encode_ms"]["count"], 3)
+        self.assertEqual(report["widget_types"]["graph"]["count"], 2)
+
+        stats.forget_widgets("hall")
+        self.assertEqual(stats.slow_widgets(), [])
+        self.assertEqual(stats.report()["devices"]["hall"]["bytes"]["count"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import unittest
+from datetime import datetime
+
+from support import HAS_PIL, load_integration_modules
+
+
+def _widget(widget_id, **fields):
+    return {"id": widget_id, "type": fields.pop("type", "sensor"), **fields}
+
+
+@unittest.skipUnless(HAS_PIL, "Pillow is unavailable")
+class RendererTests(unittest.TestCase):
+    def setUp(self):
+        modules = load_integration_modules()
+        self.models = modules["models"]
+        self.renderer = modules["renderer"]
+        self.history_series = modules["history_series"]
+        self.hass = modules["FakeHass"]()
+        self.hass.states.set("sensor.temp", "21.0", {"unit_of_measurement": "°C"})
+        self.hass.states.set("sensor.power", "150", {"unit_of_measurement": "W"})
+
+    def _device(self, widgets, **settings):
+        return self.models.DeviceConfig.from_dict({
+            "device_id": "hallway",
+            "api_token": "token",
+            "pages": [{"id": "page_0", "name": "Main", "widgets": widgets}],
+            **settings,
+        })
+
+    def _sensor_device(self):
+        return self._device([
+            _widget("temp", entity_id="sensor.temp", x=10, y=10, width=200, height=60),
+            _widget("power", entity_id="sensor.power", x=300, y=10, width=200, height=60),
+            _widget("label", type="label", title="Overlap", x=150, y=40, width=200, height=60),
+        ])
+
+    def test_render_page_to_png_uses_device_resolution(self):
+        from io import BytesIO
+
+        from PIL import Image
+
+        device = self._device([], width=296, height=128)
+        png = self.renderer.render_page_to_png(self.hass, device, device.pages[0])
+
+        self.assertEqual(Image.open(BytesIO(png)).size, (296, 128))
+
+    def test_unchanged_inputs_reuse_previous_canvas(self):
+        device = self._sensor_device()
+        first = self.renderer.render_page(self.hass, device, device.pages[0])
+        second = self.renderer.render_page(self.hass, device, device.pages[0], first)
+
+        self.assertIsNone(first.dirty)
+        self.assertEqual(second.dirty, [])
+        self.assertIs(second.image, first.image)
+
+    def test_incremental_render_matches_full_render_and_redraws_only_changed_box(self):
+        device = self._sensor_device()
+        first = self.renderer.render_page(self.hass, device, device.pages[0])
+        first_pixels = first.image.tobytes()
+
+        self.hass.states.set("sensor.temp", "35.5", {"unit_of_measurement": "°C"})
+        incremental = self.renderer.render_page(self.hass, device, device.pages[0], first)
+        full = self.renderer.render_page(self.hass, device, device.pages[0])
+
+        self.assertEqual(incremental.dirty, [(10, 10, 210, 70)])
+        self.assertEqual(incremental.image.tobytes(), full.image.tobytes())
+        self.assertEqual(first.image.tobytes(), first_pixels)
+
+    def test_bands_stack_to_the_full_render(self):
+        from PIL import Image
+
+        device = self._sensor_device()
+        full = self.renderer.render_page(self.hass, device, device.pages[0]).image
+
+        bands = list(self.renderer.render_page_bands(self.hass, device, device.pages[0], band_height=32))
+        stacked = Image.new("L", full.size)
+        top = 0
+        for band in bands:
+            stacked.paste(band, (0, top))
+            top += band.height
+
+        self.assertEqual(len(bands), 15)
+        self.assertEqual(top, full.height)
+        self.assertEqual(stacked.tobytes(), full.tobytes())
+
+    def test_resolution_change_forces_full_render(self):
+        device = self._sensor_device()
+        first = self.renderer.render_page(self.hass, device, device.pages[0])
+        device.width = 400
+
+        second = self.renderer.render_page(self.hass, device, device.pages[0], first)
+
+        self.assertIsNone(second.dirty)
+        self.assertEqual(second.image.size, (400, 480))
+
+    def test_page_dependencies_include_implicit_clock_entity(self):
+        device = self._device([
+            _widget("clock", type="clock", x=0, y=0, width=100, height=50),
+            _widget("temp", entity_id="sensor.temp", x=0, y=60, width=100, height=50),
+        ])
+
+        entity_ids, time_dependent = self.renderer.page_dependencies(device.pages[0])
+
+        self.assertEqual(entity_ids, ["sensor.temp", "sensor.time"])
+        self.assertTrue(time_dependent)
+
+    def test_clock_pages_are_valid_until_their_text_changes(self):
+        device = self._device([
+            _widget("clock", type="clock", x=0, y=0, width=100, height=50),
+            _widget("temp", entity_id="sensor.temp", x=0, y=60, width=100, height=50),
+        ])
+        now = datetime(2024, 5, 31, 23, 59, 30, 500)
+
+        # The system clock's %H:%M changes on the next minute.
+        self.assertEqual(self.renderer.page_valid_until(self.hass, device.pages[0], now=now), datetime(2024, 6, 1, 0, 0))
+        # sensor.time changes are state changes; only the date line is left.
+        self.hass.states.set("sensor.time", "12:00")
+        now = datetime(2024, 5, 31, 12, 0, 30)
+        self.assertEqual(self.renderer.page_valid_until(self.hass, device.pages[0], now=now), datetime(2024, 6, 1, 0, 0))
+        self.assertIsNone(self.renderer.page_valid_until(self.hass, device.pages[0], visible=(False, True), now=now))
+
+    def test_graph_draws_prefetched_series_up_to_the_current_state(self):
+        device = self._device([
+            _widget("graph", type="graph", entity_id="sensor.temp", x=0, y=0, width=104, height=54,
+                    props={"duration": "1h", "auto_scale": False, "min_value": 0, "max_value": 50, "line_thickness": 1}),
+        ])
+        key = self.renderer.graph_series_key(device.pages[0].widgets[0])
+        self.assertEqual(key, self.history_series.SeriesKey("sensor.temp", 3600, 100))
+        self.hass.history = {key: ((0.0, 0.0),) * 50 + (None,) * 49 + ((25.0, 25.0),)}
+        self.hass.states.set("sensor.temp", "50")
+
+        image = self.renderer.render_page(self.hass, device, device.pages[0]).image
+
+        # Frame, a flat line at the bottom, a gap, and the last column up to the current 50.
+        self.assertEqual(image.getpixel((1, 20)), 0)
+        self.assertEqual(image.getpixel((10, 51)), 0)
+        self.assertEqual(image.getpixel((60, 51)), 255)
+        self.assertEqual([image.getpixel((101, y)) for y in (2, 26, 51)], [0, 0, 255])
+        self.assertIn(key, self.renderer.page_series_keys(device.pages[0]))
+
+    def test_hidden_widget_is_not_drawn_and_only_its_condition_is_a_dependency(self):
+        self.hass.states.set("input_boolean.show_power", "off")
+        device = self._device([
+            _widget("power", entity_id="sensor.power", x=300, y=10, width=200, height=60,
+                    condition_entity="input_boolean.show_power", condition_state="on"),
+        ])
+        blank = self._device([])
+
+        hidden = self.renderer.render_page(self.hass, device, device.pages[0])
+        dependencies = self.renderer.page_dependencies(device.pages[0], (False,))
+
+        self.assertEqual(hidden.image.tobytes(), self.renderer.render_page(self.hass, blank, blank.pages[0]).image.tobytes())
+        self.assertEqual(dependencies, (["input_boolean.show_power"], False))
+
+        self.hass.states.set("input_boolean.show_power", "on")
+        shown = self.renderer.render_page(self.hass, device, device.pages[0], hidden)
+
+        self.assertEqual(shown.dirty, [(300, 10, 500, 70)])
+        self.assertNotEqual(shown.image.tobytes(), hidden.image.tobytes())
@@ -12,8 +12,9 @@ class FakeStorage:
         if device is not None:
             self.devices[device.device_id] = device
 
-    async def async_update_device(self, device_id, updater):
+    async def async_update_device(self, device_id, updater, layout_changed=True):
         self.calls.append(device_id)
+        self.layout_changed = layout_changed
         device = self.devices.get(device_id)
         if device is None:
             return None
@@ -72,6 +73,7 @@ class ServiceTests(unittest.IsolatedAsyncioTestCase):
         await hass.created_tasks[-1]
 
         self.assertEqual(device.current_page, 2)
+        self.assertFalse(storage.layout_changed)
 
     async def test_next_and_prev_services_wrap_pages(self):
         device = self._device(current_page=2, page_count=3)
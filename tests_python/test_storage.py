@@ -40,11 +40,27 @@ class DashboardStorageTests(unittest.IsolatedAsyncioTestCase):
         storage._state = self.models.DashboardState()
 
         device = await storage.async_get_default_device()
+        self.fake_store.run_delayed_saves()
 
         self.assertEqual(device.device_id, "reterminal_e1001")
         self.assertEqual(len(storage._store.saved_payloads), 1)
         self.assertIn("reterminal_e1001", storage.state.devices)
 
+    async def test_get_default_device_skips_layouts_that_fail_to_parse(self):
+        storage = self.storage_module.DashboardStorage(object())
+        storage._state = self.models.DashboardState(last_active_layout_id="kiosk")
+        storage._state.devices = self.storage_module._LazyDevices({
+            "alpha": {"device_id": "alpha", "pages": 5},
+            "kiosk": {"device_id": "kiosk", "pages": [5]},
+            "zeta": self._device("zeta", "token").to_dict(),
+        })
+
+        with self.assertLogs(self.storage_module.__name__, level="ERROR"):
+            device = await storage.async_get_default_device()
+
+        self.assertEqual(device.device_id, "zeta")
+        self.assertEqual(sorted(storage.state.devices), ["zeta"])
+
     async def test_load_ignores_non_mapping_payloads(self):
         storage = self.storage_module.DashboardStorage(object())
         storage._store.load_map[storage._store.key] = ["not", "a", "mapping"]
@@ -75,6 +91,7 @@ class DashboardStorageTests(unittest.IsolatedAsyncioTestCase):
                 }],
             }],
         })
+        self.fake_store.run_delayed_saves()
 
         self.assertIsNotNone(updated)
         self.assertEqual(updated.api_token, "secret-token")
@@ -100,6 +117,7 @@ class DashboardStorageTests(unittest.IsolatedAsyncioTestCase):
                 "widgets": [],
             }],
         })
+        self.fake_store.run_delayed_saves()
 
         self.assertIsNotNone(updated)
         self.assertEqual(updated.pages[0].refresh_type, "daily")
@@ -107,7 +125,7 @@ class DashboardStorageTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(updated.pages[0].visible_from, "06:00")
         self.assertEqual(updated.pages[0].visible_to, "22:00")
         self.assertEqual(updated.pages[0].layout, "4x4")
-        saved_page = storage._store.saved_payloads[-1]["devices"]["kiosk"]["pages"][0]
+        saved_page = storage._device_store("kiosk").saved_payloads[-1]["pages"][0]
         self.assertEqual(saved_page["refresh_type"], "daily")
         self.assertEqual(saved_page["refresh_time"], "08:15")
         self.assertEqual(saved_page["visible_from"], "06:00")
@@ -122,6 +140,7 @@ class DashboardStorageTests(unittest.IsolatedAsyncioTestCase):
         imported = self.models.DeviceConfig(device_id="kiosk", api_token="", name="Imported", pages=[])
         imported.ensure_pages()
         updated = await storage.async_update_layout_from_device(imported)
+        self.fake_store.run_delayed_saves()
 
         self.assertEqual(updated.api_token, "secret-token")
         self.assertEqual(storage.state.last_active_layout_id, "kiosk")
@@ -136,6 +155,7 @@ class DashboardStorageTests(unittest.IsolatedAsyncioTestCase):
 
         self.assertIsNone(updated)
         self.assertEqual(storage.state.devices["reterminal_e1001"].name, "Existing")
+        self.assertFalse(storage.has_pending_save)
         self.assertEqual(len(storage._store.saved_payloads), 0)
 
     async def test_delete_layout_clears_last_active_layout(self):
@@ -144,7 +164,212 @@ class DashboardStorageTests(unittest.IsolatedAsyncioTestCase):
         storage._state = self.models.DashboardState(devices={"kiosk": existing}, last_active_layout_id="kiosk")
 
         await storage.async_delete_layout("kiosk")
+        self.fake_store.run_delayed_saves()
 
         self.assertNotIn("kiosk", storage.state.devices)
         self.assertIsNone(storage.state.last_active_layout_id)
         self.assertEqual(len(storage._store.saved_payloads), 1)
+
+    async def test_mutation_burst_is_written_once_with_the_final_state(self):
+        storage = self.storage_module.DashboardStorage(object())
+        storage._state = self.models.DashboardState(devices={"kiosk": self._device("kiosk", "secret-token")})
+
+        for name in ("K", "Ki", "Kiosk"):
+            await storage.async_update_layout("kiosk", {"name": name})
+        await storage.async_set_last_active_layout("kiosk")
+
+        self.assertTrue(storage.has_pending_save)
+        self.assertEqual(storage._store.saved_payloads, [])
+        self.fake_store.run_delayed_saves()
+
+        self.assertFalse(storage.has_pending_save)
+        self.assertEqual(len(storage._store.saved_payloads), 1)
+        self.assertEqual([payload["name"] for payload in storage._device_store("kiosk").saved_payloads], ["Kiosk"])
+
+    async def test_flush_writes_pending_changes_immediately_and_only_once(self):
+        storage = self.storage_module.DashboardStorage(object())
+        storage._state = self.models.DashboardState()
+
+        await storage.async_flush()
+        await storage.async_set_device(self._device("kiosk", "secret-token"))
+        await storage.async_flush()
+        await storage.async_flush()
+
+        self.assertEqual(len(storage._store.saved_payloads), 1)
+        self.assertEqual(storage._store.saved_payloads[0]["devices"], ["kiosk"])
+        self.assertEqual(len(storage._device_store("kiosk").saved_payloads), 1)
+        self.assertIsNone(storage._store.delayed_save)
+
+    async def test_single_blob_state_is_split_into_device_stores_on_load(self):
+        storage = self.storage_module.DashboardStorage(object())
+        blob = self.models.DashboardState(
+            devices={"kiosk": self._device("kiosk", "t1"), "hallway": self._device("hallway", "t2")},
+            last_active_layout_id="hallway",
+        ).to_dict()
+        storage._store.load_map[storage._store.key] = blob
+
+        await storage.async_load()
+
+        self.assertEqual(len(storage._store.saved_payloads), 1)
+        index = storage._store.saved_payloads[0]
+        self.assertEqual(index["devices"], ["hallway", "kiosk"])
+        self.assertEqual(index["last_active_layout_id"], "hallway")
+        self.assertEqual(sorted(index["summaries"]), ["hallway", "kiosk"])
+        self.assertEqual(storage._device_store("kiosk").saved_payloads, [blob["devices"]["kiosk"]])
+        self.assertFalse(storage.has_pending_save)
+
+        # A fresh storage reads the shards back.
+        for store in list(self.fake_store.instances):
+            if store.saved_payloads:
+                store.load_map[store.key] = store.saved_payloads[-1]
+        reloaded = self.storage_module.DashboardStorage(object())
+        await reloaded.async_load()
+
+        self.assertEqual(sorted(reloaded.state.devices), ["hallway", "kiosk"])
+        self.assertEqual(reloaded.state.devices["kiosk"].api_token, "t1")
+        self.assertEqual(reloaded.state.last_active_layout_id, "hallway")
+
+    async def test_index_store_is_versioned_past_the_single_blob_format(self):
+        storage = self.storage_module.DashboardStorage(object())
+        blob = self.models.DashboardState(devices={"kiosk": self._device("kiosk", "t1")}).to_dict()
+
+        self.assertEqual(storage._store.version, 2)
+        # A version 1 blob reaches async_load as-is, which splits it.
+        self.assertIs(await storage._store._async_migrate_func(1, 1, blob), blob)
+
+    async def test_stored_layouts_are_parsed_on_first_access_only(self):
+        kiosk = self._device("kiosk", "t1", name="Kiosk")
+        kiosk.pages[0].widgets.append(self.models.WidgetConfig.from_dict({
+            "id": "temp", "type": "sensor", "entity_id": "sensor.outdoor", "x": 0, "y": 0, "width": 10, "height": 10,
+        }))
+        seed = self.storage_module.DashboardStorage(object())
+        seed._state = self.models.DashboardState(devices={"kiosk": kiosk, "hallway": self._device("hallway", "t2")})
+        seed.mark_layout_changed("kiosk")
+        seed.mark_layout_changed("hallway")
+        await seed.async_save()
+        for store in list(self.fake_store.instances):
+            if store.saved_payloads:
+                store.load_map[store.key] = store.saved_payloads[-1]
+
+        storage = self.storage_module.DashboardStorage(object())
+        await storage.async_load()
+        devices = storage.state.devices
+
+        layouts = await storage.async_list_layouts()
+        self.assertEqual({layout["id"]: layout["name"] for layout in layouts}, {"hallway": "Hallway", "kiosk": "Kiosk"})
+        self.assertEqual(storage.dependency_index.pages_for("sensor.outdoor"), {("kiosk", 0)})
+        self.assertFalse(devices.is_loaded("kiosk") or devices.is_loaded("hallway"))
+
+        self.assertIsNone(storage.get_device_by_token("kiosk", "wrong"))
+        self.assertTrue(devices.is_loaded("kiosk"))
+        self.assertFalse(devices.is_loaded("hallway"))
+        self.assertFalse(storage.has_pending_save)
+
+    async def test_saving_one_layout_writes_only_that_device(self):
+        storage = self.storage_module.DashboardStorage(object())
+        storage._state = self.models.DashboardState(
+            devices={"kiosk": self._device("kiosk", "t1"), "hallway": self._device("hallway", "t2")},
+        )
+
+        await storage.async_update_layout("kiosk", {"name": "Kiosk 2"})
+        await storage.async_delete_layout("hallway")
+        self.fake_store.run_delayed_saves()
+
+        self.assertEqual(len(storage._device_store("kiosk").saved_payloads), 1)
+        self.assertEqual(storage._device_store("hallway").saved_payloads, [])
+        self.assertTrue(storage._device_store("hallway").removed)
+        self.assertEqual(storage._store.saved_payloads[-1]["devices"], ["kiosk"])
+
+    async def test_serialized_layout_is_reused_until_the_device_changes(self):
+        storage = self.storage_module.DashboardStorage(object())
+        kiosk = self._device("kiosk", "t1")
+        storage._state = self.models.DashboardState(devices={"kiosk": kiosk})
+
+        first = storage.layout_dict(kiosk)
+        text = storage.layout_json(kiosk)
+        self.assertIs(storage.layout_dict(kiosk), first)
+        self.assertIs(storage.layout_json(kiosk), text)
+
+        await storage.async_update_device("kiosk", lambda device: setattr(device, "name", "Renamed"))
+        self.fake_store.run_delayed_saves()
+
+        self.assertIsNot(storage.layout_dict(kiosk), first)
+        self.assertEqual(storage.layout_dict(kiosk)["name"], "Renamed")
+        self.assertIn('"Renamed"', storage.layout_json(kiosk))
+        # The delayed write serialized the device once; serving it reused that form.
+        self.assertIs(storage._device_store("kiosk").saved_payloads[-1], storage.layout_dict(kiosk))
+
+        detached = self._device("kiosk", "t1", name="Not stored")
+        self.assertEqual(storage.layout_dict(detached)["name"], "Not stored")
+
+    def test_device_store_keys_are_file_safe(self):
+        key = self.storage_module.device_store_key
+
+        self.assertEqual(key("esphome_designer", "hall-way_1"), "esphome_designer.device.hall-way_1")
+        self.assertRegex(key("esphome_designer", "../etc/passwd"), r"^esphome_designer\.device\.[0-9a-f]{40}$")
+
+    async def test_layout_mutations_bump_revision_without_reusing_values(self):
+        storage = self.storage_module.DashboardStorage(object())
+        storage._state = self.models.DashboardState()
+
+        await storage.async_set_device(self._device("kiosk", "secret-token"))
+        created = storage.get_layout_revision("kiosk")
+        await storage.async_update_layout("kiosk", {"name": "Renamed"})
+        updated = storage.get_layout_revision("kiosk")
+        await storage.async_delete_layout("kiosk")
+        await storage.async_set_device(self._device("kiosk", "secret-token"))
+        recreated = storage.get_layout_revision("kiosk")
+
+        self.assertEqual(storage.get_layout_revision("unknown"), 0)
+        self.assertLess(created, updated)
+        self.assertLess(updated, recreated)
+
+    async def test_persisted_revision_advances_and_rejects_stale_writers(self):
+        storage = self.storage_module.DashboardStorage(object())
+        storage._state = self.models.DashboardState(devices={"kiosk": self._device("kiosk", "t1")})
+
+        await storage.async_update_layout("kiosk", {"name": "First", "revision": 40})
+        self.assertEqual(storage.get_device_revision("kiosk"), 1)
+
+        with self.assertRaises(self.storage_module.RevisionConflictError) as caught:
+            await storage.async_update_layout("kiosk", {"name": "Stale"}, expected_revisions={("kiosk", 0)})
+        self.assertEqual(caught.exception.current, 1)
+        self.assertEqual(storage.state.devices["kiosk"].name, "First")
+
+        updated = await storage.async_update_layout("kiosk", {"name": "Second"}, expected_revisions={("kiosk", 1)})
+        self.fake_store.run_delayed_saves()
+
+        self.assertEqual(updated.revision, 2)
+        self.assertEqual(storage._device_store("kiosk").saved_payloads[-1]["revision"], 2)
+        self.assertEqual(storage._store.saved_payloads[-1]["summaries"]["kiosk"]["revision"], 2)
+        self.assertIsNone(storage.get_device_revision("unknown"))
+
+        # The revision survives a restart, read from the index before the shard is parsed.
+        for store in list(self.fake_store.instances):
+            if store.saved_payloads:
+                store.load_map[store.key] = store.saved_payloads[-1]
+        reloaded = self.storage_module.DashboardStorage(object())
+        await reloaded.async_load()
+
+        self.assertEqual(reloaded.get_device_revision("kiosk"), 2)
+        self.assertFalse(reloaded.state.devices.is_loaded("kiosk"))
+        await reloaded.async_update_layout("kiosk", {"name": "Third"}, expected_revisions={("kiosk", 2)})
+        self.assertEqual(reloaded.get_device_revision("kiosk"), 3)
+
+    async def test_page_flip_is_saved_without_changing_the_layout_revision(self):
+        storage = self.storage_module.DashboardStorage(object())
+        kiosk = self._device("kiosk", "t1", pages=[
+            self.models.PageConfig(id=f"page_{index}", name=f"Page {index}", widgets=[]) for index in range(2)
+        ])
+        storage._state = self.models.DashboardState(devices={"kiosk": kiosk})
+        changed = []
+        storage.async_add_layout_listener(changed.append)
+        storage.layout_dict(kiosk)
+
+        await storage.async_update_device("kiosk", lambda device: device.set_page(1), layout_changed=False)
+        self.fake_store.run_delayed_saves()
+
+        self.assertEqual(changed, [])
+        self.assertEqual(storage.get_layout_revision("kiosk"), 0)
+        self.assertEqual(storage.get_device_revision("kiosk"), 0)
+        self.assertEqual(storage._device_store("kiosk").saved_payloads[-1]["current_page"], 1)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import unittest
+
+from support import load_integration_modules
+
+
+class VisibilityTests(unittest.TestCase):
+    def setUp(self):
+        modules = load_integration_modules()
+        self.models = modules["models"]
+        self.visibility = modules["visibility"]
+        self.hass = modules["FakeHass"]()
+
+    def _widget(self, **data):
+        return self.models.WidgetConfig.from_dict({"id": "w", "type": "label", **data})
+
+    def _visible(self, widget):
+        condition = self.visibility.compile_condition(widget)
+        return condition is None or condition(self.hass)
+
+    def test_widget_without_condition_or_state_is_visible(self):
+        self.assertIsNone(self.visibility.compile_condition(self._widget()))
+        self.assertTrue(self._visible(self._widget(condition_entity="sensor.missing", condition_state="on")))
+
+    def test_binary_states_are_normalized(self):
+        self.hass.states.set("binary_sensor.door", "open")
+
+        self.assertTrue(self._visible(self._widget(condition_entity="binary_sensor.door", condition_state="on")))
+        self.assertFalse(self._visible(self._widget(condition_entity="binary_sensor.door", condition_state="closed")))
+        self.assertFalse(self._visible(self._widget(
+            condition_entity="binary_sensor.door", condition_state="on", props={"condition_invert": True},
+        )))
+
+    def test_numeric_operators_and_range(self):
+        self.hass.states.set("sensor.temp", "21.5")
+
+        self.assertTrue(self._visible(self._widget(condition_entity="sensor.temp", condition_operator=">", condition_state="20")))
+        self.assertFalse(self._visible(self._widget(condition_entity="sensor.temp", condition_operator="<=", condition_state="20")))
+        self.assertTrue(self._visible(self._widget(condition_entity="sensor.temp", condition_min="20", condition_max="22")))
+        self.assertFalse(self._visible(self._widget(condition_entity="sensor.temp", condition_min="22")))
+
+    def test_string_comparison_and_non_numeric_ordering(self):
+        self.hass.states.set("weather.home", "rainy")
+
+        self.assertTrue(self._visible(self._widget(condition_entity="weather.home", condition_state="rainy")))
+        self.assertTrue(self._visible(self._widget(condition_entity="weather.home", condition_operator="!=", condition_state="sunny")))
+        self.assertFalse(self._visible(self._widget(condition_entity="weather.home", condition_operator=">", condition_state="1")))
+
+    def test_page_conditions_evaluate_in_widget_order(self):
+        self.hass.states.set("input_boolean.guest", "off")
+        page = self.models.PageConfig.from_dict({"id": "p", "widgets": [
+            {"id": "a", "type": "label"},
+            {"id": "b", "type": "label", "condition_entity": "input_boolean.guest", "condition_state": "on"},
+        ]})
+
+        compiled = self.visibility.compile_page_conditions(page)
+
+        self.assertEqual(compiled.evaluate(self.hass), (True, False))
+        self.assertEqual(compiled.entity_ids, frozenset({"input_boolean.guest"}))